@@ -0,0 +1,246 @@
+import os
+import subprocess
+import time
+
+# Wurzel der cgroup-v2-Hierarchie auf dem Host
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+# Dateien, die der Sampler pro Messpunkt liest
+CGROUP_FILES = ["cpu.stat", "memory.current", "pids.current"]
+
+# Zähler der CFS-Bandbreitenkontrolle in cpu.stat, nur vorhanden wenn der Controller aktiv ist
+THROTTLE_KEYS = ["nr_periods", "nr_throttled", "throttled_usec"]
+
+# Kernel-Speicher in memory.stat, ältere Kernel haben keinen Eintrag "kernel"
+KERNEL_MEMORY_KEYS = ["kernel_stack", "pagetables", "percpu", "sock", "slab"]
+
+
+# Anonymer, dateibasierter und Kernel-Speicher in MB aus dem Inhalt von memory.stat bzw. den Docker-Stats
+def memory_breakdown(memory_stat):
+    kernel = memory_stat.get("kernel")
+    if kernel is None:
+        kernel = sum(memory_stat.get(key, 0) for key in KERNEL_MEMORY_KEYS)
+    return tuple(value / (1024 * 1024) for value in (memory_stat.get("anon", 0), memory_stat.get("file", 0), kernel))
+
+
+# PID des Hauptprozesses eines Containers auf dem Host
+def container_pid(container_name):
+    result = subprocess.run(
+        ["docker", "inspect", "--format", "{{.State.Pid}}", container_name],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    pid = int(result.stdout.strip())
+    if pid == 0:
+        raise ValueError(f"Container {container_name} is not running")
+    return pid
+
+
+# cgroup-v2-Pfad eines Prozesses auf dem Host, nur wenn die Dateien des Samplers vorhanden sind
+def process_cgroup_path(pid):
+    with open(f"/proc/{pid}/cgroup", "r") as file:
+        for line in file:
+            # cgroup v2 hat genau eine Zeile der Form "0::/pfad"
+            if line.startswith("0::"):
+                path = os.path.join(CGROUP_ROOT, line[3:].strip().lstrip("/"))
+                if all(os.path.exists(os.path.join(path, name)) for name in CGROUP_FILES):
+                    return path
+
+    raise FileNotFoundError(f"No cgroup v2 path found for process {pid}")
+
+
+# Ermittelt PID und cgroup-Pfad eines Containers einmalig über seinen Hauptprozess
+def resolve_cgroup_path(container_name):
+    pid = container_pid(container_name)
+    return pid, process_cgroup_path(pid)
+
+
+# Liest die PIDs aller Prozesse einer cgroup aus cgroup.procs, die Datei bleibt dafür offen
+class CgroupProcs:
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = os.open(os.path.join(path, "cgroup.procs"), os.O_RDONLY)
+
+    # PIDs auf dem Host, leer sobald die cgroup mit dem Container verschwunden ist
+    def read(self):
+        try:
+            return [int(pid) for pid in os.pread(self.fd, 1 << 20, 0).split()]
+        except OSError:
+            return []
+
+    def close(self):
+        os.close(self.fd)
+
+
+# Liest CPU, Drosselung, Run-Queue-Wartezeit, Speicher samt Aufteilung und PIDs direkt aus der cgroup eines Containers
+class CgroupSampler:
+
+    def __init__(self, container_name):
+        self.container_name = container_name
+        self.pid, self.path = resolve_cgroup_path(container_name)
+
+        # Dateien bleiben offen, jeder Messpunkt ist dann nur ein pread pro Datei
+        self.cpu_stat_fd = os.open(os.path.join(self.path, "cpu.stat"), os.O_RDONLY)
+        self.memory_fd = os.open(os.path.join(self.path, "memory.current"), os.O_RDONLY)
+        self.pids_fd = os.open(os.path.join(self.path, "pids.current"), os.O_RDONLY)
+        memory_stat = os.path.join(self.path, "memory.stat")
+        self.memory_stat_fd = os.open(memory_stat, os.O_RDONLY) if os.path.exists(memory_stat) else None
+
+        # Netzwerk aus dem Namespace des Hauptprozesses, Block-I/O nur wenn der io-Controller aktiv ist
+        self.net_fd = os.open(f"/proc/{self.pid}/net/dev", os.O_RDONLY)
+        io_stat = os.path.join(self.path, "io.stat")
+        self.io_fd = os.open(io_stat, os.O_RDONLY) if os.path.exists(io_stat) else None
+
+        # Run-Queue-Wartezeit aus /proc/<tid>/schedstat aller Threads der cgroup, nur mit schedstat im Kernel.
+        # Die Dateien der Threads bleiben ebenfalls offen, bis der Thread beendet ist.
+        self.threads_fd = None
+        if os.path.exists(f"/proc/{self.pid}/schedstat"):
+            self.threads_fd = os.open(os.path.join(self.path, "cgroup.threads"), os.O_RDONLY)
+        self.schedstat_fds = {}
+        self.last_schedstat = {}
+        self.read_schedstat()
+
+        # Ausgangswerte für die erste CPU-Differenz
+        self.last_cpu_stat = self.read_cpu_stat()
+        self.last_time_ns = time.monotonic_ns()
+
+    def read_cpu_stat(self):
+        cpu_stat = {}
+        for line in os.pread(self.cpu_stat_fd, 4096, 0).decode().splitlines():
+            key, value = line.split()
+            cpu_stat[key] = int(value)
+        return cpu_stat
+
+    # Summierte Run-Queue-Wartezeit in ns und Anzahl der Zeitscheiben aller Threads seit dem letzten Aufruf,
+    # (None, None) ohne schedstat. Neue Threads zählen mit ihrer ganzen Wartezeit, sie sind jünger als ein Intervall.
+    def read_schedstat(self):
+        if self.threads_fd is None:
+            return None, None
+        tids = os.pread(self.threads_fd, 1 << 20, 0).split()
+        wait_ns = 0
+        timeslices = 0
+        schedstat = {}
+        for tid in tids:
+            fd = self.schedstat_fds.get(tid)
+            try:
+                if fd is None:
+                    fd = os.open(f"/proc/{tid.decode()}/schedstat", os.O_RDONLY)
+                    self.schedstat_fds[tid] = fd
+                # Laufzeit, Wartezeit in der Run-Queue (beide ns) und Anzahl der Zeitscheiben
+                _, wait, slices = os.pread(fd, 128, 0).split()
+            except (OSError, ValueError):
+                # Der Thread ist zwischen cgroup.threads und schedstat beendet worden
+                continue
+            schedstat[tid] = (int(wait), int(slices))
+            last_wait, last_slices = self.last_schedstat.get(tid, (0, 0))
+            wait_ns += int(wait) - last_wait
+            timeslices += int(slices) - last_slices
+
+        # Dateien beendeter Threads schließen
+        for tid in set(self.schedstat_fds) - set(schedstat):
+            os.close(self.schedstat_fds.pop(tid))
+        self.last_schedstat = schedstat
+        return wait_ns, timeslices
+
+    # Inhalt von memory.stat in Bytes, None ohne memory.stat
+    def read_memory_stat(self):
+        if self.memory_stat_fd is None:
+            return None
+        memory_stat = {}
+        for line in os.pread(self.memory_stat_fd, 65536, 0).decode().splitlines():
+            key, value = line.split()
+            memory_stat[key] = int(value)
+        return memory_stat
+
+    def read_net_dev(self):
+        net_rx = 0
+        net_tx = 0
+        # Die ersten beiden Zeilen sind Überschriften
+        for line in os.pread(self.net_fd, 65536, 0).decode().splitlines()[2:]:
+            interface, values = line.split(":", 1)
+            if interface.strip() == "lo":
+                continue
+            values = values.split()
+            net_rx += int(values[0])
+            net_tx += int(values[8])
+        return net_rx, net_tx
+
+    def read_io_stat(self):
+        if self.io_fd is None:
+            return None, None
+        blk_read = 0
+        blk_write = 0
+        for line in os.pread(self.io_fd, 65536, 0).decode().splitlines():
+            for field in line.split()[1:]:
+                key, value = field.split("=", 1)
+                if key == "rbytes":
+                    blk_read += int(value)
+                elif key == "wbytes":
+                    blk_write += int(value)
+        return blk_read, blk_write
+
+    # Liefert dieselbe Struktur wie die Docker-API-Auswertung
+    def read(self):
+        cpu_stat = self.read_cpu_stat()
+        now_ns = time.monotonic_ns()
+        memory = int(os.pread(self.memory_fd, 64, 0))
+        pids = int(os.pread(self.pids_fd, 64, 0))
+        net_rx, net_tx = self.read_net_dev()
+        blk_read, blk_write = self.read_io_stat()
+        wait_ns, timeslices = self.read_schedstat()
+        memory_stat = self.read_memory_stat()
+
+        # CPU in Prozent eines Kerns, wie bei docker stats
+        elapsed_usec = (now_ns - self.last_time_ns) / 1000
+        delta = {key: value - self.last_cpu_stat.get(key, 0) for key, value in cpu_stat.items()}
+        cpu = 0.0
+        if elapsed_usec > 0:
+            cpu = delta["usage_usec"] / elapsed_usec * 100
+        self.last_cpu_stat = cpu_stat
+        self.last_time_ns = now_ns
+
+        # Drosselung durch das CPU-Limit: Anteil der gedrosselten CFS-Perioden und gedrosselte Zeit in ms pro Sekunde
+        throttle_ratio = None
+        throttled = None
+        if all(key in cpu_stat for key in THROTTLE_KEYS) and elapsed_usec > 0:
+            throttle_ratio = delta["nr_throttled"] / delta["nr_periods"] if delta["nr_periods"] > 0 else 0.0
+            throttled = delta["throttled_usec"] / elapsed_usec * 1000
+
+        # Run-Queue: mittlere Anzahl wartender Threads und mittlere Wartezeit pro Zeitscheibe in ms
+        runqueue_wait = None
+        sched_delay = None
+        if wait_ns is not None and elapsed_usec > 0:
+            runqueue_wait = wait_ns / 1000 / elapsed_usec
+            sched_delay = wait_ns / timeslices / 1e6 if timeslices > 0 else 0.0
+
+        # Speicher ohne inaktiven Page-Cache wie bei docker stats und dockerApi.parse_stats
+        memory_anon = memory_file = memory_kernel = None
+        if memory_stat is not None:
+            memory -= memory_stat.get("inactive_file", 0)
+            memory_anon, memory_file, memory_kernel = memory_breakdown(memory_stat)
+
+        return {
+            "CPU": round(cpu, 2),
+            "Memory": memory / (1024 * 1024),
+            "PIDs": pids,
+            "NetRx": net_rx,
+            "NetTx": net_tx,
+            "BlkRead": blk_read,
+            "BlkWrite": blk_write,
+            "ThrottleRatio": throttle_ratio,
+            "Throttled": throttled,
+            "RunqueueWait": runqueue_wait,
+            "SchedDelay": sched_delay,
+            "MemAnon": memory_anon,
+            "MemFile": memory_file,
+            "MemKernel": memory_kernel
+        }
+
+    def close(self):
+        for fd in (self.cpu_stat_fd, self.memory_fd, self.pids_fd, self.net_fd, self.io_fd, self.threads_fd, self.memory_stat_fd):
+            if fd is not None:
+                os.close(fd)
+        for fd in self.schedstat_fds.values():
+            os.close(fd)
@@ -0,0 +1,117 @@
+import inspect
+import json
+import subprocess
+import threading
+import time
+
+
+# Startet docker events für einen Container, gefiltert auf Start und Ende.
+# --since sorgt dafür, dass keine Events zwischen Aufruf und Verbindungsaufbau verloren gehen.
+def start_docker_events(container_name):
+    return subprocess.Popen(
+        ["docker", "events",
+         "--since", f"{time.time():.3f}",
+         "--filter", f"container={container_name}",
+         "--filter", "event=start",
+         "--filter", "event=die",
+         "--format", "{{json .}}"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        bufsize=1
+    )
+
+
+# Zeitpunkt eines Events mit Nanosekunden, sonst der Empfang
+def event_time(event):
+    if "timeNano" in event:
+        return int(event["timeNano"]) / 1e9
+    return time.time()
+
+
+# Wartet im Hintergrund auf das "start"- und "die"-Event eines Containers.
+# source ist eine beliebige Folge von Events (JSON-Zeilen oder Dicts),
+# ohne Angabe wird docker events abonniert. close() beendet docker events bzw. eine
+# Quelle mit eigenem close() wie dockerApi.DockerStream.
+class ContainerExitWatcher:
+
+    def __init__(self, container_name, source=None):
+        self.container_name = container_name
+        self.exited = threading.Event()
+        self.exit_code = None
+        self.finished_at = None  # Zeitpunkt des "die"-Events (time.time()-Basis)
+        self.started = threading.Event()
+        self.started_at = None  # Zeitpunkt des "start"-Events (time.time()-Basis)
+
+        self.process = None
+        if source is None:
+            self.process = start_docker_events(container_name)
+            source = self.process.stdout
+        self.source = source
+
+        self.thread = threading.Thread(target=self.consume, args=(source,), daemon=True)
+        self.thread.start()
+
+    def consume(self, source):
+        try:
+            for event in source:
+                if isinstance(event, str):
+                    event = event.strip()
+                    if not event:
+                        continue
+                    try:
+                        event = json.loads(event)
+                    except ValueError:
+                        continue
+                if self.handle_event(event):
+                    break
+        except (OSError, ValueError):
+            # Der Event-Stream wurde geschlossen
+            pass
+
+    def handle_event(self, event):
+        if event.get("Type", "container") != "container":
+            return False
+        attributes = event.get("Actor", {}).get("Attributes", {})
+        if attributes.get("name", self.container_name) != self.container_name:
+            return False
+
+        action = event.get("Action", event.get("status"))
+        if action == "start":
+            self.started_at = event_time(event)
+            self.started.set()
+            return False
+        # Ein "die" vor dem Start gehört zu einem alten Container, der ersetzt wird
+        if action != "die" or not self.started.is_set():
+            return False
+
+        self.exit_code = int(attributes.get("exitCode", -1))
+        self.finished_at = event_time(event)
+        self.exited.set()
+        return True
+
+    # True, solange noch Events ankommen können
+    def is_alive(self):
+        return self.exited.is_set() or self.thread.is_alive()
+
+    def wait(self, timeout=None):
+        return self.exited.wait(timeout)
+
+    # Wartet auf den Start, gibt auf, sobald das Event nicht mehr kommen kann oder stop gesetzt ist
+    def wait_started(self, stop=None, poll_interval=0.1):
+        while not self.started.wait(poll_interval):
+            if not self.thread.is_alive() or (stop is not None and stop()):
+                return self.started.is_set()
+        return True
+
+    def close(self, timeout=5):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait()
+            self.process = None
+        elif hasattr(self.source, "close") and not inspect.isgenerator(self.source):
+            # Ein laufender Generator lässt sich nicht aus einem anderen Thread schließen
+            self.source.close()
+        else:
+            return
+        self.thread.join(timeout)
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+# Name des Verzeichnisses, das der Generator im Arbeitsverzeichnis anlegt
+DATASET_DIR_NAME = "bankData"
+
+# Metadaten eines Cache-Eintrags
+ENTRY_FILE = "entry.json"
+
+
+# SHA-256 einer Datei, in Blöcken gelesen
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def directory_size(path):
+    size = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            size += os.lstat(os.path.join(root, name)).st_size
+    return size
+
+
+# Inhaltsadressierter Cache für generierte Datensätze. Der Schlüssel ergibt sich aus
+# den Generator-Parametern, dem Seed und dem Hash der Generator-jar, jeder Eintrag
+# liegt unter <cache_dir>/<schlüssel>/bankData. Einträge werden nach Alter und
+# Gesamtgröße verdrängt, zuletzt benutzte zuletzt.
+class DatasetCache:
+
+    def __init__(self, cache_dir, max_bytes=None, max_age=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age  # Sekunden seit der letzten Benutzung
+        self.jar_hashes = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # Der Hash der jar wird nur neu berechnet, wenn sich Größe oder Änderungszeit ändern
+    def jar_hash(self, jar_path):
+        stat = os.stat(jar_path)
+        signature = (os.path.abspath(jar_path), stat.st_size, stat.st_mtime_ns)
+        if signature not in self.jar_hashes:
+            self.jar_hashes[signature] = file_hash(jar_path)
+        return self.jar_hashes[signature]
+
+    def key(self, jar_path, parameters, seed):
+        description = {"jar": self.jar_hash(jar_path), "parameters": parameters, "seed": seed}
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()[:32]
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def read_entry(self, key):
+        try:
+            with open(os.path.join(self.entry_path(key), ENTRY_FILE), "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def write_entry(self, key, entry):
+        path = os.path.join(self.entry_path(key), ENTRY_FILE)
+        with open(path + ".tmp", "w") as file:
+            json.dump(entry, file)
+        os.replace(path + ".tmp", path)
+
+    # Liefert das Datensatz-Verzeichnis zu den Parametern. Bei einem Fehlschlag wird
+    # der Generator in einem temporären Verzeichnis ausgeführt und das Ergebnis
+    # erst danach in den Cache verschoben, ein abgebrochener Lauf hinterlässt nichts.
+    def get(self, jar_path, arguments, seed=None):
+        key = self.key(jar_path, list(arguments), seed)
+        entry = self.read_entry(key)
+        dataset_path = os.path.join(self.entry_path(key), DATASET_DIR_NAME)
+
+        if entry is not None and os.path.isdir(dataset_path):
+            print(f"Dataset cache hit: {key}")
+        else:
+            print(f"Dataset cache miss: {key}, generating data")
+            shutil.rmtree(self.entry_path(key), ignore_errors=True)
+            with tempfile.TemporaryDirectory(dir=self.cache_dir, prefix=".generate-") as work_dir:
+                subprocess.run(
+                    ["java", "-jar", os.path.abspath(jar_path)] + [str(argument) for argument in arguments],
+                    cwd=work_dir,
+                    capture_output=True,
+                    text=True,
+                    check=True
+                )
+                generated = os.path.join(work_dir, DATASET_DIR_NAME)
+                if not os.path.isdir(generated):
+                    raise FileNotFoundError(f"Generator did not create {DATASET_DIR_NAME}")
+                os.makedirs(self.entry_path(key))
+                os.replace(generated, dataset_path)
+            entry = {
+                "arguments": [str(argument) for argument in arguments],
+                "seed": seed,
+                "created": time.time(),
+                "size": directory_size(dataset_path)
+            }
+
+        entry["last_used"] = time.time()
+        self.write_entry(key, entry)
+        self.evict(keep=key)
+        return dataset_path
+
+    # Verdrängt zuerst zu alte Einträge, dann die am längsten unbenutzten,
+    # bis die Gesamtgröße unter max_bytes liegt. keep wird nie verdrängt.
+    def evict(self, keep=None):
+        now = time.time()
+        entries = []
+        for key in os.listdir(self.cache_dir):
+            if key.startswith("."):
+                continue
+            entry = self.read_entry(key)
+            if entry is None:
+                # Reste eines abgebrochenen Eintrags
+                if key != keep:
+                    shutil.rmtree(self.entry_path(key), ignore_errors=True)
+                continue
+            entries.append((entry.get("last_used", 0), key, entry.get("size", 0)))
+
+        entries.sort()
+        total = sum(size for _, _, size in entries)
+        for last_used, key, size in entries:
+            if key == keep:
+                continue
+            too_old = self.max_age is not None and now - last_used > self.max_age
+            too_large = self.max_bytes is not None and total > self.max_bytes
+            if too_old or too_large:
+                shutil.rmtree(self.entry_path(key), ignore_errors=True)
+                total -= size
+                print(f"Dataset cache evicted: {key}")
+
+
+# Stellt einen Datensatz unter target bereit, ohne ihn zu kopieren: jede Datei wird
+# hart verlinkt, nur über Dateisystemgrenzen hinweg wird kopiert. Der Container
+# darf die Dateien daher nicht an Ort und Stelle verändern.
+def link_dataset(dataset_path, target):
+    if os.path.islink(target) or os.path.isfile(target):
+        os.remove(target)
+    elif os.path.isdir(target):
+        shutil.rmtree(target)
+
+    for root, dirs, files in os.walk(dataset_path):
+        relative = os.path.relpath(root, dataset_path)
+        os.makedirs(os.path.join(target, relative), exist_ok=True)
+        for name in files:
+            source = os.path.join(root, name)
+            destination = os.path.join(target, relative, name)
+            try:
+                os.link(source, destination)
+            except OSError:
+                shutil.copy2(source, destination)
@@ -0,0 +1,219 @@
+import http.client
+import json
+import socket
+import threading
+import time
+import urllib.parse
+
+from cgroupSampler import memory_breakdown
+
+# Socket des Docker-Daemons
+DOCKER_SOCKET = "/var/run/docker.sock"
+
+
+class DockerApiError(Exception):
+    pass
+
+
+# HTTP-Verbindung über einen Unix-Socket statt über TCP
+class UnixHTTPConnection(http.client.HTTPConnection):
+
+    def __init__(self, socket_path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+# Ein Stream der Engine API (stats, events) über eine eigene Verbindung, liefert die JSON-Objekte
+# Zeile für Zeile, mit transform umgewandelt. close() beendet ihn auch aus einem anderen Thread:
+# Das Herunterfahren des Sockets weckt den wartenden Leser, der Stream endet dann ohne Fehler.
+class DockerStream:
+
+    def __init__(self, socket_path, path, transform=None):
+        self.path = path
+        self.transform = transform
+        self.connection = UnixHTTPConnection(socket_path)
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def __iter__(self):
+        try:
+            with self.lock:
+                if self.closed:
+                    return
+                self.connection.request("GET", self.path)
+            response = self.connection.getresponse()
+            if response.status >= 400:
+                raise DockerApiError(f"GET {self.path} failed with status {response.status}: {response.read().decode(errors='replace').strip()}")
+            for line in response:
+                line = line.strip()
+                if line:
+                    raw = json.loads(line)
+                    yield self.transform(raw) if self.transform else raw
+        except (OSError, http.client.HTTPException):
+            if not self.closed:
+                raise
+        finally:
+            self.connection.close()
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            if self.connection.sock is not None:
+                try:
+                    self.connection.sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+
+# Wandelt einen Eintrag von /containers/{id}/stats in numerische Werte um
+def parse_stats(raw):
+    cpu_stats = raw.get("cpu_stats", {})
+    precpu_stats = raw.get("precpu_stats", {})
+
+    # CPU in Prozent eines Kerns, gleiche Berechnung wie docker stats
+    cpu_delta = cpu_stats.get("cpu_usage", {}).get("total_usage", 0) - precpu_stats.get("cpu_usage", {}).get("total_usage", 0)
+    system_delta = cpu_stats.get("system_cpu_usage", 0) - precpu_stats.get("system_cpu_usage", 0)
+    online_cpus = cpu_stats.get("online_cpus") or len(cpu_stats.get("cpu_usage", {}).get("percpu_usage") or []) or 1
+    cpu = 0.0
+    if cpu_delta > 0 and system_delta > 0:
+        cpu = cpu_delta / system_delta * online_cpus * 100
+
+    # Anteil der gedrosselten CFS-Perioden seit dem vorherigen Wert, fehlt ohne CPU-Limit
+    throttle_ratio = None
+    throttling = cpu_stats.get("throttling_data", {})
+    prethrottling = precpu_stats.get("throttling_data", {})
+    periods = throttling.get("periods", 0) - prethrottling.get("periods", 0)
+    if periods > 0:
+        throttle_ratio = (throttling.get("throttled_periods", 0) - prethrottling.get("throttled_periods", 0)) / periods
+
+    # Speicher ohne inaktiven Page-Cache, wie docker stats (cgroup v2 bzw. v1)
+    memory_stats = raw.get("memory_stats", {})
+    memory = memory_stats.get("usage", 0)
+    inner_stats = memory_stats.get("stats", {})
+    memory -= inner_stats.get("inactive_file", inner_stats.get("total_inactive_file", 0))
+
+    # Aufteilung des Speichers nur bei cgroup v2, dort stehen anon, file und kernel in memory_stats.stats
+    memory_anon = memory_file = memory_kernel = None
+    if "anon" in inner_stats:
+        memory_anon, memory_file, memory_kernel = memory_breakdown(inner_stats)
+
+    net_rx = 0
+    net_tx = 0
+    for network in (raw.get("networks") or {}).values():
+        net_rx += network.get("rx_bytes", 0)
+        net_tx += network.get("tx_bytes", 0)
+
+    blk_read = 0
+    blk_write = 0
+    for entry in (raw.get("blkio_stats", {}).get("io_service_bytes_recursive") or []):
+        op = entry.get("op", "").lower()
+        if op == "read":
+            blk_read += entry.get("value", 0)
+        elif op == "write":
+            blk_write += entry.get("value", 0)
+
+    return {
+        "CPU": round(cpu, 2),
+        "Memory": max(memory, 0) / (1024 * 1024),
+        "PIDs": raw.get("pids_stats", {}).get("current", 0),
+        "NetRx": net_rx,
+        "NetTx": net_tx,
+        "BlkRead": blk_read,
+        "BlkWrite": blk_write,
+        "ThrottleRatio": throttle_ratio,
+        "MemAnon": memory_anon,
+        "MemFile": memory_file,
+        "MemKernel": memory_kernel
+    }
+
+
+# Kleiner Client für die Docker Engine API.
+# Einfache Anfragen laufen über eine dauerhafte Keep-Alive-Verbindung,
+# jeder Stream (stats, events) belegt eine eigene Verbindung, die DockerStream.close() freigibt.
+class DockerClient:
+
+    def __init__(self, socket_path=DOCKER_SOCKET):
+        self.socket_path = socket_path
+        self.connection = UnixHTTPConnection(socket_path)
+        self.lock = threading.Lock()
+
+    def get_json(self, path):
+        with self.lock:
+            try:
+                self.connection.request("GET", path)
+                response = self.connection.getresponse()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # Der Daemon hat die Keep-Alive-Verbindung geschlossen, einmal neu verbinden
+                self.connection.close()
+                self.connection.request("GET", path)
+                response = self.connection.getresponse()
+            body = response.read()
+
+        if response.status >= 400:
+            raise DockerApiError(f"GET {path} failed with status {response.status}: {body.decode(errors='replace').strip()}")
+        return json.loads(body)
+
+    # Stream der JSON-Objekte von path, die Verbindung wird erst beim Iterieren aufgebaut
+    def stream(self, path, transform=None):
+        return DockerStream(self.socket_path, path, transform)
+
+    def inspect(self, container):
+        return self.get_json(f"/containers/{urllib.parse.quote(container)}/json")
+
+    def stats(self, container):
+        return self.stream(f"/containers/{urllib.parse.quote(container)}/stats?stream=true", parse_stats)
+
+    # Lifecycle-Events eines Containers, direkt als Quelle für ContainerExitWatcher verwendbar
+    def events(self, container, since=None):
+        filters = json.dumps({"container": [container], "event": ["start", "die"]})
+        since = since if since is not None else time.time()
+        return self.stream(f"/events?since={since:.3f}&filters={urllib.parse.quote(filters)}")
+
+    def close(self):
+        self.connection.close()
+
+
+# Liest die Stats-Streams mehrerer Container gleichzeitig und hält den jeweils neuesten Wert.
+# close() beendet die Streams und gibt ihre Verbindungen frei.
+class StatsStreamer:
+
+    def __init__(self, client, containers):
+        self.client = client
+        self.latest = {}
+        self.updated = threading.Condition()
+        self.streams = {container: client.stats(container) for container in containers}
+        self.threads = []
+        for container in containers:
+            thread = threading.Thread(target=self.consume, args=(container,), daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def consume(self, container):
+        try:
+            for sample in self.streams[container]:
+                with self.updated:
+                    self.latest[container] = sample
+                    self.updated.notify_all()
+        except (OSError, ValueError, DockerApiError) as e:
+            print(f"Stats stream for {container} ended: {e}")
+
+    # Wartet auf den nächsten Wert von container und liefert dann alle aktuellen Werte,
+    # None wenn innerhalb von timeout kein neuer Wert kam
+    def wait_for_update(self, container, timeout=None):
+        with self.updated:
+            previous = self.latest.get(container)
+            if not self.updated.wait_for(lambda: self.latest.get(container) is not previous, timeout):
+                return None
+            return dict(self.latest)
+
+    def close(self, timeout=5):
+        for stream in self.streams.values():
+            stream.close()
+        for thread in self.threads:
+            thread.join(timeout)
@@ -2,9 +2,38 @@ import subprocess
 import time
 import os
 import csv
+import math
+import shutil
+import sys
+import threading
 import yaml
 import numpy as np
 
+# Die gemeinsamen Module beider Benchmarks liegen im Paket harness neben diesem Ordner
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from harness.cpuScheduler import CpuSetAllocator, CpuSetUsage, ExperimentScheduler
+from harness.gcLog import GC_COLUMNS, GC_METRICS, GO_GC_LOGGING, JVM_GC_LOGGING, GcLogParser
+from harness.hostNoise import CONTAINER_RUNTIME, HostNoiseSampler, ProcessCpuUsage, available, interference_score, noisy_components, process_cgroup, quarantine
+from harness.kernelCounters import COUNTER_COLUMNS, KernelCounterCollector
+from harness.memoryStats import SMAPS_COLUMNS, SmapsCollector
+from harness.outputPump import OutputPump
+from harness.quantileSketch import SketchSink
+from harness.repetitionController import RepetitionController
+from harness.resultsStore import ResultsSink, ResultsStore
+from harness.sampleStore import ColumnFileSink, CsvSink, SampleStore
+from harness.sweepManifest import SweepManifest
+from harness.threadStats import THREAD_COLUMNS, ThreadStatsCollector
+
+from cgroupSampler import CgroupProcs, CgroupSampler, container_pid, process_cgroup_path, resolve_cgroup_path
+from containerEvents import ContainerExitWatcher
+from datasetCache import DatasetCache, link_dataset
+from dockerApi import DockerApiError, DockerClient, StatsStreamer
+from pgConnection import DATABASE_ERRORS, PgSession
+from pgSampler import PG_COLUMNS, PgStatsSampler
+from sweepDefinition import CPUS_AXIS, load_sweep, read_cpu_limits
+from throughputSampler import ThroughputSampler
+
 # Parameter, die konstant bleiben
 ALGORITHMS = ["platform", "virtual", "coroutines", "goroutines"]
 INTERFACE_TYPE = "SQL" #"REST", "SQL"
@@ -13,15 +42,148 @@ NUMBER_OF_ACCOUNTS = "1000"
 NUMBER_OF_TRANSACTIONS = "100000"
 DELAY_TRANSACTION = 0.1
 
+# Sweep über beliebige Umgebungsvariablen des Bank-Dienstes und das CPU-Limit aus einer YAML-Datei
+# (z. B. "sweep_contention.yaml"), None für den Sweep über DELAY_TRANSACTION von 0.01 bis DELAY_TRANSACTION
+SWEEP_FILE = None
+
+# Messwerte direkt aus der cgroup lesen ("cgroup"), über die Docker Engine API streamen ("api")
+# oder über docker stats abfragen ("docker")
+SAMPLER_BACKEND = "cgroup"
+SAMPLE_INTERVAL = 0.1  # Sekunden zwischen zwei Messpunkten beim cgroup-Backend
+STATUS_INTERVAL = 5.0  # Sekunden zwischen zwei Statusausgaben während der Messung
+# CPU pro Thread, Thread-Wechsel und ausgelastete Threads des Bank-Prozesses aus /proc/<pid>/task/*/stat,
+# die Summen pro Thread landen in <run_dir>/threads.csv
+THREAD_STATS = True
+# Kontextwechsel, Seitenfehler und I/O des Bank-Prozesses pro Messpunkt als Differenzen aus /proc
+KERNEL_COUNTERS = True
+# PSS, USS und anonymer bzw. dateibasierter Speicher des Bank-Prozesses aus /proc/<pid>/smaps_rollup. Die
+# Speicherangabe von Docker enthält den Page-Cache, anonymer Speicher und USS zeigen den Arbeitsspeicher.
+# smaps_rollup wird mit adaptiver Rate gelesen, höchstens SMAPS_BUDGET der Zeit entfällt auf das Lesen.
+MEMORY_DETAIL = True
+SMAPS_BUDGET = 0.01
+SMAPS_MAX_INTERVAL = 5.0  # Sekunden
+EXPORT_CSV = False  # Messwerte zusätzlich an measurement_log_<alg>.csv anhängen
+
+# GC-Logging auf Wunsch: -Xlog:gc* über JAVA_TOOL_OPTIONS für die JVM, GODEBUG=gctrace=1 für Go. Die Ausgabe
+# wird während des Laufs ausgewertet (harness/gcLog.py), pro Messpunkt Pausenzeit, CPU-Zeit der Speicherbereinigung
+# und Heap danach, jede Bereinigung in <run_dir>/gc_events.csv und die Summen aus GC_METRICS ins Ergebnis.
+GC_LOGGING = False
+
+# Generierte Datensätze werden pro (Parameter, Seed, jar-Hash) nur einmal erzeugt
+DATASET_SEED = "1"  # Änderung erzwingt einen neuen Datensatz
+DATASET_CACHE_MAX_BYTES = 10 * 1024 ** 3
+DATASET_CACHE_MAX_AGE = 14 * 24 * 3600  # Sekunden seit der letzten Benutzung
+
+# Postgres (und PostgREST) laufen über den ganzen Sweep, zwischen zwei Läufen wird nur
+# die Tabelle account auf den Stand nach dem Import zurückgesetzt und der Bank-Container neu gestartet
+WARM_POSTGRES = True
+DATABASE_READY_TIMEOUT = 120  # Sekunden
+
+# Jeder Container bekommt ein eigenes CPU-Set in der Größe seiner Reservierung aus der Vorlage.
+# Die Läufe teilen sich Postgres, feste Container-Namen und docker-compose_modify.yaml,
+# deshalb läuft immer nur ein Bank-Lauf gleichzeitig.
+PIN_CPUSETS = True
+HARNESS_CPUS = 1  # CPUs für das Harness selbst, werden nie an Container vergeben
+MAX_REQUEUES = 2
+
+# Störungen auf dem Host werden über den ganzen Sweep gemessen (harness/hostNoise.py). Ein Lauf, dessen Störungswert
+# (Steal, CPU außerhalb der cgroups von Harness und Containern und außerhalb von dockerd, containerd und
+# den Shims, Speicher-Stalls, thermische Drosselung oder
+# fremde Last auf den Bank-CPUs, jeweils als Anteil) INTERFERENCE_THRESHOLD übersteigt, kommt in Quarantäne:
+# Seine Messwerte bleiben erhalten, er zählt nicht als Wiederholung und fehlt in den Aggregaten.
+# RERUN_NOISY_RUNS reiht den Messpunkt erneut ein.
+HOST_NOISE = True
+HOST_NOISE_INTERVAL = 0.5  # Sekunden zwischen zwei Zeilen in measurements/host_noise.csv
+INTERFERENCE_THRESHOLD = 0.05
+RERUN_NOISY_RUNS = True
+
+# Jeder Messpunkt wird wiederholt, bis das 95-%-Konfidenzintervall von CI_METRIC
+# ("execution_time" oder eine Spalte der Messwerte, z. B. "cpu_usage") relativ zum
+# Mittelwert schmaler als CI_TARGET_WIDTH ist oder MAX_REPETITIONS erreicht sind
+CI_METRIC = "execution_time"
+CI_TARGET_WIDTH = 0.05
+MIN_REPETITIONS = 3
+MAX_REPETITIONS = 10
+
+# Durchsatz: Fortschrittszeilen der Bank als regulärer Ausdruck mit einer Gruppe "count" (Gesamtzahl
+# abgeschlossener Transaktionen), None, solange die Bank keine ausgibt. Dann wird der Commit-Zähler
+# von Postgres höchstens alle THROUGHPUT_INTERVAL Sekunden abgefragt.
+PROGRESS_PATTERN = None
+THROUGHPUT_INTERVAL = 1.0
+# Zusätzlich pro Wiederholung ins Zeit-Log: CPU-Sekunden der Bank pro 1000 Transaktionen
+EFFICIENCY_METRICS = ["cpu_per_1k_transactions"]
+
+# Startphase vom Aufruf von docker-compose bis "File imported.", pro Wiederholung auch ins Zeit-Log:
+# Sekunden bis zum Start des Bank-Containers, bis zu seiner ersten Ausgabe und bis zum Ende des Imports,
+# CPU-Sekunden und maximaler Arbeitsspeicher (MB) der Phase. Ende des Imports bis Exit ist die Ausführungszeit.
+STARTUP_METRICS = ["time_to_container_start", "time_to_first_output", "time_to_ready", "startup_cpu_seconds", "startup_peak_memory"]
+# docker-compose stellt jeder Zeile des Bank-Dienstes seinen Namen voran ("bank-1  | ..." bzw. "bank_1  | ...")
+BANK_OUTPUT_PREFIX = "bank"
+
+# Wartezustände, Sperren und Zähler von Postgres (pgSampler.PG_COLUMNS), Sekunden zwischen zwei Abfragen
+PG_STATS_INTERVAL = 0.5
+
+# Spalten des Sample-Stores und ihre array-Typecodes
+SAMPLE_COLUMNS = [
+    ("point", "d"),  # Index des Messpunkts im Sweep
+    ("timestamp", "d"),
+    ("cpu_usage", "d"),
+    ("memory_usage", "d"),
+    ("num_threads", "q"),
+    ("postgres_cpu", "d"),
+    ("net_rx", "d"),
+    ("net_tx", "d"),
+    ("blk_read", "d"),
+    ("blk_write", "d"),
+    ("transactions", "d"),
+    ("throughput", "d"),
+    # Drosselung durch das CPU-Limit und Run-Queue-Wartezeit, nur beim cgroup-Backend (Drosselung auch beim API-Backend)
+    ("cpu_throttle_ratio", "d"),  # Anteil der CFS-Perioden, in denen die Bank gedrosselt wurde
+    ("cpu_throttled", "d"),  # gedrosselte Zeit der Bank in ms pro Sekunde
+    ("runqueue_wait", "d"),  # mittlere Anzahl der Bank-Threads, die auf eine CPU warten
+    ("sched_delay", "d"),  # mittlere Wartezeit der Bank-Threads pro Zeitscheibe in ms
+    ("postgres_throttle_ratio", "d"),
+    ("postgres_sched_delay", "d"),
+    # Aufteilung des Speichers der Bank-cgroup aus memory.stat in MB, nicht beim docker-stats-Backend
+    ("memory_cgroup_anon", "d"),
+    ("memory_cgroup_file", "d"),  # Page-Cache
+    ("memory_cgroup_kernel", "d"),
+] + PG_COLUMNS + THREAD_COLUMNS + COUNTER_COLUMNS + SMAPS_COLUMNS + GC_COLUMNS
+
+# Spalten von measurement_log_<alg>.csv wie bisher, delay ist die Verzögerung des Messpunkts.
+# Die weiteren Messreihen stehen nur in den Spaltendateien und der Ergebnisdatenbank.
+CSV_HEADER = ['delay', 'timestamp', 'cpu_usage', 'memory_usage', 'num_threads', 'postgres_cpu']
+
 # Verzeichnisse für die Dateien
 MEASUREMENTS_DIR = os.path.join(os.getcwd(), "measurements")
-
-def run_bank_data_generator(number_of_accounts, number_of_transactions):
+LOGS_DIR = os.path.join(MEASUREMENTS_DIR, "logs")
+SAMPLES_DIR = os.path.join(MEASUREMENTS_DIR, "samples")
+RESULTS_DB = os.path.join(MEASUREMENTS_DIR, "results.db")
+MANIFEST_FILE = os.path.join(MEASUREMENTS_DIR, "sweep_manifest.json")
+NOISE_LOG = os.path.join(MEASUREMENTS_DIR, "host_noise.csv")
+TIME_LOG = os.path.join(MEASUREMENTS_DIR, "measurement_log_time.csv")
+DATASET_CACHE_DIR = os.path.join(os.getcwd(), "dataset_cache")
+
+def run_bank_data_generator(number_of_accounts, number_of_transactions, cache):
     jar_path = "./bankDataGenerator.jar"
-    subprocess.run(["java", "-jar", jar_path, number_of_accounts, number_of_transactions], capture_output=True, text=True)
+    # Nur bei einem Fehlschlag im Cache läuft der Generator, sonst wird ./bankData verlinkt
+    dataset_path = cache.get(jar_path, [number_of_accounts, number_of_transactions], DATASET_SEED)
+    link_dataset(dataset_path, "./bankData")
     print("Data generateted")
 
-def modify_docker_compose_file(algorithm, interface, number_of_accounts, number_of_transactions, delay_transaction):
+# CPU- und Speicherreservierung eines Dienstes aus der Compose-Vorlage, (CPUs, MB)
+def read_reservation(interface, service):
+    with open(f"docker-compose_template{interface}.yaml", "r") as file:
+        data = yaml.safe_load(file)
+    resources = data["services"][service].get("deploy", {}).get("resources", {})
+    reservation = resources.get("reservations") or resources.get("limits") or {}
+    cpus = math.ceil(float(reservation.get("cpus", 0)))
+    memory = str(reservation.get("memory", "0"))
+    units = {"K": 1 / 1024, "M": 1, "G": 1024}
+    memory_mb = float(memory[:-1]) * units[memory[-1].upper()] if memory[-1].upper() in units else float(memory) / (1024 * 1024)
+    return cpus, int(memory_mb)
+
+def modify_docker_compose_file(algorithm, interface, number_of_accounts, number_of_transactions, delay_transaction, cpusets=None, environment=None):
     # Lese den Inhalt der Vorlage
     docker_compse_file = ""
     if interface == "REST":
@@ -72,80 +234,263 @@ def modify_docker_compose_file(algorithm, interface, number_of_accounts, number_
     data["services"]["bank"]["environment"]["NUMBER_OF_TRANSACTIONS"] = number_of_transactions
     data["services"]["bank"]["environment"]["DELAY_TRANSACTION"] = str(delay_transaction)
 
+    # Protokoll der Speicherbereinigung auf der Ausgabe des Containers
+    if GC_LOGGING:
+        if data["services"]["bank"]["image"] == "bank-go":
+            data["services"]["bank"]["environment"]["GODEBUG"] = GO_GC_LOGGING
+        else:
+            data["services"]["bank"]["environment"]["JAVA_TOOL_OPTIONS"] = JVM_GC_LOGGING
+
+    # Weitere Achsen des Sweeps: Umgebungsvariablen des Bank-Dienstes und das CPU-Limit
+    for name, value in (environment or {}).items():
+        if name == CPUS_AXIS:
+            resources = data["services"]["bank"].setdefault("deploy", {}).setdefault("resources", {})
+            resources.setdefault("limits", {})["cpus"] = str(value)
+            resources.setdefault("reservations", {})["cpus"] = str(value)
+        else:
+            data["services"]["bank"]["environment"][name] = str(value)
+
+    # Feste CPU-Sets pro Dienst, zusätzlich zu den Reservierungen der Vorlage
+    for service, cpuset in (cpusets or {}).items():
+        data["services"][service]["cpuset"] = cpuset
+
     # Schreibe die aktualisierten Daten in die Datei
     with open("docker-compose_modify.yaml", "w") as file:
         yaml.dump(data, file, default_flow_style=False)
 
     print("Docker-Compose-Datei was modified successfully.")
 
-# Funktion zum Aufzeichnen von CPU-, Speicher- und PIDs-Statistiken
-def record_process_stats(service_name, writer, transactions):
+# Startet Postgres (bei REST zusätzlich PostgREST) einmalig für den ganzen Sweep und wartet,
+# bis die Datenbank über TCP erreichbar ist. Statt des 10-s-Healthchecks wird pg_isready kurz
+# hintereinander abgefragt, der Server des Init-Skripts lauscht noch nicht auf TCP.
+def start_database_services(interface, cpusets=None):
+    services = ["postgres", "postgrest"] if interface == "REST" else ["postgres"]
+    subprocess.run(["docker-compose", "-f", f"docker-compose_template{interface}.yaml", "up", "-d"] + services,
+                   capture_output=True, text=True, check=True)
+    # Die Vorlage bleibt unverändert, die CPU-Sets werden am laufenden Container gesetzt
+    for service, cpuset in (cpusets or {}).items():
+        subprocess.run(["docker", "update", "--cpuset-cpus", cpuset, service], capture_output=True, text=True, check=True)
+
+    deadline = time.monotonic() + DATABASE_READY_TIMEOUT
+    while subprocess.run(["docker", "exec", "postgres", "pg_isready", "-h", "localhost", "-U", "myuser"],
+                         capture_output=True).returncode != 0:
+        if time.monotonic() > deadline:
+            raise TimeoutError("Postgres did not become ready")
+        time.sleep(0.2)
+
+    session = PgSession()
+    session.query("SELECT 1 FROM account LIMIT 0")
+    print("Database services are running.")
+    return session
+
+# Name der Sicherung der Tabelle account nach dem Import eines Datensatzes
+def snapshot_table(number_of_accounts, number_of_transactions):
+    return f"account_snapshot_{int(number_of_accounts)}_{int(number_of_transactions)}"
+
+# Sichert die Tabelle account direkt nach dem ersten Import eines Datensatzes. Die temporäre
+# Tabelle gehört zur Sitzung des Sweeps und verschwindet mit ihr.
+def save_account_snapshot(session, number_of_accounts, number_of_transactions):
+    name = snapshot_table(number_of_accounts, number_of_transactions)
+    session.query(f"DROP TABLE IF EXISTS {name}")
+    session.query(f"CREATE TEMP TABLE {name} AS SELECT * FROM account")
+
+# Setzt die Tabelle account vor einem Lauf auf die Sicherung nach dem Import zurück und prüft
+# den Stand vor dem Start der Bank. TRUNCATE statt DELETE hinterlässt keine toten Zeilen, vor
+# dem ersten Import eines Datensatzes gibt es noch keine Sicherung und die Tabelle bleibt leer.
+def reset_account_table(session, checksums, number_of_accounts=NUMBER_OF_ACCOUNTS, number_of_transactions=NUMBER_OF_TRANSACTIONS):
+    session.query("TRUNCATE account")
+    if (str(number_of_accounts), str(number_of_transactions)) not in checksums:
+        count = int(session.scalar("SELECT count(*) FROM account"))
+        if count != 0:
+            raise RuntimeError(f"Account table still has {count} rows after reset")
+        return
+    session.query(f"INSERT INTO account SELECT * FROM {snapshot_table(number_of_accounts, number_of_transactions)}")
+    if not verify_account_table(session, checksums, number_of_accounts, number_of_transactions):
+        raise RuntimeError("Account table does not match the imported dataset after reset")
+
+# Prüft nach dem Import bzw. Zurücksetzen, dass die Tabelle genau den generierten Datensatz enthält:
+# Anzahl der Konten und Summe der Kontostände. Überweisungen ändern die Summe nicht, daher stören
+# Überweisungen zwischen Markierung und Anhalten der Bank nicht. Die Summe des ersten Imports gilt als Referenz.
+def verify_account_table(session, checksums, number_of_accounts=NUMBER_OF_ACCOUNTS, number_of_transactions=NUMBER_OF_TRANSACTIONS):
+    count, balance_sum = session.query("SELECT count(*), coalesce(sum(balance), 0) FROM account")[0]
+    if int(count) != int(number_of_accounts):
+        print(f"Account table has {count} rows, expected {number_of_accounts}.")
+        return False
+
+    dataset = (str(number_of_accounts), str(number_of_transactions))
+    reference = checksums.setdefault(dataset, str(balance_sum))
+    if str(balance_sum) != reference:
+        print(f"Account balance sum {balance_sum} differs from the imported dataset ({reference}).")
+        return False
+    return True
+
+# Führt check bei angehaltenem Container aus und liefert sein Ergebnis und die Dauer der Pause in Sekunden,
+# gemessen von der Rückkehr von docker pause bis zur Rückkehr von docker unpause. Schlägt eines der beiden
+# fehl, wird ein RuntimeError ausgelöst: die Prüfung lief dann bei laufender Bank bzw. die Bank steht still.
+def run_paused(container, check):
+    result = subprocess.run(["docker", "pause", container], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"docker pause {container} failed: {result.stderr.strip()}")
+    paused_at = time.monotonic()
+    try:
+        value = check()
+    finally:
+        result = subprocess.run(["docker", "unpause", container], capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"docker unpause {container} failed: {result.stderr.strip()}")
+    return value, time.monotonic() - paused_at
+
+# Liest CPU, Speicher und PIDs aller Container über docker stats (Fallback)
+def read_docker_stats(containers_to_check):
+    # Aufruf von docker stats
+    result = subprocess.run(
+        ["docker", "stats", "--no-stream", "--format", 
+        "{{.Name}},{{.CPUPerc}},{{.MemUsage}},{{.PIDs}}"],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    # Verarbeitung der Ausgabe
+    all_stats = result.stdout.strip().splitlines()
+    filtered_stats = {}
+
+    for line in all_stats:
+        # Teile die Ausgabe in Name, CPU, Mem und PIDs
+        name, cpu, mem, pids = line.split(",", 3)
+        if name in containers_to_check:
+            filtered_stats[name] = {
+                "CPU": float(cpu.strip('%')),
+                "Memory": mem.split('/')[0].strip().upper(),
+                "PIDs": int(pids.strip())
+            }
+            if "MIB" in filtered_stats[name]["Memory"]:
+                filtered_stats[name]["Memory"] = float(filtered_stats[name]["Memory"].replace("MIB", "").strip())
+            elif "GIB" in filtered_stats[name]["Memory"]:
+                filtered_stats[name]["Memory"] = float(filtered_stats[name]["Memory"].replace("GIB", "").strip()) * 1024
+
+    return filtered_stats
+
+# Legt für jeden Container einen cgroup-Sampler an, None wenn das nicht möglich ist
+def create_cgroup_samplers(containers_to_check):
+    samplers = {}
+    try:
+        for name in containers_to_check:
+            samplers[name] = CgroupSampler(name)
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
+        print(f"cgroup sampler not available ({e}), falling back to docker stats.")
+        for sampler in samplers.values():
+            sampler.close()
+        return None
+    return samplers
+
+# Liefert den Exit-Code eines beendeten Containers, None solange er läuft
+def inspect_exit_code(service_name):
+    inspect_result = subprocess.run(
+        ["docker", "inspect", "--format", "{{.State.Status}},{{.State.ExitCode}}", service_name],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    container_status, exit_code = inspect_result.stdout.strip().split(",")
+    if container_status == 'exited':
+        return int(exit_code)
+    return None
+
+# Funktion zum Aufzeichnen von CPU-, Speicher- und PIDs-Statistiken,
+# liefert die CPU-Sekunden des Bank-Containers während der Messung.
+# Die Messung endet mit dem Container oder, falls angegeben, sobald das Event until gesetzt ist.
+def record_process_stats(service_name, store, point_index, watcher, client=None, throughput=None, pg_stats=None, until=None, thread_summary=None, gc=None):
+    # Container-Namen, die abgefragt werden sollen
+    containers_to_check = [service_name, "postgres"]
+
+    samplers = None
+    streamer = None
+    if client is not None:
+        streamer = StatsStreamer(client, containers_to_check)
+    elif SAMPLER_BACKEND == "cgroup":
+        samplers = create_cgroup_samplers(containers_to_check)
+    # Die Collectoren folgen allen Prozessen der cgroup des Bank-Containers, nicht nur dem Hauptprozess
+    pid, procs = bank_processes(service_name, client, samplers) if THREAD_STATS or KERNEL_COUNTERS or MEMORY_DETAIL else (None, None)
+    pids = procs.read() if procs else [pid]
+    threads = ThreadStatsCollector(pids) if pid and THREAD_STATS else None
+    counters = KernelCounterCollector(pids) if pid and KERNEL_COUNTERS else None
+    smaps = SmapsCollector(pids, SMAPS_BUDGET, SAMPLE_INTERVAL, SMAPS_MAX_INTERVAL) if pid and MEMORY_DETAIL else None
+
     start_time = time.time()
+    next_sample = time.monotonic()
+    next_status = next_sample
+    cpu_seconds = 0.0
+    last_sample = next_sample
+    last_thread_sample = next_sample
     while True:
 
-        # Container-Namen, die abgefragt werden sollen
-        containers_to_check = [service_name, "postgres"]
-
         try:
-            # Aufruf von docker stats
-            result = subprocess.run(
-                ["docker", "stats", "--no-stream", "--format", 
-                "{{.Name}},{{.CPUPerc}},{{.MemUsage}},{{.PIDs}}"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-
-            # Verarbeitung der Ausgabe
-            all_stats = result.stdout.strip().splitlines()
-            filtered_stats = {}
-
-            for line in all_stats:
-                # Teile die Ausgabe in Name, CPU, Mem und PIDs
-                name, cpu, mem, pids = line.split(",", 3)
-                if name in containers_to_check:
-                    filtered_stats[name] = {
-                        "CPU": float(cpu.strip('%')),
-                        "Memory": mem.split('/')[0].strip().upper(),
-                        "PIDs": int(pids.strip())
-                    }
-                    if "MIB" in filtered_stats[name]["Memory"]:
-                        filtered_stats[name]["Memory"] = float(filtered_stats[name]["Memory"].replace("MIB", "").strip())
-                    elif "GIB" in filtered_stats[name]["Memory"]:
-                        filtered_stats[name]["Memory"] = float(filtered_stats[name]["Memory"].replace("GIB", "").strip()) * 1024
-
-            # Überprüfe den Container-Status auf 'exited'
-            inspect_result = subprocess.run(
-                ["docker", "inspect", "--format", "{{.State.Status}}", service_name],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-
-            container_status = inspect_result.stdout.strip()
-            if container_status == 'exited':
-                # Überprüfe den Exit-Code
-                exit_code_result = subprocess.run(
-                    ["docker", "inspect", "--format", "{{.State.ExitCode}}", service_name],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                exit_code = int(exit_code_result.stdout.strip())
-                
-                if exit_code == 0:
-                    print(f"Container {service_name} has exited with Exit-Code 0. Monitoring will be stopped.")
-                elif exit_code == 1:
-                    print(f"Container {service_name} has exited with Exit-Code 1. Monitoring will be stopped.")
-                else:
-                    print(f"Container {service_name} has exited with Exit-Code {exit_code}. Monitoring will be stopped.")
+            filtered_stats = None
+            if streamer:
+                # Die Stats-Streams liefern etwa einen Wert pro Sekunde
+                filtered_stats = streamer.wait_for_update(service_name, timeout=0.5)
+            elif samplers:
+                try:
+                    filtered_stats = {name: sampler.read() for name, sampler in samplers.items()}
+                except OSError:
+                    # Die cgroup verschwindet, sobald der Container beendet ist
+                    pass
+            else:
+                filtered_stats = read_docker_stats(containers_to_check)
+
+            # Das Ende des Containers kommt über den Event-Stream, docker inspect nur als Fallback
+            exit_code = None
+            if watcher.exited.is_set():
+                exit_code = watcher.exit_code
+            elif not watcher.is_alive():
+                exit_code = inspect_exit_code(service_name)
+
+            if exit_code is not None:
+                print(f"Container {service_name} has exited with Exit-Code {exit_code}. Monitoring will be stopped.")
+                break
+            if until is not None and until.is_set():
                 break
 
-            elapsed_time = round(time.time() - start_time, 1)  # Verstrichene Zeit
-
-            # Schreibe Messwerte in die CSV
-            writer.writerow([transactions, elapsed_time, filtered_stats[service_name]["CPU"], filtered_stats[service_name]["Memory"], filtered_stats[service_name]["PIDs"], filtered_stats["postgres"]["CPU"]])
-            print(f"Time: {elapsed_time}s, CPU: {filtered_stats[service_name]['CPU']}%, RAM: {filtered_stats[service_name]['Memory']}MB, PIDs: {filtered_stats[service_name]['PIDs']}, Postgres CPU: {filtered_stats['postgres']['CPU']}%")
+            if filtered_stats is not None and all(name in filtered_stats for name in containers_to_check):
+                elapsed_time = round(time.time() - start_time, 2)  # Verstrichene Zeit
+                bank_stats = filtered_stats[service_name]
+                now = time.monotonic()
+                cpu_seconds += bank_stats["CPU"] / 100 * (now - last_sample)
+                last_sample = now
+                committed, rate = throughput.sample() if throughput else (math.nan, math.nan)
+                if procs:
+                    # Neue Prozesse des Containers aufnehmen, Dateien beendeter schließen
+                    pids = procs.read()
+                    for collector in (threads, counters, smaps):
+                        if collector:
+                            collector.update_pids(pids)
+                pg_values = pg_stats.sample() if pg_stats else tuple(math.nan for _ in PG_COLUMNS)
+                thread_values = threads.collect(now - last_thread_sample)[0] if threads else tuple(math.nan for _ in THREAD_COLUMNS)
+                last_thread_sample = now
+                counter_values = counters.collect() if counters else tuple(math.nan for _ in COUNTER_COLUMNS)
+                smaps_values = smaps.collect() if smaps else tuple(math.nan for _ in SMAPS_COLUMNS)
+                gc_values = gc.sample() if gc else tuple(math.nan for _ in GC_COLUMNS)
+
+                # Messwerte nur im Sample-Store ablegen, I/O-Zähler, Drosselung und Run-Queue fehlen beim docker-stats-Backend
+                postgres_stats = filtered_stats["postgres"]
+                store.append((float(point_index), elapsed_time, bank_stats["CPU"], bank_stats["Memory"], bank_stats["PIDs"], postgres_stats["CPU"],
+                              bank_stats.get("NetRx"), bank_stats.get("NetTx"), bank_stats.get("BlkRead"), bank_stats.get("BlkWrite"), committed, rate,
+                              bank_stats.get("ThrottleRatio"), bank_stats.get("Throttled"), bank_stats.get("RunqueueWait"), bank_stats.get("SchedDelay"),
+                              postgres_stats.get("ThrottleRatio"), postgres_stats.get("SchedDelay"),
+                              bank_stats.get("MemAnon"), bank_stats.get("MemFile"), bank_stats.get("MemKernel"))
+                             + pg_values + thread_values + counter_values + smaps_values + gc_values)
+
+                # Statusausgabe nur in größeren Abständen, print kostet auf dem Messpfad zu viel
+                if time.monotonic() >= next_status:
+                    next_status += STATUS_INTERVAL
+                    print(f"Time: {elapsed_time}s, CPU: {bank_stats['CPU']}%, RAM: {bank_stats['Memory']:.1f}MB, PIDs: {bank_stats['PIDs']}, Postgres CPU: {filtered_stats['postgres']['CPU']}%")
+
+            # Beim cgroup-Backend auf das nächste feste Intervall warten, docker stats blockiert selbst.
+            # Das Warten endet sofort, wenn der Container beendet wird.
+            if samplers:
+                next_sample += SAMPLE_INTERVAL
+                watcher.wait(max(0.0, next_sample - time.monotonic()))
 
         except subprocess.CalledProcessError as e:
             print(f"Error while running docker stats: {e}")
@@ -153,92 +498,430 @@ def record_process_stats(service_name, writer, transactions):
             print("Monitoring stopped.")
             break
 
-
-def measure(algorithm, delay, execution_times):
+    if streamer:
+        streamer.close()
+    if samplers:
+        for sampler in samplers.values():
+            sampler.close()
+    if threads:
+        if thread_summary is not None:
+            write_thread_summary(thread_summary, threads.summary())
+        threads.close()
+    if counters:
+        counters.close()
+    if smaps:
+        smaps.close()
+    if procs:
+        procs.close()
+    return cpu_seconds
+
+# PID des Hauptprozesses des Bank-Containers auf dem Host und cgroup.procs seiner cgroup,
+# (None, None) wenn die PID nicht ermittelt werden kann. Der cgroup-Sampler kennt den Pfad bereits,
+# sonst wird er über den Hauptprozess ermittelt.
+def bank_processes(service_name, client, samplers):
+    try:
+        if samplers:
+            pid = samplers[service_name].pid
+        elif client is not None:
+            pid = client.inspect(service_name)["State"]["Pid"]
+        else:
+            pid = container_pid(service_name)
+    except (OSError, ValueError, KeyError, DockerApiError, subprocess.CalledProcessError) as e:
+        print(f"Thread stats, kernel counters and smaps_rollup not available ({e}).")
+        return None, None
+    if not pid or not os.path.isdir(f"/proc/{pid}/task"):
+        return None, None
+    try:
+        return pid, CgroupProcs(samplers[service_name].path if samplers else process_cgroup_path(pid))
+    except OSError as e:
+        # Ohne cgroup v2 folgen die Collectoren nur dem Hauptprozess
+        print(f"cgroup.procs not available ({e}), following only the main process of {service_name}.")
+        return pid, None
+
+# CPU-Sekunden und Lebensdauer (erster und letzter Messpunkt) jedes während der Messung gesehenen Threads
+def write_thread_summary(path, summary):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, ["pid", "tid", "name", "cpu_seconds", "first_tick", "last_tick"])
+        writer.writeheader()
+        writer.writerows(summary)
+
+
+# Fügt die Ergebnisse einer Wiederholung dem Controller hinzu.
+# Liefert True, wenn der Lauf verworfen wurde und wiederholt werden soll. Ein Lauf mit Störungen
+# kommt in Quarantäne und wird nicht hinzugefügt, dann wird RERUN_NOISY_RUNS geliefert.
+def measure(algorithm, point, controller, session=None, checksums=None, allocation=None, results=None, sweep_id=None, host_noise=None):
 
     # Programm starten
-    print(f"Start measurement for {algorithm} with delay {delay}")
+    print(f"Start measurement for {algorithm} at {point.values}")
     docker_compose_file = "docker-compose_modify.yaml"
+    service_name = "bank-bank-1"
+
+    # Beim API-Backend laufen Stats und Events über den Docker-Socket statt über die CLI
+    client = DockerClient() if SAMPLER_BACKEND == "api" else None
+
+    # Bei laufender Datenbank wird nur die Tabelle zurückgesetzt und der Bank-Container gestartet
+    number_of_accounts = point.get("NUMBER_OF_ACCOUNTS", NUMBER_OF_ACCOUNTS)
+    number_of_transactions = point.get("NUMBER_OF_TRANSACTIONS", NUMBER_OF_TRANSACTIONS)
+    command = ["docker-compose", "-f", docker_compose_file, "up"]
+    if session is not None:
+        reset_account_table(session, checksums, number_of_accounts, number_of_transactions)
+        command += ["--no-deps", "bank"]
+
+    # Events vor dem Start abonnieren, damit das Ende des Containers nicht verpasst wird
+    watcher = ContainerExitWatcher(service_name, client.events(service_name) if client else None)
+    launched_at = time.time()
     process = subprocess.Popen(
-            ["docker-compose", "-f", docker_compose_file, "up"],
+            command,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
             bufsize=1
         )
 
-    # Zeilenweise Ausgabe prüfen
-    for line in iter(process.stdout.readline, ""):
-        line = line.strip()  # Leerzeichen am Anfang und Ende entfernen
-        if line:  # Nur nicht-leere Zeilen ausgeben
-            print(line)
-        # Überprüfe auf die gewünschte Nachricht
-        if "File imported." in line:
-            break
-
-    # Startzeit für Ausführung messen
-    start_time = time.time()
-
-    # CSV-Datei für Messwerte öffnen
-    csv_file = os.path.join(MEASUREMENTS_DIR, f"measurement_log_{algorithm}.csv")
-    with open(csv_file, 'a', newline='') as stats_file:
-        writer = csv.writer(stats_file)
-        if os.stat(csv_file).st_size == 0:
-            # Header nur einmal schreiben, wenn Datei leer ist
-            writer.writerow(['delay', 'timestamp', 'cpu_usage', 'memory_usage', 'num_threads', 'postgres_cpu'])
-
-        # psutil Messung (CPU, Speicher und Threads)
-        record_process_stats("bank-bank-1", writer, delay)
-
-    # Endzeit nach der Ausführung messen
-    end_time = time.time()
+    # Ausgabe im Hintergrund lesen und in ein Log pro Messung schreiben
+    log_file = os.path.join(LOGS_DIR, f"{algorithm}_{point.label}_{time.strftime('%Y%m%d-%H%M%S')}.log")
+    pump = OutputPump(process, log_file)
+    file_imported = pump.marker_event("File imported.")
+    first_output = bank_output_event(pump)
+    # GC-Zeilen ab dem Start, auf der Uhr der Pumpe wie die Markierung
+    gc = None
+    if GC_LOGGING:
+        gc = GcLogParser()
+        pump.on_line(gc.on_line)
+    pump.start()
+
+    # Startphase (Start von Container und Runtime, Aufbau des Verbindungspools, Import) ab dem Start
+    # des Containers in einen eigenen Store unter <run_dir>/startup, die Mittelwerte der Messung bleiben vergleichbar
+    run_dir = os.path.join(SAMPLES_DIR, algorithm, f"{point.label}_{time.strftime('%Y%m%d-%H%M%S')}")
+    startup_sketch = SketchSink(os.path.join(run_dir, "startup"), SAMPLE_COLUMNS, "point")
+    startup_store = SampleStore(SAMPLE_COLUMNS, [ColumnFileSink(os.path.join(run_dir, "startup"), SAMPLE_COLUMNS), startup_sketch])
+    startup_cpu_seconds = 0.0
+    if watcher.wait_started(stop=lambda: process.poll() is not None or file_imported.is_set()):
+        if host_noise is not None:
+            add_container_cgroups(host_noise, [service_name] + database_services(INTERFACE_TYPE))
+        startup_cpu_seconds = record_process_stats(service_name, startup_store, point.index, watcher, client, until=file_imported, gc=gc)
+    startup_store.close()
+    if not pump.wait_for(file_imported):
+        print("docker-compose exited before the import was finished.")
+
+    # Lauf verwerfen: Bank beenden, Messwerte löschen und Verbindungen schließen
+    def discard_run():
+        subprocess.run(["docker", "kill", service_name], capture_output=True)
+        shutil.rmtree(run_dir, ignore_errors=True)
+        watcher.close()
+        if client:
+            client.close()
+        pump.detach()
+
+    # Der Lauf zählt nur, wenn die Datenbank genau den generierten Datensatz enthält. Geprüft wird bei
+    # angehaltener Bank, der erste Import eines Datensatzes wird gesichert. Schlägt das Anhalten oder
+    # Fortsetzen fehl, ist der Lauf ungültig und der Messpunkt gilt als fehlgeschlagen.
+    def check_import():
+        first_import = (str(number_of_accounts), str(number_of_transactions)) not in checksums
+        verified = verify_account_table(session, checksums, number_of_accounts, number_of_transactions)
+        if verified and first_import:
+            save_account_snapshot(session, number_of_accounts, number_of_transactions)
+        return verified
+
+    verified = True
+    paused_seconds = 0.0
+    if session is not None and file_imported.is_set():
+        try:
+            verified, paused_seconds = run_paused(service_name, check_import)
+        except RuntimeError:
+            discard_run()
+            raise
+
+    # Startzeit für Ausführung ist die Ankunft der Markierung, die Messung der Startphase bemerkt sie erst
+    # beim nächsten Messpunkt. Die Bank überweist ab der Markierung, die Pause für die Prüfung zählt nicht
+    # zur Ausführungszeit und verschiebt die Startzeit.
+    start_time = time.time() - (time.monotonic() - file_imported.timestamp) + paused_seconds if file_imported.is_set() else time.time()
+    startup = startup_phases(launched_at, watcher.started_at, first_output.timestamp, file_imported.timestamp,
+                             startup_cpu_seconds, startup_sketch.points.get(float(point.index), {}).get("memory_usage"))
+
+    if not verified:
+        print(f"Database state does not match the dataset, run for {algorithm} is discarded.")
+        discard_run()
+        return True
+
+    # Durchsatz aus der Ausgabe der Bank oder dem Commit-Zähler von Postgres über dieselbe Sitzung,
+    # ohne warme Datenbank über eine eigene Sitzung für diesen Lauf
+    throughput_session = session
+    if throughput_session is None:
+        try:
+            throughput_session = PgSession()
+        except DATABASE_ERRORS + (OSError,) as e:
+            print(f"No database session for throughput sampling: {e}")
+            throughput_session = None
+    throughput = ThroughputSampler(throughput_session, PROGRESS_PATTERN, THROUGHPUT_INTERVAL)
+    pump.on_line(throughput.on_line)
+    pg_stats = PgStatsSampler(throughput_session, PG_STATS_INTERVAL)
+
+    # Messwerte in einen spaltenbasierten Store pro Messlauf plus Quantil-Sketches pro Lauf, CSV-Export optional
+    sketch_sink = SketchSink(run_dir, SAMPLE_COLUMNS, "point")
+    sinks = [ColumnFileSink(run_dir, SAMPLE_COLUMNS), sketch_sink]
+    run_id = None
+    if results is not None:
+        run_id = results.start_run(sweep_id, algorithm, point.index, run_dir, allocation.cpu_list() if allocation else None, point.values)
+        sinks.append(ResultsSink(results, run_id, algorithm, point.index))
+    if EXPORT_CSV:
+        sinks.append(CsvSink(os.path.join(MEASUREMENTS_DIR, f"measurement_log_{algorithm}.csv"), CSV_HEADER,
+                             {'delay': point.get("DELAY_TRANSACTION", DELAY_TRANSACTION)}))
+    store = SampleStore(SAMPLE_COLUMNS, sinks)
+
+    # Messung (CPU, Speicher und Threads), fremde Last auf den Bank-CPUs wird mitgezählt
+    # Die CPU-Zeit von dockerd, containerd und den Shims (Stats- und Event-Streams, docker update/pause des
+    # Harness) ist keine fremde Last, sie wird auch dann abgezogen, wenn sie nicht auf den Bank-CPUs anfiel
+    usage = CpuSetUsage(allocation.cpus) if allocation and allocation.isolated else None
+    runtime_usage = ProcessCpuUsage(CONTAINER_RUNTIME) if usage else None
+    noise_mark = host_noise.mark() if host_noise else None
+    cpu_seconds = record_process_stats(service_name, store, point.index, watcher, client, throughput, pg_stats,
+                                       thread_summary=os.path.join(run_dir, "threads.csv"), gc=gc)
+    store.close()
+    transactions = throughput.total()
+    pg_stats.write_statements(os.path.join(run_dir, "pg_statements.json"))
+    ready_at = file_imported.timestamp if file_imported.is_set() else time.monotonic()
+    if gc is not None:
+        gc.write_events(os.path.join(run_dir, "gc_events.csv"), ready_at)
+    if throughput_session is not None and throughput_session is not session:
+        throughput_session.close()
+
+    # Endzeit nach der Ausführung messen, bevorzugt der exakte Zeitpunkt des "die"-Events
+    end_time = watcher.finished_at or time.time()
+    watcher.close()
+    if client:
+        client.close()
+
+    # docker-compose läuft mit postgres weiter, die Pipes werden nur noch geleert
+    pump.detach()
     execution_time = round(end_time - start_time, 1)
 
-    # Speichere die Ausführungszeit für den jeweiligen Algorithmus in der Ausführungszeit-Liste
-    execution_times[algorithm][delay] = execution_time
+    # Störungen auf dem Host während der Messung und fremde Last auf den Bank-CPUs
+    noise = host_noise.summary(noise_mark) if host_noise else {}
+    noise["cpuset_foreign"] = usage.foreign_share(cpu_seconds + runtime_usage.update()) if usage else 0.0
+    noise["interference_score"] = interference_score(noise)
+
+    # Ausführungszeit und Mittelwert jeder Messwert-Spalte dieser Wiederholung
+    result = {"execution_time": execution_time}
+    for metric, stats in sketch_sink.points.get(float(point.index), {}).items():
+        if stats.count:
+            result[metric] = stats.mean
+    if transactions > 0:
+        result["transactions"] = transactions
+        result["cpu_per_1k_transactions"] = cpu_seconds / transactions * 1000
+    if gc is not None:
+        result.update(gc.totals(since=ready_at))
+    result.update(startup)
+    result.update(noise)
+
+    if noise["interference_score"] > INTERFERENCE_THRESHOLD:
+        print(f"Interference during run for {algorithm} at {point.values}: score {noise['interference_score']:.1%} "
+              f"from {', '.join(noisy_components(noise, INTERFERENCE_THRESHOLD))}, run is quarantined.")
+        quarantine(run_dir, noise)
+        if run_id is not None:
+            results.finish_run(run_id, "quarantined", execution_time, result, sketch_sink.points.get(float(point.index), {}))
+        return RERUN_NOISY_RUNS
+
+    controller.add(result)
+    if run_id is not None:
+        results.finish_run(run_id, "complete", execution_time, result, sketch_sink.points.get(float(point.index), {}))
 
     print(f"Stop measurement for {algorithm} - Time: {execution_time}s")
+    return False
 
 
-def main():
-    # Sicherstellen, dass der Ordner "measurements" existiert
-    os.makedirs(MEASUREMENTS_DIR, exist_ok=True)
+# Datenbankdienste der Schnittstelle
+def database_services(interface):
+    return ["postgres", "postgrest"] if interface == "REST" else ["postgres"]
 
-    # Öffne die Datei für die Ausführungszeiten
-    TIME_LOG = os.path.join(MEASUREMENTS_DIR, "measurement_log_time.csv")
+# Die CPU-Zeit der laufenden Container zählt für die Störungsmessung nicht als fremde Last
+def add_container_cgroups(host_noise, containers):
+    for name in containers:
+        try:
+            host_noise.add_cgroup(resolve_cgroup_path(name)[1])
+        except (OSError, ValueError, subprocess.CalledProcessError):
+            pass
+
+# Event, das mit der ersten Ausgabezeile des Bank-Dienstes gesetzt wird, event.timestamp hält ihre Ankunft
+def bank_output_event(pump):
+    event = threading.Event()
+    event.timestamp = None
+
+    def check_line(timestamp, stream_name, line):
+        prefix, separator, _ = line.partition("|")
+        if separator and prefix.strip().startswith(BANK_OUTPUT_PREFIX) and not event.is_set():
+            event.timestamp = timestamp
+            event.set()
+
+    pump.on_line(check_line)
+    return event
+
+# Ergebnisse der Startphase in der Reihenfolge von STARTUP_METRICS. launched_at und container_started_at
+# stammen von time.time(), die Ausgabezeilen von time.monotonic(). Nicht erreichte Phasen fehlen.
+def startup_phases(launched_at, container_started_at, first_output_at, ready_at, cpu_seconds, memory_stats=None):
+    phases = {"startup_cpu_seconds": cpu_seconds}
+    monotonic_launch = time.monotonic() - (time.time() - launched_at)
+    if container_started_at is not None:
+        phases["time_to_container_start"] = container_started_at - launched_at
+    if first_output_at is not None:
+        phases["time_to_first_output"] = first_output_at - monotonic_launch
+    if ready_at is not None:
+        phases["time_to_ready"] = ready_at - monotonic_launch
+    if memory_stats is not None and memory_stats.count:
+        phases["startup_peak_memory"] = memory_stats.max
+    return phases
+
+def sweep_config(sweep):
+    return {
+        "algorithms": ALGORITHMS, "interface_type": INTERFACE_TYPE, "number_of_accounts": NUMBER_OF_ACCOUNTS,
+        "number_of_transactions": NUMBER_OF_TRANSACTIONS, "delay_transaction": DELAY_TRANSACTION,
+        "sampler_backend": SAMPLER_BACKEND, "sample_interval": SAMPLE_INTERVAL, "dataset_seed": DATASET_SEED,
+        "warm_postgres": WARM_POSTGRES, "pin_cpusets": PIN_CPUSETS, "ci_metric": CI_METRIC,
+        "ci_target_width": CI_TARGET_WIDTH, "min_repetitions": MIN_REPETITIONS, "max_repetitions": MAX_REPETITIONS,
+        "cpu_limits": read_cpu_limits(f"docker-compose_template{INTERFACE_TYPE}.yaml"), "gc_logging": GC_LOGGING,
+        "sweep": sweep.to_dict()
+    }
+
+# Schreibt die Ausführungszeiten aller bisherigen Wiederholungen neu, eine Zeile pro Messpunkt
+# mit seinem Index und dem Wert jeder Achse
+def write_time_log(controllers, sweep):
+    metrics = EFFICIENCY_METRICS + STARTUP_METRICS + (GC_METRICS if GC_LOGGING else [])
     with open(TIME_LOG, 'w', newline='') as time_file:
         time_writer = csv.writer(time_file)
-        # Header für die Ausführungszeiten schreiben
-        time_writer.writerow(['delay', 'virtual', 'platform', 'coroutines', 'goroutines'])
-
-        # Dictionary für die Ausführungszeiten jedes Algorithmus
-        execution_times = {
-            'platform': {},
-            'virtual': {},
-            'coroutines': {},
-            'goroutines': {}
-        }
-
-        for delay in np.arange(0.01, DELAY_TRANSACTION+0.001, 0.01):
-            print(f"Number of delay set to: {delay}")
-
-            run_bank_data_generator(NUMBER_OF_ACCOUNTS, NUMBER_OF_TRANSACTIONS)
+        # Header für die Ausführungszeiten schreiben, pro Algorithmus Mittelwert, Konfidenzintervall,
+        # Anzahl und einzelne Wiederholungen in derselben Reihenfolge wie die Zeilen
+        suffixes = [suffix for suffix, _ in RepetitionController(CI_METRIC).time_log_fields(metrics)]
+        time_writer.writerow(['point'] + list(sweep.axes) + [alg + suffix for alg in ALGORITHMS for suffix in suffixes])
 
-            # Für jedes transactions messen wir die Ausführungszeit für jeden Algorithmus
-            for algorithm in ALGORITHMS:
-                
-                # Passe Docker-Compose-Datei an
-                modify_docker_compose_file(algorithm, INTERFACE_TYPE, NUMBER_OF_ACCOUNTS, NUMBER_OF_TRANSACTIONS, delay)
-
-                # Führe die Messung für den aktuellen Algorithmus durch
-                measure(algorithm, delay, execution_times)
-
-                time.sleep(1)
-
-            # Sobald alle Algorithmen für dieses transactions gemessen wurden, speichern wir die Daten
-            row = [delay] + [execution_times[alg].get(delay, 'N/A') for alg in ALGORITHMS]
+        for point in sweep.points:
+            row = [point.index] + list(point.values.values())
+            row += [value for alg in ALGORITHMS for _, value in controllers[alg][point.index].time_log_fields(metrics)]
 
             time_writer.writerow(row)
 
+def main():
+    # Sicherstellen, dass der Ordner "measurements" existiert
+    os.makedirs(MEASUREMENTS_DIR, exist_ok=True)
+    os.makedirs(LOGS_DIR, exist_ok=True)
+
+    dataset_cache = DatasetCache(DATASET_CACHE_DIR, DATASET_CACHE_MAX_BYTES, DATASET_CACHE_MAX_AGE)
+
+    # Messpunkte aus der Sweep-Datei, jede Achse muss eine Umgebungsvariable der Vorlage sein
+    default_axes = {"DELAY_TRANSACTION": [round(float(delay), 10) for delay in np.arange(0.01, DELAY_TRANSACTION+0.001, 0.01)]}
+    sweep = load_sweep(SWEEP_FILE, default_axes)
+    with open(f"docker-compose_template{INTERFACE_TYPE}.yaml", "r") as file:
+        sweep.validate(yaml.safe_load(file)["services"]["bank"]["environment"])
+
+    # Jeder Sweep wird mit Konfiguration, Host und Commit in der Ergebnisdatenbank festgehalten.
+    # Ein unvollständiger Sweep mit derselben Konfiguration wird anhand seines Manifests fortgesetzt.
+    config = sweep_config(sweep)
+    results = ResultsStore(RESULTS_DB, SAMPLE_COLUMNS)
+    manifest = SweepManifest(MANIFEST_FILE, config)
+    if manifest.resumed and manifest.sweep_id is not None:
+        sweep_id = manifest.sweep_id
+        # Messwerte abgebrochener Läufe werden entfernt, ihre Wiederholungen erneut gemessen
+        for run_dir in results.discard_incomplete_runs(sweep_id):
+            shutil.rmtree(run_dir, ignore_errors=True)
+        print(f"Resuming sweep {sweep_id}")
+    else:
+        sweep_id = results.start_sweep("bank", config)
+        manifest.set_sweep_id(sweep_id)
+
+    # Das Harness läuft auf eigenen CPUs, die Datenbankdienste bekommen ihre CPU-Sets für den ganzen Sweep
+    allocator = CpuSetAllocator(HARNESS_CPUS)
+    database_cpusets = {}
+    bank_cpus, bank_memory = read_reservation(INTERFACE_TYPE, "bank")
+    if PIN_CPUSETS:
+        allocator.pin_harness()
+        for service in database_services(INTERFACE_TYPE):
+            cpus, memory = read_reservation(INTERFACE_TYPE, service)
+            allocation = allocator.reserve(cpus, memory) if cpus else None
+            if allocation is not None:
+                database_cpusets[service] = allocation.cpu_list()
+    scheduler = ExperimentScheduler(allocator, 1, MAX_REQUEUES)
+
+    # Warme Datenbank für den ganzen Sweep, Referenzsummen der Kontostände pro Datensatz
+    session = start_database_services(INTERFACE_TYPE, database_cpusets) if WARM_POSTGRES else None
+    checksums = {}
+
+    # Störungen auf dem Host über den ganzen Sweep, Harness, Container und die Docker-Dienste zählen als eigene Last
+    host_noise = None
+    if HOST_NOISE and available():
+        host_noise = HostNoiseSampler(NOISE_LOG, HOST_NOISE_INTERVAL, [process_cgroup()], CONTAINER_RUNTIME).start()
+        add_container_cgroups(host_noise, database_services(INTERFACE_TYPE))
+
+    # Wiederholungen pro Algorithmus und Messpunkt
+    controllers = {alg: {} for alg in ALGORITHMS}
+    time_log_lock = threading.Lock()
+
+    def run(algorithm, point, allocation):
+        number_of_accounts = str(point.get("NUMBER_OF_ACCOUNTS", NUMBER_OF_ACCOUNTS))
+        number_of_transactions = str(point.get("NUMBER_OF_TRANSACTIONS", NUMBER_OF_TRANSACTIONS))
+        run_bank_data_generator(number_of_accounts, number_of_transactions, dataset_cache)
+
+        # Passe Docker-Compose-Datei an
+        cpusets = dict(database_cpusets)
+        if PIN_CPUSETS:
+            cpusets["bank"] = allocation.cpu_list()
+        modify_docker_compose_file(algorithm, INTERFACE_TYPE, number_of_accounts, number_of_transactions,
+                                   point.get("DELAY_TRANSACTION", DELAY_TRANSACTION), cpusets, point.values)
+
+        # Führe die Messungen für den aktuellen Algorithmus durch, bis das Konfidenzintervall reicht.
+        # Ein verworfener Lauf reiht den Messpunkt erneut ein, bisherige Wiederholungen bleiben erhalten.
+        # Ein Lauf in Quarantäne beendet den Messpunkt, wenn RERUN_NOISY_RUNS nicht gesetzt ist.
+        # Jede Wiederholung landet im Manifest, die Ausführungszeiten werden pro fertigem Messpunkt geschrieben.
+        controller = controllers[algorithm][point.index]
+        while not controller.done():
+            repetitions = len(controller.results)
+            if measure(algorithm, point, controller, session, checksums, allocation if PIN_CPUSETS else None, results, sweep_id, host_noise):
+                return True
+            if len(controller.results) == repetitions:
+                break
+            manifest.add_result(algorithm, point.label, controller.results[-1])
+        manifest.mark_done(algorithm, point.label)
+        with time_log_lock:
+            write_time_log(controllers, sweep)
+        return False
+
+    for point in sweep.points:
+        # Ein CPU-Limit als Achse bestimmt auch die Größe des CPU-Sets
+        run_cpus = math.ceil(float(point.get(CPUS_AXIS, bank_cpus or 1)))
+        for algorithm in ALGORITHMS:
+            controller = RepetitionController(CI_METRIC, CI_TARGET_WIDTH, MIN_REPETITIONS, MAX_REPETITIONS)
+            for result in manifest.results(algorithm, point.label):
+                controller.add(result)
+            controllers[algorithm][point.index] = controller
+            if manifest.is_done(algorithm, point.label):
+                continue
+            scheduler.submit(f"{algorithm}/{point.label}", min(run_cpus, allocator.total_cpus), bank_memory,
+                             lambda allocation, algorithm=algorithm, point=point: run(algorithm, point, allocation))
+    write_time_log(controllers, sweep)
+
+    try:
+        failed = scheduler.run()
+    except KeyboardInterrupt:
+        print(f"Sweep interrupted, restart to resume from {MANIFEST_FILE}")
+        raise
+    finally:
+        if session is not None:
+            session.close()
+        if host_noise is not None:
+            host_noise.stop()
+
+    write_time_log(controllers, sweep)
+
+    # Der Sweep ist erst abgeschlossen, wenn jeder Messpunkt fertig ist, sonst setzt ein Neustart ihn fort
+    missing = manifest.missing([(algorithm, point.label) for point in sweep.points for algorithm in ALGORITHMS])
+    if failed or missing:
+        for job in failed:
+            print(f"Failed: {job.name} ({job.failure})")
+        print(f"Sweep incomplete, missing points: {', '.join(f'{algorithm}/{key}' for algorithm, key in missing) or 'none'}. "
+              f"Restart to resume from {MANIFEST_FILE}")
+    else:
+        manifest.finish()
+        results.finish_sweep(sweep_id)
+    results.close()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,109 @@
+import os
+import subprocess
+import threading
+
+try:
+    import psycopg2
+except ImportError:
+    psycopg2 = None
+
+# Zugangsdaten aus den Docker-Compose-Vorlagen
+PG_CONTAINER = "postgres"
+PG_USER = "myuser"
+PG_PASSWORD = "mypassword"
+PG_DATABASE = "mydatabase"
+PG_HOST = "localhost"
+PG_PORT = 5432
+
+# Markiert das Ende einer Antwort der psql-Sitzung
+END_MARKER = "__pg_session_end__"
+
+
+class PgError(RuntimeError):
+    pass
+
+
+# Fehler beider Verbindungsarten
+DATABASE_ERRORS = (PgError, psycopg2.Error) if psycopg2 is not None else (PgError,)
+
+
+# Eine dauerhaft offene Verbindung zu Postgres. Mit psycopg2 direkt über den
+# veröffentlichten Port, sonst über eine einzige psql-Sitzung im Container, damit
+# nicht jede Abfrage einen neuen "docker exec" startet. Mit container=None läuft psql
+# lokal gegen PG_HOST:PG_PORT, z. B. gegen eine lokale Postgres-Instanz.
+class PgSession:
+
+    def __init__(self, container=PG_CONTAINER):
+        self.container = container
+        self.lock = threading.Lock()
+        self.connection = None
+        self.process = None
+        # Anzahl der ausgeführten Anweisungen, jede zählt in pg_stat_database als eigener Commit
+        self.queries = 0
+        if psycopg2 is not None:
+            self.connection = psycopg2.connect(host=PG_HOST, port=PG_PORT, user=PG_USER,
+                                               password=PG_PASSWORD, dbname=PG_DATABASE)
+            self.connection.autocommit = True
+        else:
+            psql = ["psql", "-U", PG_USER, "-d", PG_DATABASE, "-X", "-q", "-A", "-t", "-F", "\t", "-v", "ON_ERROR_STOP=0"]
+            if container is not None:
+                command = ["docker", "exec", "-i", container] + psql
+            else:
+                command = psql + ["-h", PG_HOST, "-p", str(PG_PORT)]
+            self.process = subprocess.Popen(
+                command,
+                env=dict(os.environ, PGPASSWORD=PG_PASSWORD),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1
+            )
+
+    # Führt eine Anweisung aus und liefert die Zeilen als Listen von Strings (psql) bzw. Werten (psycopg2)
+    def query(self, sql):
+        with self.lock:
+            self.queries += 1
+            if self.connection is not None:
+                with self.connection.cursor() as cursor:
+                    cursor.execute(sql)
+                    return cursor.fetchall() if cursor.description else []
+            return self.query_psql(sql)
+
+    def query_psql(self, sql):
+        if self.process.poll() is not None:
+            raise PgError(f"psql session in {self.container} has exited")
+        self.process.stdin.write(sql.rstrip().rstrip(";") + ";\n")
+        self.process.stdin.write(f"\\echo {END_MARKER}\n")
+        self.process.stdin.flush()
+
+        rows = []
+        errors = []
+        for line in self.process.stdout:
+            line = line.rstrip("\n")
+            if line == END_MARKER:
+                break
+            if line.startswith(("ERROR:", "FATAL:", "psql:")):
+                errors.append(line)
+            elif line:
+                rows.append(line.split("\t"))
+        else:
+            raise PgError(f"psql session in {self.container} has exited")
+        if errors:
+            raise PgError("; ".join(errors))
+        return rows
+
+    # Erster Wert der ersten Zeile
+    def scalar(self, sql):
+        rows = self.query(sql)
+        return rows[0][0] if rows else None
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+        if self.process is not None and self.process.poll() is None:
+            self.process.stdin.close()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
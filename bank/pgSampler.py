@@ -0,0 +1,158 @@
+import json
+import math
+import time
+
+from pgConnection import DATABASE_ERRORS, PgSession
+
+# Spalten des Sample-Stores, die der Sampler liefert. Verbindungen und Wartezustände sind
+# Momentaufnahmen, Rollbacks, Deadlocks, Blockzugriffe und die Ausführungszeit der Anweisungen
+# (ms, nur mit pg_stat_statements) zählen seit Beginn des Laufs.
+PG_COLUMNS = [
+    ("pg_connections", "d"),
+    ("pg_active", "d"),
+    ("pg_idle_in_transaction", "d"),
+    ("pg_lock_waits", "d"),
+    ("pg_lwlock_waits", "d"),
+    ("pg_io_waits", "d"),
+    ("pg_blocked_locks", "d"),
+    ("pg_rollbacks", "d"),
+    ("pg_deadlocks", "d"),
+    ("pg_blks_hit", "d"),
+    ("pg_blks_read", "d"),
+    ("pg_statement_time", "d"),
+]
+
+# Eine Anweisung pro Messpunkt, damit jede Abfrage nur einen Commit kostet.
+# Die eigene Verbindung des Samplers zählt nicht mit.
+ACTIVITY_QUERY = """
+SELECT a.connections, a.active, a.idle_in_transaction, a.lock_waits, a.lwlock_waits, a.io_waits,
+       (SELECT count(*) FROM pg_locks WHERE NOT granted),
+       d.xact_rollback, d.deadlocks, d.blks_hit, d.blks_read
+FROM (SELECT count(*) AS connections,
+             count(*) FILTER (WHERE state = 'active') AS active,
+             count(*) FILTER (WHERE state = 'idle in transaction') AS idle_in_transaction,
+             count(*) FILTER (WHERE wait_event_type = 'Lock') AS lock_waits,
+             count(*) FILTER (WHERE wait_event_type = 'LWLock') AS lwlock_waits,
+             count(*) FILTER (WHERE wait_event_type = 'IO') AS io_waits
+      FROM pg_stat_activity
+      WHERE datname = current_database() AND pid <> pg_backend_pid()) a,
+     pg_stat_database d
+WHERE d.datname = current_database()
+"""
+
+STATEMENTS_AVAILABLE_QUERY = "SELECT count(*) FROM pg_extension WHERE extname = 'pg_stat_statements'"
+STATEMENTS_TOTAL_QUERY = "SELECT coalesce(sum(total_exec_time), 0) FROM pg_stat_statements WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())"
+# Zeilenumbrüche im Anweisungstext würden die Ausgabe der psql-Sitzung zerteilen
+STATEMENTS_QUERY = ("SELECT queryid, calls, total_exec_time, rows, regexp_replace(query, '\\s+', ' ', 'g') FROM pg_stat_statements "
+                    "WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())")
+
+# Die Zähler aus pg_stat_database, die als Differenz zum Start des Laufs gespeichert werden
+COUNTER_OFFSET = 7
+
+# Anweisungen mit der höchsten Ausführungszeit in der Zusammenfassung eines Laufs
+TOP_STATEMENTS = 20
+
+
+# Wartezustände, Sperren und Zähler von Postgres über eine dauerhaft offene Sitzung.
+# Zeigt, ob ein Lauf durch den Verbindungspool, durch Sperren (transfer_balance sperrt
+# beide Konten mit FOR UPDATE) oder durch die CPU begrenzt ist. Abgefragt wird höchstens
+# alle interval Sekunden, dazwischen liefert sample() den letzten Stand.
+class PgStatsSampler:
+
+    def __init__(self, session, interval=0.5):
+        self.session = session
+        self.interval = interval
+        self.last_time = -math.inf
+        self.values = tuple(math.nan for _ in PG_COLUMNS)
+        self.statements = self.statements_available()
+        start = self.read()
+        self.start_counters = start[COUNTER_OFFSET:] if start else None
+        self.start_statement_time = self.read_statement_time()
+        self.start_statements = self.read_statements()
+
+    def statements_available(self):
+        if self.session is None:
+            return False
+        try:
+            if int(self.session.scalar(STATEMENTS_AVAILABLE_QUERY) or 0) == 0:
+                return False
+            # Die Erweiterung kann angelegt, aber nicht über shared_preload_libraries geladen sein
+            self.session.scalar(STATEMENTS_TOTAL_QUERY)
+            return True
+        except DATABASE_ERRORS:
+            return False
+
+    def read(self):
+        if self.session is None:
+            return None
+        try:
+            rows = self.session.query(ACTIVITY_QUERY)
+        except DATABASE_ERRORS as e:
+            print(f"Reading Postgres statistics failed: {e}")
+            self.session = None
+            return None
+        return [float(value) for value in rows[0]] if rows else None
+
+    def read_statement_time(self):
+        if not self.statements or self.session is None:
+            return math.nan
+        try:
+            return float(self.session.scalar(STATEMENTS_TOTAL_QUERY))
+        except DATABASE_ERRORS:
+            self.statements = False
+            return math.nan
+
+    # {queryid: (calls, total_exec_time, rows, query)} aller Anweisungen der Datenbank
+    def read_statements(self):
+        if not self.statements or self.session is None:
+            return {}
+        try:
+            rows = self.session.query(STATEMENTS_QUERY)
+        except DATABASE_ERRORS:
+            self.statements = False
+            return {}
+        return {str(queryid): (float(calls), float(total), float(count), query) for queryid, calls, total, count, query in rows}
+
+    # Ein Tupel in der Reihenfolge von PG_COLUMNS, nan ohne Verbindung
+    def sample(self):
+        now = time.monotonic()
+        if now - self.last_time < self.interval:
+            return self.values
+        self.last_time = now
+
+        values = self.read()
+        if values is None or self.start_counters is None:
+            self.values = tuple(math.nan for _ in PG_COLUMNS)
+            return self.values
+        counters = [value - start for value, start in zip(values[COUNTER_OFFSET:], self.start_counters)]
+        statement_time = self.read_statement_time() - self.start_statement_time
+        self.values = tuple(values[:COUNTER_OFFSET] + counters + [statement_time])
+        return self.values
+
+    # Anweisungen des Laufs nach Ausführungszeit, Differenz zum Start, als JSON-Datei
+    def write_statements(self, path):
+        if not self.statements:
+            return
+        statements = []
+        for queryid, (calls, total, count, query) in self.read_statements().items():
+            start_calls, start_total, start_count, _ = self.start_statements.get(queryid, (0.0, 0.0, 0.0, query))
+            if calls > start_calls:
+                statements.append({"queryid": queryid, "calls": calls - start_calls, "total_exec_time": total - start_total,
+                                   "rows": count - start_count, "query": query})
+        statements.sort(key=lambda statement: -statement["total_exec_time"])
+        with open(path, "w") as file:
+            json.dump(statements[:TOP_STATEMENTS], file, indent=2)
+
+
+# Gibt die Messwerte einer lokalen Postgres-Instanz (PG_HOST:PG_PORT) jede Sekunde aus
+if __name__ == "__main__":
+    session = PgSession(container=None)
+    sampler = PgStatsSampler(session, interval=1.0)
+    try:
+        while True:
+            print(dict(zip([name for name, _ in PG_COLUMNS], sampler.sample())))
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        session.close()
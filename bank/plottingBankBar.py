@@ -2,11 +2,35 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import os
+import glob
+import sys
+
+# Die gemeinsamen Module beider Benchmarks liegen im Paket harness neben diesem Ordner
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from harness.aggregation import StreamingAggregator
+from harness.hostNoise import is_quarantined
+from harness.resultsStore import ResultsStore, point_key
+from harness.sampleStore import load_columns
+
+from sweepDefinition import CPUS_AXIS, SweepDefinition, SweepPoint, format_value, read_cpu_limits
 
 # Verzeichnisse für die Daten, Plots und aggregierte Daten
 MEASUREMENTS_DIR = os.path.join(os.getcwd(), "measurements")
+SAMPLES_DIR = os.path.join(MEASUREMENTS_DIR, "samples")
 PLOTS_DIR = os.path.join(os.getcwd(), "plots")
 AGGREGATED_DIR = os.path.join(os.getcwd(), "aggregated")
+AGGREGATION_STATE = os.path.join(AGGREGATED_DIR, "aggregation_state.json")
+RESULTS_DB = os.path.join(MEASUREMENTS_DIR, "results.db")
+
+# Sweeps aus der Ergebnisdatenbank, None für den letzten Sweep, sonst eine Liste von sweep_ids
+SWEEPS = None
+
+# Schnittstelle der Messung, ohne Ergebnisdatenbank stammen die CPU-Limits aus ihrer Compose-Vorlage
+INTERFACE_TYPE = "SQL"
+
+# Läufe mit Störungen durch den Host (Status "quarantined") fließen nur auf Wunsch in die Aggregate ein
+INCLUDE_QUARANTINED = False
 
 # Sicherstellen, dass die Ordner existieren
 os.makedirs(PLOTS_DIR, exist_ok=True)
@@ -34,66 +58,166 @@ labels = {
 max_values_dict = {}
 mean_values_dict = {}
 
-for ALGORITHM, csv_file, color in zip(algorithms, csv_files, colors):
-    data = pd.read_csv(csv_file)
-    
-    # Konvertieren der Spalten in numerische Werte
-    data['delay'] = pd.to_numeric(data['delay'], errors='coerce')
-    data['cpu_usage'] = pd.to_numeric(data['cpu_usage'], errors='coerce') / 4  # CPU-Werte durch 4 teilen
-    data['memory_usage'] = pd.to_numeric(data['memory_usage'], errors='coerce')
-    data['num_threads'] = pd.to_numeric(data['num_threads'], errors='coerce')
-    data['postgres_cpu'] = pd.to_numeric(data['postgres_cpu'], errors='coerce') / 3  # Optional: auch durch 4 teilen, falls nötig
-    
-    # Maximale und durchschnittliche Werte berechnen
-    max_values = data.groupby('delay').agg({
-        'cpu_usage': 'max',
-        'memory_usage': 'max',
-        'num_threads': 'max',
-        'postgres_cpu': 'max'  # Neu hinzugefügt
-    }).reset_index()
-
-    mean_values = data.groupby('delay').agg({
-        'cpu_usage': 'mean',
-        'memory_usage': 'mean',
-        'num_threads': 'mean',
-        'postgres_cpu': 'mean'  # Neu hinzugefügt
-    }).reset_index()
-
-    max_values_dict[ALGORITHM] = max_values
-    mean_values_dict[ALGORITHM] = mean_values
-
-
-# Zusätzliche Daten für Ausführungszeiten einlesen
-time_data = pd.read_csv(TIME_LOG)
-time_data['delay'] = pd.to_numeric(time_data['delay'], errors='coerce')
+# Quantile (p50/p95/p99) pro Algorithmus aus den zusammengeführten Sketches
+percentiles = ['p50', 'p95', 'p99']
+percentile_values_dict = {percentile: {} for percentile in percentiles}
+
+metrics = ['cpu_usage', 'memory_usage', 'num_threads', 'postgres_cpu', 'throughput', 'pg_active', 'pg_lock_waits',
+           'cpu_throttle_ratio', 'cpu_throttled', 'runqueue_wait', 'sched_delay', 'postgres_throttle_ratio', 'postgres_sched_delay']
+
+# Threads des Bank-Prozesses pro Messpunkt: erzeugte und beendete Threads pro Intervall, Threads mit
+# mindestens 10/50/90 % eines Kerns und CPU des am stärksten ausgelasteten Threads
+thread_metrics = ['threads_created', 'threads_exited', 'busy_threads_10', 'busy_threads_50', 'busy_threads_90', 'max_thread_cpu']
+metrics += thread_metrics
+
+# Kernel-Zähler des Bank-Prozesses pro Messpunkt: Kontextwechsel, Seitenfehler und gelesene bzw. geschriebene Bytes
+counter_metrics = ['ctx_voluntary', 'ctx_involuntary', 'minor_faults', 'major_faults', 'io_read_bytes', 'io_write_bytes']
+metrics += counter_metrics
+
+# Säulendiagramme der Kernel-Zähler
+PLOT_KERNEL_COUNTERS = True
+
+# Arbeitsspeicher in MB: Aufteilung der Bank-cgroup aus memory.stat und PSS, USS, anonymer und dateibasierter
+# Speicher des Bank-Prozesses aus /proc/<pid>/smaps_rollup, seltener gemessen als die übrigen Werte
+memory_metrics = ['memory_cgroup_anon', 'memory_cgroup_file', 'memory_cgroup_kernel', 'memory_pss', 'memory_uss', 'memory_anon', 'memory_file']
+metrics += memory_metrics
+
+# Speicherbereinigung der Bank pro Messintervall, nur mit GC_LOGGING: Anzahl, Pausenzeit und CPU-Zeit (ms),
+# Heap nach der letzten Bereinigung (MB)
+gc_metrics = ['gc_count', 'gc_pause', 'gc_cpu', 'gc_heap_after']
+metrics += gc_metrics
+
+# Kennzahlen pro Wiederholung aus dem Zeit-Log: CPU-Sekunden der Bank pro 1000 Transaktionen
+efficiency_metrics = ['cpu_per_1k_transactions']
+
+# Startphase pro Wiederholung: Start von docker-compose bis zum Start des Containers, bis zur ersten Ausgabe
+# der Bank und bis "File imported." in Sekunden, CPU-Sekunden und maximaler Arbeitsspeicher der Startphase
+startup_metrics = ['time_to_container_start', 'time_to_first_output', 'time_to_ready', 'startup_cpu_seconds', 'startup_peak_memory']
+
+# Speicherbereinigung pro Wiederholung ab Ende des Imports: Anzahl, gesamte und längste Pause sowie CPU-Zeit (ms)
+gc_run_metrics = ['gc_collections', 'gc_pause_total', 'gc_pause_max', 'gc_cpu_total']
+
+# Mit Ergebnisdatenbank werden die Kennzahlen pro Lauf über eine indizierte Abfrage zusammengeführt,
+# sonst alle Messwerte in einem Durchlauf aggregieren, bereits gelesene Zeilen werden übersprungen
+results = ResultsStore(RESULTS_DB) if os.path.exists(RESULTS_DB) else None
+if results is not None:
+    sweep_ids = SWEEPS or [results.latest_sweep("bank")]
+    if sweep_ids[0] is None:
+        sys.exit(f"No bank sweep in {RESULTS_DB}, run monitoringBank.py first or remove the database to plot {TIME_LOG}.")
+    # Läufe aus der Zeit vor der Spalte point bekommen die Werte ihrer Achsen aus der Konfiguration ihres Sweeps
+    sweep_configs = [results.sweep_config(sweep_id) or {} for sweep_id in sweep_ids]
+    for sweep_id, sweep_config in zip(sweep_ids, sweep_configs):
+        if "sweep" in sweep_config:
+            results.backfill_points(sweep_id, {point.index: point.values for point in SweepDefinition.from_dict(sweep_config["sweep"]).points})
+    # Messpunkte des ersten Sweeps mit gespeicherter Sweep-Definition, Läufe aller Sweeps werden über die Werte
+    # ihrer Achsen zugeordnet, da der Index eines Messpunkts von der Sweep-Datei abhängt. Ohne Sweep-Definition
+    # stammen die Messpunkte aus den Achsenwerten der Läufe, ohne diese aus dem Zeit-Log.
+    config = next((sweep_config for sweep_config in sweep_configs if "sweep" in sweep_config), sweep_configs[0])
+    if "sweep" in config:
+        sweep_points = SweepDefinition.from_dict(config["sweep"]).points
+    else:
+        sweep_points = [SweepPoint(index, values) for index, values in enumerate(results.run_points(sweep_ids))]
+    if not sweep_points:
+        print(f"Sweeps {sweep_ids} have no sweep points in {RESULTS_DB}, falling back to {TIME_LOG}.")
+        results = None
+if results is not None:
+    point_keys = {point_key(point.values): point.index for point in sweep_points}
+    aggregator = StreamingAggregator('point', metrics)
+    aggregator.update_from_results(results, sweep_ids, INCLUDE_QUARANTINED, point_keys)
+else:
+    config = {}
+    if not os.path.exists(TIME_LOG):
+        sys.exit(f"Neither {RESULTS_DB} nor {TIME_LOG} has measurements to plot.")
+    # Messpunkte aus dem Zeit-Log, ältere Zeit-Logs haben statt point und der Achse nur die Spalte delay
+    time_data = pd.read_csv(TIME_LOG)
+    if 'point' not in time_data.columns:
+        time_data = time_data.rename(columns={'delay': 'DELAY_TRANSACTION'})
+        time_data.insert(0, 'point', range(len(time_data)))
+    # measurement_log_<alg>.csv enthält die Verzögerung statt des Messpunkts, zugeordnet über das Zeit-Log
+    csv_group = None
+    if 'DELAY_TRANSACTION' in time_data.columns and time_data['DELAY_TRANSACTION'].is_unique:
+        csv_group = ('delay', dict(zip(time_data['DELAY_TRANSACTION'].round(10), time_data['point'])))
+    aggregator = StreamingAggregator('point', metrics, AGGREGATION_STATE)
+    if aggregator.is_stale():
+        aggregator.reset()
+    for ALGORITHM, csv_file in zip(algorithms, csv_files):
+        aggregator.update(ALGORITHM, SAMPLES_DIR, csv_file, INCLUDE_QUARANTINED, csv_group)
+    aggregator.save()
+
+# Zusätzliche Daten für Ausführungszeiten einlesen, eine Zeile pro Messpunkt mit dem Wert jeder Achse.
+# Die Achsen stammen aus der Konfiguration des Sweeps bzw. aus den Spalten des Zeit-Logs.
+if results is not None:
+    time_data = pd.DataFrame([{'point': point.index, **point.values} for point in sweep_points])
+    time_data = time_data.merge(results.time_frame(sweep_ids, 'point', algorithms, metrics + efficiency_metrics + startup_metrics + gc_run_metrics,
+                                                   INCLUDE_QUARANTINED, point_keys), on='point', how='left')
+axes = [column for column in time_data.columns
+        if column != 'point' and not any(column == alg or column.startswith(f'{alg}_') for alg in algorithms)]
+varying_axes = [axis for axis in axes if time_data[axis].nunique() > 1]
+
+# Säulendiagramme über die Werte der variierten Achse, Verzögerungen wie bisher in ms
+x_axis = varying_axes[0] if varying_axes else axes[0]
+if x_axis == 'DELAY_TRANSACTION':
+    messpunkte = [round(value * 1000) for value in time_data[x_axis]]
+    xlabel = 'Messpunkte (delay)'
+else:
+    messpunkte = list(time_data[x_axis])
+    xlabel = f'Messpunkte ({x_axis})'
+
+# CPU-Werte durch das CPU-Limit des Containers teilen, das Limit stammt aus der Konfiguration des Sweeps
+# bzw. aus der Compose-Vorlage, ein CPU-Limit als Achse gilt pro Messpunkt
+if 'cpu_limits' in config:
+    cpu_limits = config['cpu_limits']
+else:
+    cpu_limits = read_cpu_limits(f"docker-compose_template{config.get('interface_type', INTERFACE_TYPE)}.yaml")
+points = [SweepPoint(int(row['point']), {axis: row[axis] for axis in axes}) for _, row in time_data.iterrows()]
+cpu_scale = {'cpu_usage': {point.index: 1 / point.cpu_limit('bank', cpu_limits) for point in points},
+             'postgres_cpu': {point.index: 1 / point.cpu_limit('postgres', cpu_limits) for point in points}}
+
+# Faktor einer Metrik pro Zeile von time_data
+def scale_series(metric):
+    scale = cpu_scale.get(metric, 1.0)
+    return time_data['point'].map(scale) if isinstance(scale, dict) else scale
+
+# Kennzahl pro Messpunkt in der Reihenfolge von time_data, fehlende Messpunkte bleiben leer
+def point_frame(ALGORITHM, statistic):
+    frame = aggregator.frame(ALGORITHM, statistic, cpu_scale).set_index('point')
+    return frame.reindex(time_data['point']).reset_index()
+
+# Maximale und durchschnittliche Werte pro Messpunkt
+for ALGORITHM in algorithms:
+    max_values_dict[ALGORITHM] = point_frame(ALGORITHM, 'max')
+    mean_values_dict[ALGORITHM] = point_frame(ALGORITHM, 'mean')
+    for percentile in percentiles:
+        percentile_values_dict[percentile][ALGORITHM] = point_frame(ALGORITHM, percentile)
+
 time_data['virtual'] = pd.to_numeric(time_data['virtual'], errors='coerce')
 time_data['platform'] = pd.to_numeric(time_data['platform'], errors='coerce')
 time_data['coroutines'] = pd.to_numeric(time_data['coroutines'], errors='coerce')
 time_data['goroutines'] = pd.to_numeric(time_data['goroutines'], errors='coerce')
 
-# Funktion zum Abrunden auf null Nachkommastellen
+# Halbe Breite der 95-%-Konfidenzintervalle über die Wiederholungen (<alg>_ci, <alg>_<metrik>_ci),
+# ältere Zeit-Logs ohne Wiederholungen haben keine
+ci_columns = [column for column in time_data.columns if column.endswith('_ci')]
+time_data[ci_columns] = time_data[ci_columns].apply(pd.to_numeric, errors='coerce')
+
+# Funktion zum Abrunden auf null Nachkommastellen, fehlende Werte (z. B. Durchsatz älterer Messungen) bleiben leer
 def round_to_zero(value):
-    return int(value)
+    return int(value) if np.isfinite(value) else value
 
 # Daten für alle Algorithmen zusammenfassen und in CSV-Dateien speichern
 def save_aggregated_csv(metric, metric_name):
-    aggregated_data = pd.DataFrame()
-
+    columns = {}
     for ALGORITHM in algorithms:
-        max_values = max_values_dict[ALGORITHM]
-        mean_values = mean_values_dict[ALGORITHM]
-
-        # Kombinieren von max und mean Werten
-        combined = pd.DataFrame({
-            'delay': max_values['delay'],
-            f'{ALGORITHM}_max_{metric_name}': max_values[metric].apply(round_to_zero),
-            f'{ALGORITHM}_mean_{metric_name}': mean_values[metric].apply(round_to_zero)
-        })
+        max_values = max_values_dict[ALGORITHM].set_index('point')
+        mean_values = mean_values_dict[ALGORITHM].set_index('point')
+        columns[f'{ALGORITHM}_max_{metric_name}'] = max_values[metric].apply(round_to_zero)
+        columns[f'{ALGORITHM}_mean_{metric_name}'] = mean_values[metric].apply(round_to_zero)
+        for percentile in percentiles:
+            percentile_values = percentile_values_dict[percentile][ALGORITHM].set_index('point')
+            columns[f'{ALGORITHM}_{percentile}_{metric_name}'] = percentile_values[metric].apply(round_to_zero)
 
-        if aggregated_data.empty:
-            aggregated_data = combined
-        else:
-            aggregated_data = pd.merge(aggregated_data, combined, on='delay', how='outer')
+    # Ein einziger Join über den Messpunkt statt wiederholter merges, davor die Werte der Achsen
+    aggregated_data = time_data[['point'] + axes].merge(pd.concat(columns, axis=1).reset_index(), on='point')
 
     # Speichern der aggregierten Daten in einer CSV-Datei
     aggregated_data.to_csv(os.path.join(AGGREGATED_DIR, f"{metric_name}_aggregated.csv"), index=False)
@@ -103,33 +227,108 @@ save_aggregated_csv('cpu_usage', 'cpu_usage')
 save_aggregated_csv('memory_usage', 'memory_usage')
 save_aggregated_csv('num_threads', 'num_threads')
 save_aggregated_csv('postgres_cpu', 'postgres_cpu')
+save_aggregated_csv('throughput', 'throughput')
+save_aggregated_csv('pg_active', 'pg_active')
+save_aggregated_csv('pg_lock_waits', 'pg_lock_waits')
+save_aggregated_csv('cpu_throttle_ratio', 'cpu_throttle_ratio')
+save_aggregated_csv('cpu_throttled', 'cpu_throttled')
+save_aggregated_csv('runqueue_wait', 'runqueue_wait')
+save_aggregated_csv('sched_delay', 'sched_delay')
+save_aggregated_csv('postgres_throttle_ratio', 'postgres_throttle_ratio')
+save_aggregated_csv('postgres_sched_delay', 'postgres_sched_delay')
+for metric in thread_metrics + counter_metrics + memory_metrics + gc_metrics:
+    save_aggregated_csv(metric, metric)
+
+# Alle Kennzahlen (count, min, max, mean, variance, Quantile) im Langformat
+aggregator.statistics_frame(cpu_scale).to_csv(os.path.join(AGGREGATED_DIR, "statistics_aggregated.csv"), index=False)
 
 print("Aggregated CSV files have been created in the 'aggregated' folder.")
 
 # Speichern der Ausführungszeit-Daten für alle Algorithmen
-execution_time_aggregated = pd.DataFrame({
-    'delay': time_data['delay'], 
-    'virtual_execution_time': time_data['virtual'],
-    'platform_execution_time': time_data['platform'],
-    'coroutines_execution_time': time_data['coroutines'],
-    'goroutines_execution_time': time_data['goroutines']
-})
+execution_time_aggregated = time_data[['point'] + axes].copy()
+execution_time_aggregated['virtual_execution_time'] = time_data['virtual']
+execution_time_aggregated['platform_execution_time'] = time_data['platform']
+execution_time_aggregated['coroutines_execution_time'] = time_data['coroutines']
+execution_time_aggregated['goroutines_execution_time'] = time_data['goroutines']
+for ALGORITHM in algorithms:
+    if f'{ALGORITHM}_ci' in time_data.columns:
+        execution_time_aggregated[f'{ALGORITHM}_execution_time_ci'] = time_data[f'{ALGORITHM}_ci']
+        execution_time_aggregated[f'{ALGORITHM}_execution_time_n'] = time_data[f'{ALGORITHM}_n']
+    for metric in efficiency_metrics + startup_metrics + gc_run_metrics:
+        if f'{ALGORITHM}_{metric}' in time_data.columns:
+            execution_time_aggregated[f'{ALGORITHM}_{metric}'] = pd.to_numeric(time_data[f'{ALGORITHM}_{metric}'], errors='coerce')
+            execution_time_aggregated[f'{ALGORITHM}_{metric}_ci'] = time_data[f'{ALGORITHM}_{metric}_ci']
 execution_time_aggregated.to_csv(os.path.join(AGGREGATED_DIR, "execution_time_aggregated.csv"), index=False)
 
+# Speicherbereinigung nur darstellen, wenn mindestens ein Lauf mit GC_LOGGING gemessen wurde
+gc_logged = [ALGORITHM for ALGORITHM in algorithms if f'{ALGORITHM}_gc_pause_total' in execution_time_aggregated.columns
+             and execution_time_aggregated[f'{ALGORITHM}_gc_pause_total'].notna().any()]
+
+# Speicherangabe von Docker gegenüber dem Arbeitsspeicher: die Angabe enthält den Page-Cache,
+# anonymer Speicher der cgroup bzw. des Prozesses und USS zeigen den tatsächlich genutzten Speicher
+def plot_working_memory_bar():
+    plt.figure(figsize=(12, 6))
+
+    width = 0.2  # Breite der Balken
+    num_algorithms = len(algorithms)
+    x_positions = range(len(messpunkte))
+
+    for i, (ALGORITHM, color) in enumerate(zip(algorithms, colors)):
+        mean_values = mean_values_dict[ALGORITHM]
+        positions = [pos + (i - (num_algorithms - 1) / 2) * width for pos in x_positions]
+        # Anonymer Speicher aus memory.stat, ohne cgroup-Backend aus smaps_rollup
+        anon = mean_values['memory_cgroup_anon'].fillna(mean_values['memory_anon'])
+
+        plt.bar(
+            positions,
+            mean_values['memory_usage'],
+            width=width,
+            label=f'{labels[ALGORITHM]} (gesamt)',
+            color=color,
+            alpha=0.3
+        )
+        plt.bar(
+            positions,
+            anon,
+            width=width,
+            label=f'{labels[ALGORITHM]} (anonym)',
+            color=color,
+            alpha=1.0
+        )
+        plt.scatter(positions, mean_values['memory_uss'], marker='_', color='black', s=60, label='USS' if i == 0 else None)
+
+    plt.title('Arbeitsspeicher ohne Page-Cache pro Messpunkt')
+    plt.xlabel(xlabel)
+    plt.ylabel('Arbeitsspeicher (MB)')
+
+    plt.legend(
+        title="Legende",
+        loc="upper center",
+        bbox_to_anchor=(0.5, -0.2),
+        ncol=3,
+        columnspacing=1,
+        handlelength=2
+    )
+
+    plt.xticks(x_positions, labels=messpunkte)
+    plt.grid(axis='y')
+    plt.tight_layout()
+    plt.savefig(os.path.join(PLOTS_DIR, "working_memory_bar_plot.png"))
+    plt.close()
+
 # Funktion für das Plotten von Metriken als Säulendiagramm
 def plot_metric_bar(metric, ylabel, filename):
     plt.figure(figsize=(12, 6))
     
     width = 0.2  # Breite der Balken
     num_algorithms = len(algorithms)
-    messpunkte = [10, 20, 30, 40, 50, 60, 70, 80, 90, 100]  # Messpunkte für die X-Achse
     x_positions = range(len(messpunkte))  # Gleichmäßig verteilte X-Positionen
     
     for i, (ALGORITHM, color) in enumerate(zip(algorithms, colors)):
         max_values = max_values_dict[ALGORITHM]
         mean_values = mean_values_dict[ALGORITHM]
         
-        # Mapping von 'delay' auf gleichmäßige X-Positionen
+        # Mapping der Messpunkte auf gleichmäßige X-Positionen
         positions = [pos + (i - (num_algorithms - 1) / 2) * width for pos in x_positions]
         
         # Max-Wert-Balken
@@ -152,8 +351,39 @@ def plot_metric_bar(metric, ylabel, filename):
             alpha=1.0
         )
 
+        # Fehlerbalken vom Median (p50) bis p99, Markierung bei p95
+        p50_values = percentile_values_dict['p50'][ALGORITHM][metric]
+        p95_values = percentile_values_dict['p95'][ALGORITHM][metric]
+        p99_values = percentile_values_dict['p99'][ALGORITHM][metric]
+        plt.errorbar(
+            positions,
+            p50_values,
+            yerr=[np.zeros(len(p50_values)), p99_values - p50_values],
+            fmt='o',
+            color='black',
+            markersize=3,
+            capsize=3,
+            elinewidth=1,
+            label='p50 bis p99' if i == 0 else None
+        )
+        plt.scatter(positions, p95_values, marker='_', color='black', s=60, label='p95' if i == 0 else None)
+
+        # 95-%-Konfidenzintervall des Mittelwerts über die Wiederholungen, falls die Metrik gesteuert wurde
+        if f'{ALGORITHM}_{metric}_ci' in time_data.columns:
+            scale = scale_series(metric)
+            plt.errorbar(
+                positions,
+                pd.to_numeric(time_data[f'{ALGORITHM}_{metric}'], errors='coerce') * scale,
+                yerr=time_data[f'{ALGORITHM}_{metric}_ci'] * scale,
+                fmt='none',
+                ecolor='dimgray',
+                capsize=5,
+                elinewidth=2,
+                label='95-%-Konfidenzintervall' if i == 0 else None
+            )
+
     plt.title(f'{ylabel} mit Maximal- und Mittelwerten pro Messpunkt')
-    plt.xlabel('Messpunkte (delay)')
+    plt.xlabel(xlabel)
     plt.ylabel(ylabel)
 
     # Anpassung der Legende
@@ -171,7 +401,7 @@ def plot_metric_bar(metric, ylabel, filename):
     plt.grid(axis='y')
     plt.tight_layout()
     plt.savefig(os.path.join(PLOTS_DIR, filename))
-    plt.clf()
+    plt.close()
 
 
 # Plot für Ausführungsdauer als Säulendiagramm erstellen
@@ -180,24 +410,25 @@ def plot_execution_time_bar():
     
     width = 0.2  # Breite der Balken
     num_algorithms = len(algorithms)
-    messpunkte = [10, 20, 30, 40, 50, 60, 70, 80, 90, 100] # Messpunkte für die X-Achse
     x_positions = range(len(messpunkte))  # Gleichmäßig verteilte X-Positionen
     
     for i, (ALGORITHM, color) in enumerate(zip(algorithms, colors)):
         positions = [pos + (i - (num_algorithms - 1) / 2) * width for pos in x_positions]
         
-        # Zeichne die Balken
+        # Zeichne die Balken, mit Konfidenzintervall über die Wiederholungen als Whisker
         plt.bar(
             positions,
             time_data[ALGORITHM],  # Höhe der Balken
             width=width,
             label=labels[ALGORITHM],
             color=color,
-            alpha=0.7
+            alpha=0.7,
+            yerr=time_data[f'{ALGORITHM}_ci'] if f'{ALGORITHM}_ci' in time_data.columns else None,
+            capsize=4
         )
 
     plt.title('Ausführungsdauer pro Messpunkt')
-    plt.xlabel('Messpunkte (delay)')
+    plt.xlabel(xlabel)
     plt.ylabel('Ausführungsdauer (s)')
 
     # Positioniere die Legende unter dem Diagramm
@@ -215,22 +446,339 @@ def plot_execution_time_bar():
     plt.grid(axis='y')
     plt.tight_layout()
     plt.savefig(os.path.join(PLOTS_DIR, "execution_time_plot.png"))
-    plt.clf()
+    plt.close()
 
 
-# CPU Usage Plot als Säulendiagramm
-plot_metric_bar("cpu_usage", "CPU-Auslastung (%)", "cpu_usage_bar_plot.png")
+# CPU-Sekunden pro 1000 Transaktionen als Säulendiagramm, mit Konfidenzintervall über die Wiederholungen
+def plot_efficiency_bar():
+    metric = 'cpu_per_1k_transactions'
+    if not any(f'{ALGORITHM}_{metric}' in time_data.columns for ALGORITHM in algorithms):
+        print("No transaction counts in the measurements, CPU per 1k transactions is not plotted.")
+        return
 
-# Memory Usage Plot als Säulendiagramm
-plot_metric_bar("memory_usage", "Arbeitsspeicherverbrauch (MB)", "memory_usage_bar_plot.png")
+    plt.figure(figsize=(12, 6))
 
-# Execution Time Plot als Säulendiagramm
-plot_execution_time_bar()
+    width = 0.2  # Breite der Balken
+    num_algorithms = len(algorithms)
+    x_positions = range(len(messpunkte))  # Gleichmäßig verteilte X-Positionen
 
-# Number of Threads Plot als Säulendiagramm
-plot_metric_bar("num_threads", "Thread-Anzahl", "num_threads_bar_plot.png")
+    for i, (ALGORITHM, color) in enumerate(zip(algorithms, colors)):
+        if f'{ALGORITHM}_{metric}' not in time_data.columns:
+            continue
+        positions = [pos + (i - (num_algorithms - 1) / 2) * width for pos in x_positions]
+        plt.bar(
+            positions,
+            pd.to_numeric(time_data[f'{ALGORITHM}_{metric}'], errors='coerce'),
+            width=width,
+            label=labels[ALGORITHM],
+            color=color,
+            alpha=0.7,
+            yerr=time_data[f'{ALGORITHM}_{metric}_ci'],
+            capsize=4
+        )
+
+    plt.title('CPU-Zeit pro 1000 Transaktionen pro Messpunkt')
+    plt.xlabel(xlabel)
+    plt.ylabel('CPU-Zeit der Bank pro 1000 Transaktionen (s)')
+    plt.legend(
+        title="Legende",
+        loc="upper center",
+        bbox_to_anchor=(0.5, -0.2),
+        ncol=4,
+        columnspacing=1,
+        handlelength=2
+    )
+    plt.xticks(x_positions, labels=messpunkte)
+    plt.grid(axis='y')
+    plt.tight_layout()
+    plt.savefig(os.path.join(PLOTS_DIR, "cpu_per_1k_transactions_bar_plot.png"))
+    plt.close()
+
+
+# Gesamte Pausenzeit der Speicherbereinigung pro Wiederholung als Säulendiagramm mit Konfidenzintervall,
+# die längste einzelne Pause als Markierung
+def plot_gc_pause_bar():
+    plt.figure(figsize=(12, 6))
+
+    width = 0.2  # Breite der Balken
+    num_algorithms = len(algorithms)
+    x_positions = range(len(messpunkte))  # Gleichmäßig verteilte X-Positionen
+
+    for i, (ALGORITHM, color) in enumerate(zip(algorithms, colors)):
+        if ALGORITHM not in gc_logged:
+            continue
+        positions = [pos + (i - (num_algorithms - 1) / 2) * width for pos in x_positions]
+        plt.bar(
+            positions,
+            execution_time_aggregated[f'{ALGORITHM}_gc_pause_total'],
+            width=width,
+            label=labels[ALGORITHM],
+            color=color,
+            alpha=0.7,
+            yerr=execution_time_aggregated[f'{ALGORITHM}_gc_pause_total_ci'],
+            capsize=4
+        )
+        plt.scatter(positions, execution_time_aggregated[f'{ALGORITHM}_gc_pause_max'], marker='_', color='black', s=60,
+                    label='Längste Pause' if ALGORITHM == gc_logged[0] else None)
 
-# PostgreSQL CPU Usage Plot als Säulendiagramm
-plot_metric_bar("postgres_cpu", "PostgreSQL CPU-Auslastung (%)", "postgres_cpu_bar_plot.png")
+    plt.title('Pausenzeit der Speicherbereinigung pro Messpunkt')
+    plt.xlabel(xlabel)
+    plt.ylabel('Pausenzeit der Speicherbereinigung (ms)')
+    plt.legend(
+        title="Legende",
+        loc="upper center",
+        bbox_to_anchor=(0.5, -0.2),
+        ncol=5,
+        columnspacing=1,
+        handlelength=2
+    )
+    plt.xticks(x_positions, labels=messpunkte)
+    plt.grid(axis='y')
+    plt.tight_layout()
+    plt.savefig(os.path.join(PLOTS_DIR, "gc_pause_bar_plot.png"))
+    plt.close()
 
-print("Plotting with bar charts done")
+
+# Startlatenz als gestapeltes Säulendiagramm: Start von docker-compose bis zum Start des Containers,
+# bis zur ersten Ausgabe der Bank (Runtime-Start) und bis zum Ende des Imports (Verbindungspool, Import),
+# Whisker zeigen das Konfidenzintervall bis zum Ende des Imports
+def plot_startup_bar():
+    if not any(f'{ALGORITHM}_time_to_ready' in time_data.columns for ALGORITHM in algorithms):
+        print("No startup phases in the measurements, startup latency is not plotted.")
+        return
+
+    plt.figure(figsize=(12, 6))
+
+    width = 0.2  # Breite der Balken
+    num_algorithms = len(algorithms)
+    x_positions = range(len(messpunkte))  # Gleichmäßig verteilte X-Positionen
+
+    for i, (ALGORITHM, color) in enumerate(zip(algorithms, colors)):
+        if f'{ALGORITHM}_time_to_ready' not in time_data.columns:
+            continue
+        positions = [pos + (i - (num_algorithms - 1) / 2) * width for pos in x_positions]
+        phases = [pd.to_numeric(time_data[f'{ALGORITHM}_{metric}'], errors='coerce')
+                  for metric in ['time_to_container_start', 'time_to_first_output', 'time_to_ready']]
+
+        # Jede Phase beginnt am Ende der vorherigen, fehlende Phasen haben die Höhe null
+        bottom = 0
+        for j, (phase, alpha, suffix) in enumerate(zip(phases, [0.3, 0.6, 1.0], ['Containerstart', 'erste Ausgabe', 'Import beendet'])):
+            top = phase.fillna(bottom)
+            plt.bar(
+                positions,
+                top - bottom,
+                bottom=bottom,
+                width=width,
+                label=f'{labels[ALGORITHM]} ({suffix})',
+                color=color,
+                alpha=alpha,
+                yerr=time_data[f'{ALGORITHM}_time_to_ready_ci'] if j == 2 else None,
+                capsize=4
+            )
+            bottom = top
+
+    plt.title('Startlatenz pro Messpunkt')
+    plt.xlabel(xlabel)
+    plt.ylabel('Zeit ab Start von docker-compose (s)')
+    plt.legend(
+        title="Legende",
+        loc="upper center",
+        bbox_to_anchor=(0.5, -0.2),
+        ncol=4,
+        columnspacing=1,
+        handlelength=2
+    )
+    plt.xticks(x_positions, labels=messpunkte)
+    plt.grid(axis='y')
+    plt.tight_layout()
+    plt.savefig(os.path.join(PLOTS_DIR, "startup_latency_bar_plot.png"))
+    plt.close()
+
+
+# Verlauf einer Metrik im ersten Lauf pro Messpunkt, {Messpunkt: DataFrame mit timestamp und der Metrik}
+def load_timelines(ALGORITHM, metric):
+    timelines = {}
+    if results is not None:
+        runs = results.runs(sweep_ids, ALGORITHM)
+        runs['group'] = runs['point'].map(point_keys)
+        for point, point_runs in runs.dropna(subset=['group']).groupby('group'):
+            run = point_runs.iloc[0]
+            try:
+                timelines[point] = results.samples(ALGORITHM, run['sweep_param'], [int(run['run_id'])], ['timestamp', metric])
+            except pd.errors.DatabaseError:
+                # Ergebnisdatenbank aus der Zeit vor der Messung dieser Metrik
+                return {}
+        return timelines
+
+    for run_dir in sorted(glob.glob(os.path.join(SAMPLES_DIR, ALGORITHM, "*"))):
+        if not os.path.exists(os.path.join(run_dir, "columns.json")) or (is_quarantined(run_dir) and not INCLUDE_QUARANTINED):
+            continue
+        columns = load_columns(run_dir)
+        if len(columns['point']) == 0:
+            continue
+        point = float(columns['point'][0])
+        if point not in timelines and metric in columns:
+            timelines[point] = pd.DataFrame({'timestamp': np.asarray(columns['timestamp']),
+                                             metric: np.asarray(columns[metric])})
+    return timelines
+
+
+# Bezeichnung eines Messpunkts über die Werte der variierten Achsen
+def point_label(point):
+    row = time_data[time_data['point'] == point].iloc[0]
+    return ", ".join(f"{axis}={format_value(row[axis])}" for axis in (varying_axes or axes))
+
+
+# Verlauf einer Metrik über die Zeit, ein Diagramm pro Algorithmus mit einer Linie pro Messpunkt
+def plot_timeline(metric, ylabel, name):
+    for ALGORITHM in algorithms:
+        timelines = {point: timeline for point, timeline in load_timelines(ALGORITHM, metric).items()
+                     if timeline[metric].notna().any()}
+        if not timelines:
+            continue
+
+        plt.figure(figsize=(12, 6))
+        cmap = plt.get_cmap('viridis', len(timelines))
+        for j, (point, timeline) in enumerate(sorted(timelines.items())):
+            plt.plot(timeline['timestamp'], timeline[metric], color=cmap(j), label=point_label(point))
+
+        plt.title(f'{ylabel} über die Zeit ({labels[ALGORITHM]})')
+        plt.xlabel('Zeit seit Beginn der Transaktionen (s)')
+        plt.ylabel(ylabel)
+        plt.legend(
+            title="Legende",
+            loc="upper center",
+            bbox_to_anchor=(0.5, -0.2),
+            ncol=5,
+            columnspacing=1,
+            handlelength=2
+        )
+        plt.grid()
+        plt.tight_layout()
+        plt.savefig(os.path.join(PLOTS_DIR, f"{name}_timeline_{ALGORITHM}.png"))
+        plt.close()
+
+
+# Heatmaps bei mehreren variierten Achsen: x und y sind die ersten beiden Achsen, ein Diagramm pro
+# Algorithmus nebeneinander mit gemeinsamer Farbskala, eine Datei pro Kombination der übrigen Achsen.
+# values enthält pro Algorithmus eine Serie in der Reihenfolge von time_data.
+def plot_heatmaps(values, title, name):
+    x_axis, y_axis = varying_axes[:2]
+    other_axes = varying_axes[2:]
+    groups = time_data.groupby(other_axes) if other_axes else [((), time_data)]
+    for key, group in groups:
+        key = key if isinstance(key, tuple) else (key,)
+        grids = {ALGORITHM: group.assign(value=np.asarray(values[ALGORITHM], dtype=float)[group.index])
+                 .pivot(index=y_axis, columns=x_axis, values='value') for ALGORITHM in algorithms}
+        finite = np.concatenate([grid.to_numpy().ravel() for grid in grids.values()])
+        finite = finite[np.isfinite(finite)]
+        if len(finite) == 0:
+            continue
+
+        fig, subplots = plt.subplots(1, len(algorithms), figsize=(5 * len(algorithms), 5), squeeze=False)
+        for subplot, ALGORITHM in zip(subplots[0], algorithms):
+            grid = grids[ALGORITHM]
+            image = subplot.imshow(grid.to_numpy(), origin='lower', aspect='auto', cmap='viridis',
+                                   vmin=finite.min(), vmax=finite.max())
+            for (row, column), value in np.ndenumerate(grid.to_numpy()):
+                if np.isfinite(value):
+                    subplot.text(column, row, f'{value:.3g}', ha='center', va='center', color='white', fontsize=8)
+            subplot.set_xticks(range(len(grid.columns)), labels=[format_value(value) for value in grid.columns])
+            subplot.set_yticks(range(len(grid.index)), labels=[format_value(value) for value in grid.index])
+            subplot.set_xlabel(x_axis)
+            subplot.set_ylabel(y_axis)
+            subplot.set_title(labels[ALGORITHM])
+        fig.colorbar(image, ax=subplots[0].tolist(), label=title)
+
+        suffix = ", ".join(f'{axis}={format_value(value)}' for axis, value in zip(other_axes, key))
+        fig.suptitle(f'{title} pro Messpunkt' + (f' ({suffix})' if suffix else ''))
+        file_suffix = "".join(f'_{axis}-{format_value(value)}' for axis, value in zip(other_axes, key))
+        fig.savefig(os.path.join(PLOTS_DIR, f"{name}_heatmap{file_suffix}.png"))
+        plt.close(fig)
+
+
+if len(varying_axes) > 1:
+    # Ausführungsdauer, CPU-Zeit pro 1000 Transaktionen und Mittelwerte der Messwerte als Heatmaps
+    plot_heatmaps({ALGORITHM: time_data[ALGORITHM] for ALGORITHM in algorithms}, 'Ausführungsdauer (s)', 'execution_time')
+    if all(f'{ALGORITHM}_cpu_per_1k_transactions' in time_data.columns for ALGORITHM in algorithms):
+        plot_heatmaps({ALGORITHM: pd.to_numeric(time_data[f'{ALGORITHM}_cpu_per_1k_transactions'], errors='coerce') for ALGORITHM in algorithms},
+                      'CPU-Zeit pro 1000 Transaktionen (s)', 'cpu_per_1k_transactions')
+    if all(f'{ALGORITHM}_time_to_ready' in time_data.columns for ALGORITHM in algorithms):
+        plot_heatmaps({ALGORITHM: pd.to_numeric(time_data[f'{ALGORITHM}_time_to_ready'], errors='coerce') for ALGORITHM in algorithms},
+                      'Startlatenz bis Ende des Imports (s)', 'startup_latency')
+    plot_heatmaps({ALGORITHM: mean_values_dict[ALGORITHM]['cpu_usage'] for ALGORITHM in algorithms}, 'CPU-Auslastung (%)', 'cpu_usage')
+    plot_heatmaps({ALGORITHM: mean_values_dict[ALGORITHM]['memory_usage'] for ALGORITHM in algorithms}, 'Arbeitsspeicherverbrauch (MB)', 'memory_usage')
+    plot_heatmaps({ALGORITHM: mean_values_dict[ALGORITHM]['memory_cgroup_anon'].fillna(mean_values_dict[ALGORITHM]['memory_anon'])
+                   for ALGORITHM in algorithms}, 'Anonymer Arbeitsspeicher (MB)', 'memory_anon')
+    plot_heatmaps({ALGORITHM: mean_values_dict[ALGORITHM]['throughput'] for ALGORITHM in algorithms}, 'Durchsatz (Transaktionen/s)', 'throughput')
+    plot_heatmaps({ALGORITHM: mean_values_dict[ALGORITHM]['pg_lock_waits'] for ALGORITHM in algorithms}, 'Auf Sperren wartende Postgres-Verbindungen', 'pg_lock_waits')
+    plot_heatmaps({ALGORITHM: mean_values_dict[ALGORITHM]['cpu_throttle_ratio'] for ALGORITHM in algorithms}, 'Anteil gedrosselter CFS-Perioden', 'cpu_throttle_ratio')
+    plot_heatmaps({ALGORITHM: mean_values_dict[ALGORITHM]['sched_delay'] for ALGORITHM in algorithms}, 'Wartezeit in der Run-Queue pro Zeitscheibe (ms)', 'sched_delay')
+    plot_heatmaps({ALGORITHM: mean_values_dict[ALGORITHM]['busy_threads_50'] for ALGORITHM in algorithms}, 'Threads mit mindestens 50 % eines Kerns', 'busy_threads')
+    if gc_logged:
+        plot_heatmaps({ALGORITHM: execution_time_aggregated[f'{ALGORITHM}_gc_pause_total'] for ALGORITHM in algorithms},
+                      'Pausenzeit der Speicherbereinigung pro Lauf (ms)', 'gc_pause_total')
+    print("Plotting with heatmaps done")
+else:
+    # CPU Usage Plot als Säulendiagramm
+    plot_metric_bar("cpu_usage", "CPU-Auslastung (%)", "cpu_usage_bar_plot.png")
+
+    # Memory Usage Plot als Säulendiagramm
+    plot_metric_bar("memory_usage", "Arbeitsspeicherverbrauch (MB)", "memory_usage_bar_plot.png")
+
+    # Arbeitsspeicher ohne Page-Cache, nur mit Aufteilung aus memory.stat oder smaps_rollup
+    if any(frame[['memory_cgroup_anon', 'memory_anon']].notna().any(axis=None) for frame in mean_values_dict.values()):
+        plot_metric_bar("memory_pss", "Proportionaler Arbeitsspeicher (PSS) (MB)", "memory_pss_bar_plot.png")
+        plot_working_memory_bar()
+
+    # Execution Time Plot als Säulendiagramm
+    plot_execution_time_bar()
+
+    # Number of Threads Plot als Säulendiagramm
+    plot_metric_bar("num_threads", "Thread-Anzahl", "num_threads_bar_plot.png")
+
+    # PostgreSQL CPU Usage Plot als Säulendiagramm
+    plot_metric_bar("postgres_cpu", "PostgreSQL CPU-Auslastung (%)", "postgres_cpu_bar_plot.png")
+
+    # Durchsatz als Säulendiagramm und über die Zeit
+    plot_metric_bar("throughput", "Durchsatz (Transaktionen/s)", "throughput_bar_plot.png")
+    plot_timeline("throughput", "Durchsatz (Transaktionen/s)", "throughput")
+
+    # CPU-Zeit pro 1000 Transaktionen als Säulendiagramm
+    plot_efficiency_bar()
+
+    # Startlatenz als gestapeltes Säulendiagramm
+    plot_startup_bar()
+
+    # Aktive und auf Zeilensperren wartende Verbindungen zu Postgres als Säulendiagramm
+    plot_metric_bar("pg_active", "Aktive Postgres-Verbindungen", "pg_active_bar_plot.png")
+    plot_metric_bar("pg_lock_waits", "Auf Sperren wartende Postgres-Verbindungen", "pg_lock_waits_bar_plot.png")
+
+    # Drosselung durch das CPU-Limit und Wartezeit in der Run-Queue als Säulendiagramm und über die Zeit
+    plot_metric_bar("cpu_throttle_ratio", "Anteil gedrosselter CFS-Perioden", "cpu_throttle_ratio_bar_plot.png")
+    plot_metric_bar("sched_delay", "Wartezeit in der Run-Queue pro Zeitscheibe (ms)", "sched_delay_bar_plot.png")
+    plot_metric_bar("postgres_throttle_ratio", "Anteil gedrosselter CFS-Perioden von PostgreSQL", "postgres_throttle_ratio_bar_plot.png")
+    plot_timeline("cpu_throttle_ratio", "Anteil gedrosselter CFS-Perioden", "cpu_throttle_ratio")
+    plot_timeline("sched_delay", "Wartezeit in der Run-Queue pro Zeitscheibe (ms)", "sched_delay")
+
+    # Ausgelastete Threads und Thread-Wechsel des Bank-Prozesses als Säulendiagramm und über die Zeit
+    plot_metric_bar("busy_threads_50", "Threads mit mindestens 50 % eines Kerns", "busy_threads_bar_plot.png")
+    plot_metric_bar("threads_created", "Erzeugte Threads pro Intervall", "threads_created_bar_plot.png")
+    plot_metric_bar("max_thread_cpu", "CPU des am stärksten ausgelasteten Threads (%)", "max_thread_cpu_bar_plot.png")
+    plot_timeline("busy_threads_50", "Threads mit mindestens 50 % eines Kerns", "busy_threads")
+
+    # Kontextwechsel und Seitenfehler pro Messintervall als Säulendiagramm
+    if PLOT_KERNEL_COUNTERS:
+        plot_metric_bar("ctx_voluntary", "Freiwillige Kontextwechsel pro Intervall", "ctx_voluntary_bar_plot.png")
+        plot_metric_bar("ctx_involuntary", "Unfreiwillige Kontextwechsel pro Intervall", "ctx_involuntary_bar_plot.png")
+        plot_metric_bar("minor_faults", "Minor Page Faults pro Intervall", "minor_faults_bar_plot.png")
+        plot_metric_bar("major_faults", "Major Page Faults pro Intervall", "major_faults_bar_plot.png")
+
+    # Speicherbereinigung als Säulendiagramm und Pausenzeit über die Zeit, nur mit GC_LOGGING gemessen
+    if gc_logged:
+        plot_gc_pause_bar()
+        plot_metric_bar("gc_cpu", "CPU-Zeit der Speicherbereinigung pro Intervall (ms)", "gc_cpu_bar_plot.png")
+        plot_metric_bar("gc_heap_after", "Heap nach der Speicherbereinigung (MB)", "gc_heap_after_bar_plot.png")
+        plot_timeline("gc_pause", "Pausenzeit der Speicherbereinigung pro Intervall (ms)", "gc_pause")
+
+    print("Plotting with bar charts done")
@@ -0,0 +1,102 @@
+import itertools
+import os
+
+import numpy as np
+import yaml
+
+# Umgebungsvariablen, die pro Algorithmus gesetzt werden und daher keine Achse sein können
+ALGORITHM_VARIABLES = {"ALGORITHM", "INTERFACE_TYPE", "DB_HOST"}
+# Achse für CPU-Limit und -Reservierung des Bank-Containers
+CPUS_AXIS = "cpus"
+
+
+def format_value(value):
+    return f"{value:g}" if isinstance(value, (float, np.floating)) else str(value)
+
+
+# CPU-Limit jedes Dienstes einer Compose-Datei in Kernen, ohne Limit alle CPUs des Hosts
+def read_cpu_limits(compose_file):
+    with open(compose_file, "r") as file:
+        data = yaml.safe_load(file)
+    limits = {}
+    for name, service in data["services"].items():
+        cpus = (service.get("deploy") or {}).get("resources", {}).get("limits", {}).get("cpus")
+        limits[name] = float(cpus) if cpus is not None else float(os.cpu_count())
+    return limits
+
+
+# Werte einer Achse: Liste, einzelner Wert oder {start, stop, step}, stop eingeschlossen
+def axis_values(spec):
+    if isinstance(spec, dict):
+        values = np.arange(spec["start"], spec["stop"] + spec["step"] / 2, spec["step"])
+        return [round(float(value), 10) for value in values]
+    if isinstance(spec, list):
+        return spec
+    return [spec]
+
+
+# Ein Messpunkt: Index im Sweep und Wert jeder Achse
+class SweepPoint:
+
+    def __init__(self, index, values):
+        self.index = index
+        self.values = values
+
+    # Kurzer Name für Log-Dateien, Messlauf-Ordner und Manifest, z. B. "0.01" oder "0.01_1000_80"
+    @property
+    def label(self):
+        return "_".join(format_value(value) for value in self.values.values())
+
+    def get(self, axis, default=None):
+        return self.values.get(axis, default)
+
+    # CPU-Limit eines Dienstes an diesem Messpunkt, die Achse CPUS_AXIS gilt für den Bank-Dienst
+    def cpu_limit(self, service, limits):
+        if service == "bank" and CPUS_AXIS in self.values:
+            return float(self.values[CPUS_AXIS])
+        return limits[service]
+
+
+# Sweep über beliebig viele Achsen, gemessen wird jede Kombination der Werte.
+# Die erste Achse ändert sich am langsamsten, die Messpunkte sind fortlaufend nummeriert.
+class SweepDefinition:
+
+    def __init__(self, axes):
+        self.axes = {name: list(values) for name, values in axes.items()}
+        self.points = [SweepPoint(index, dict(zip(self.axes, values)))
+                       for index, values in enumerate(itertools.product(*self.axes.values()))]
+
+    # Achsen mit mehr als einem Wert
+    def varying_axes(self):
+        return [name for name, values in self.axes.items() if len(values) > 1]
+
+    # Jede Achse muss eine Umgebungsvariable des Bank-Dienstes aus der Vorlage oder CPUS_AXIS sein
+    def validate(self, environment):
+        for name in self.axes:
+            if name in ALGORITHM_VARIABLES:
+                raise ValueError(f"Sweep axis {name} is set per algorithm and cannot be swept")
+            if name != CPUS_AXIS and name not in environment:
+                raise ValueError(f"Sweep axis {name} is not an environment variable of the bank service")
+        if not self.points:
+            raise ValueError("Sweep has no points, every axis needs at least one value")
+
+    # Achsen als Liste von [Name, Werte], die Konfiguration wird mit sortierten Schlüsseln
+    # gespeichert und die Reihenfolge der Achsen bestimmt die Nummerierung der Messpunkte
+    def to_dict(self):
+        return {"axes": [[name, values] for name, values in self.axes.items()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(dict(data["axes"]))
+
+
+# Lädt die Achsen aus einer YAML-Datei ("axes: {NAME: Werte}"), nur ohne Pfad gilt default_axes.
+# Eine angegebene, aber fehlende Datei ist ein Fehler, statt still den Standard-Sweep zu messen.
+def load_sweep(path, default_axes):
+    if path is None:
+        return SweepDefinition(default_axes)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Sweep file {path} does not exist")
+    with open(path, "r") as file:
+        data = yaml.safe_load(file)
+    return SweepDefinition({name: axis_values(spec) for name, spec in data["axes"].items()})
@@ -0,0 +1,74 @@
+import math
+import re
+import time
+
+from pgConnection import DATABASE_ERRORS
+
+# Commit-Zähler der Datenbank der Bank, er steigt monoton über alle Verbindungen
+XACT_COMMIT_QUERY = "SELECT xact_commit FROM pg_stat_database WHERE datname = current_database()"
+
+
+# Zählt die abgeschlossenen Transaktionen eines Laufs und leitet daraus den Durchsatz ab.
+# Quelle sind Fortschrittszeilen der Bank (progress_pattern mit einer Gruppe "count" für den
+# Gesamtstand), solange keine kommen, der Commit-Zähler von Postgres über die bestehende Sitzung.
+# Postgres aktualisiert seine Statistiken nur etwa einmal pro Sekunde, daher wird höchstens
+# alle interval Sekunden abgefragt und dazwischen der letzte Stand geliefert.
+class ThroughputSampler:
+
+    def __init__(self, session, progress_pattern=None, interval=1.0):
+        self.session = session
+        self.pattern = re.compile(progress_pattern) if progress_pattern else None
+        self.interval = interval
+        self.progress = None
+        self.start_commits = self.read_commits()
+        self.count = 0.0
+        self.rate = math.nan
+        self.last_time = time.monotonic()
+
+    # Callback für OutputPump.on_line, läuft im Pump-Thread
+    def on_line(self, timestamp, stream, line):
+        match = self.pattern.search(line) if self.pattern else None
+        if match:
+            self.progress = (timestamp, float(match.group("count")))
+
+    def read_commits(self):
+        if self.session is None:
+            return None
+        try:
+            queries = self.session.queries
+            value = self.session.scalar(XACT_COMMIT_QUERY)
+        except DATABASE_ERRORS as e:
+            print(f"Reading pg_stat_database failed: {e}")
+            self.session = None
+            return None
+        # Jede frühere Abfrage über die Sitzung (auch anderer Sampler) zählt selbst als Commit
+        return float(value) - queries if value is not None else None
+
+    # Liefert (Transaktionen seit Beginn des Laufs, Transaktionen pro Sekunde), nan ohne Quelle.
+    # Sobald die Bank Fortschritt ausgibt, zählt nur noch die Ausgabe.
+    def sample(self):
+        if self.progress is not None:
+            now, count = self.progress
+        elif time.monotonic() - self.last_time < self.interval:
+            return self.count, self.rate
+        else:
+            now = time.monotonic()
+            commits = self.read_commits()
+            if commits is None or self.start_commits is None:
+                return math.nan, math.nan
+            count = commits - self.start_commits
+
+        elapsed = now - self.last_time
+        if elapsed > 0:
+            self.rate = max(0.0, count - self.count) / elapsed
+            self.count = count
+            self.last_time = now
+        return self.count, self.rate
+
+    # Transaktionen des ganzen Laufs, der Commit-Zähler wird dafür unabhängig vom Intervall gelesen
+    def total(self):
+        if self.progress is None:
+            commits = self.read_commits()
+            if commits is not None and self.start_commits is not None:
+                self.count = commits - self.start_commits
+        return self.count
@@ -0,0 +1 @@
+# Harness modules shared by the bank and mergesort benchmarks
@@ -0,0 +1,185 @@
+import glob
+import io
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from .hostNoise import is_quarantined
+from .quantileSketch import SKETCH_FILE, MetricStats, load_sketches, point_value
+from .sampleStore import META_FILE, load_columns
+
+# Rows per chunk when reading measurement files
+CHUNK_ROWS = 1_000_000
+
+
+# Factor of a metric, scale holds one factor or a factor per group value
+def metric_scale(scale, metric, group):
+    factor = scale.get(metric, 1.0)
+    if isinstance(factor, dict):
+        return factor.get(point_value(group), 1.0)
+    return factor
+
+
+# Aggregates measurement files per (algorithm, sweep point) in one chunked pass.
+# The state is persisted together with the number of rows (or bytes) consumed per
+# source, so a later call only reads what was appended since.
+class StreamingAggregator:
+
+    def __init__(self, group_column, metrics, state_path=None):
+        self.group_column = group_column
+        self.metrics = metrics
+        self.state_path = state_path
+        self.groups = {}
+        self.offsets = {}
+        if state_path and os.path.exists(state_path):
+            self.load()
+
+    def load(self):
+        with open(self.state_path, "r") as file:
+            state = json.load(file)
+        # A state for a different configuration cannot be updated incrementally
+        if state.get("group_column") != self.group_column or state.get("metrics") != self.metrics:
+            return
+        self.offsets = state["offsets"]
+        for algorithm, points in state["groups"].items():
+            for point, metrics in points.items():
+                self.groups[(algorithm, float(point))] = {metric: MetricStats.from_dict(data) for metric, data in metrics.items()}
+
+    def save(self):
+        if not self.state_path:
+            return
+        groups = {}
+        for (algorithm, point), metrics in self.groups.items():
+            groups.setdefault(algorithm, {})[repr(point)] = {metric: stats.to_dict() for metric, stats in metrics.items()}
+        state = {"group_column": self.group_column, "metrics": self.metrics, "offsets": self.offsets, "groups": groups}
+        temporary_path = self.state_path + ".tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(state, file)
+        os.replace(temporary_path, self.state_path)
+
+    def reset(self):
+        self.groups = {}
+        self.offsets = {}
+
+    def stats(self, algorithm, point):
+        key = (algorithm, float(point))
+        if key not in self.groups:
+            self.groups[key] = {metric: MetricStats() for metric in self.metrics}
+        return self.groups[key]
+
+    # Adds a chunk of columns ({name: array}) of one algorithm
+    def add_columns(self, algorithm, columns):
+        groups = np.asarray(columns[self.group_column], dtype=float)
+        points = np.unique(groups[np.isfinite(groups)])
+        for point in points:
+            selection = None if len(points) == 1 else (groups == point)
+            stats = self.stats(algorithm, point)
+            for metric in self.metrics:
+                if metric not in columns:
+                    continue
+                values = np.asarray(columns[metric])
+                stats[metric].add_array(values if selection is None else values[selection])
+
+    def update_from_run_dir(self, algorithm, run_dir):
+        columns = load_columns(run_dir)
+        rows = len(columns[self.group_column])
+        offset = self.offsets.get(run_dir, 0)
+        for start in range(offset, rows, CHUNK_ROWS):
+            self.add_columns(algorithm, {name: values[start:start + CHUNK_ROWS] for name, values in columns.items()})
+        self.offsets[run_dir] = rows
+
+    # csv_group translates a CSV column to the group column, (column, {value: group}),
+    # for exports that store a sweep value (e.g. the delay) instead of the point
+    def update_from_csv(self, algorithm, csv_file, csv_group=None):
+        if not os.path.exists(csv_file):
+            return
+        with open(csv_file, "rb") as file:
+            header = file.readline().decode().strip().split(",")
+            offset = max(self.offsets.get(csv_file, 0), file.tell())
+            file.seek(offset)
+            data = file.read()
+        # Only complete lines, a line being written right now is read next time
+        data = data[:data.rfind(b"\n") + 1]
+        if data:
+            for chunk in pd.read_csv(io.BytesIO(data), names=header, header=None, chunksize=CHUNK_ROWS):
+                chunk = chunk.apply(pd.to_numeric, errors="coerce")
+                if csv_group is not None:
+                    column, groups = csv_group
+                    chunk[self.group_column] = chunk[column].round(10).map(groups)
+                if self.group_column not in chunk.columns:
+                    continue
+                self.add_columns(algorithm, {name: chunk[name].to_numpy() for name in chunk.columns})
+        self.offsets[csv_file] = offset + len(data)
+
+    # Merges finished MetricStats ({metric: MetricStats}) of one sweep point
+    def merge_stats(self, algorithm, point, metrics):
+        stats = self.stats(algorithm, point)
+        for metric in self.metrics:
+            if metric in metrics:
+                stats[metric].merge(metrics[metric])
+
+    # Merges the per-run sketches of a finished run, its raw samples are not read
+    def update_from_sketches(self, algorithm, sketch_file):
+        for point, metrics in load_sketches(sketch_file).items():
+            self.merge_stats(algorithm, point, metrics)
+        self.offsets[sketch_file] = 1
+
+    # Merges the per-run aggregates of the results database, one indexed query for all runs.
+    # points matches runs by their axis values (see ResultsStore.merged_stats).
+    def update_from_results(self, results, sweep_ids, include_quarantined=False, points=None):
+        for (algorithm, point), metrics in results.merged_stats(sweep_ids, self.metrics, include_quarantined, points).items():
+            self.merge_stats(algorithm, point, metrics)
+
+    # Reads new data of all runs of an algorithm, the CSV is only used if there are no run directories.
+    # Finished runs contribute their sketches, only runs still being written are read row by row.
+    # Quarantined runs are skipped unless include_quarantined is set.
+    def update(self, algorithm, samples_dir, csv_file, include_quarantined=False, csv_group=None):
+        pattern = os.path.join(samples_dir, algorithm, "*", "{}")
+        run_dirs = sorted({os.path.dirname(path) for name in (META_FILE, SKETCH_FILE) for path in glob.glob(pattern.format(name))})
+        for run_dir in run_dirs:
+            sketch_file = os.path.join(run_dir, SKETCH_FILE)
+            if sketch_file in self.offsets or (is_quarantined(run_dir) and not include_quarantined):
+                continue
+            if os.path.exists(sketch_file) and run_dir not in self.offsets:
+                self.update_from_sketches(algorithm, sketch_file)
+            elif os.path.exists(os.path.join(run_dir, META_FILE)):
+                self.update_from_run_dir(algorithm, run_dir)
+        if not run_dirs:
+            self.update_from_csv(algorithm, csv_file, csv_group)
+
+    # Sources that were removed or truncated invalidate the incremental state
+    def is_stale(self):
+        for source, offset in self.offsets.items():
+            if not os.path.exists(source):
+                return True
+            if source.endswith(".csv") and os.path.getsize(source) < offset:
+                return True
+            if os.path.isdir(source) and len(load_columns(source)[self.group_column]) < offset:
+                return True
+        return False
+
+    # One row per sweep point with the requested statistic for every metric
+    def frame(self, algorithm, statistic, scale=None):
+        scale = scale or {}
+        rows = []
+        for (group_algorithm, point), metrics in sorted(self.groups.items()):
+            if group_algorithm != algorithm:
+                continue
+            row = {self.group_column: point_value(point)}
+            for metric, stats in metrics.items():
+                row[metric] = stats.summary(metric_scale(scale, metric, point)).get(statistic, math.nan)
+            rows.append(row)
+        return pd.DataFrame(rows, columns=[self.group_column] + self.metrics)
+
+    # Long format with all statistics per (algorithm, sweep point, metric)
+    def statistics_frame(self, scale=None):
+        scale = scale or {}
+        rows = []
+        for (algorithm, point), metrics in sorted(self.groups.items()):
+            for metric, stats in metrics.items():
+                rows.append({"algorithm": algorithm, self.group_column: point_value(point), "metric": metric,
+                             **stats.summary(metric_scale(scale, metric, point))})
+        return pd.DataFrame(rows)
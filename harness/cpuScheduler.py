@@ -0,0 +1,236 @@
+import glob
+import os
+import shutil
+import threading
+import time
+import traceback
+
+import psutil
+
+NODE_DIR = "/sys/devices/system/node"
+
+
+def parse_cpu_list(text):
+    cpus = []
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-")
+            cpus.extend(range(int(first), int(last) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def format_cpu_list(cpus):
+    return ",".join(str(cpu) for cpu in sorted(cpus))
+
+
+# CPUs per NUMA node, restricted to the CPUs this process may run on.
+# Without NUMA information all CPUs form a single node 0.
+def read_topology():
+    allowed = os.sched_getaffinity(0) if hasattr(os, "sched_getaffinity") else set(range(psutil.cpu_count()))
+    nodes = {}
+    for path in sorted(glob.glob(os.path.join(NODE_DIR, "node[0-9]*"))):
+        with open(os.path.join(path, "cpulist"), "r") as file:
+            cpus = [cpu for cpu in parse_cpu_list(file.read()) if cpu in allowed]
+        if cpus:
+            nodes[int(os.path.basename(path)[4:])] = cpus
+    return nodes or {0: sorted(allowed)}
+
+
+class Allocation:
+
+    def __init__(self, cpus, node, memory_mb, isolated):
+        self.cpus = sorted(cpus)
+        self.node = node  # None if the allocation spans several nodes
+        self.memory_mb = memory_mb
+        # Only with the harness on CPUs of its own is foreign load on the set measurable
+        self.isolated = isolated
+
+    def cpu_list(self):
+        return format_cpu_list(self.cpus)
+
+
+# Hands out disjoint CPU sets. A request is placed on a single NUMA node whenever it
+# fits there (on the node with the fewest free CPUs that still fits it, so large
+# requests find room later). CPUs and memory are never handed out twice.
+class CpuSetAllocator:
+
+    def __init__(self, harness_cpus=1, memory_mb=None):
+        self.nodes = read_topology()
+        # The lowest CPUs stay with the harness (sampler, output pumps), it is pinned to them
+        all_cpus = sorted(cpu for cpus in self.nodes.values() for cpu in cpus)
+        self.harness_cpus = all_cpus[:harness_cpus] if len(all_cpus) > harness_cpus else []
+        self.free = {node: [cpu for cpu in cpus if cpu not in self.harness_cpus] for node, cpus in self.nodes.items()}
+        self.total_cpus = sum(len(cpus) for cpus in self.free.values())
+        self.total_memory_mb = memory_mb if memory_mb is not None else psutil.virtual_memory().available // (1024 * 1024)
+        self.free_memory_mb = self.total_memory_mb
+        self.lock = threading.Lock()
+
+    def pin_harness(self):
+        if self.harness_cpus and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, self.harness_cpus)
+
+    def fits_ever(self, cpus, memory_mb):
+        return cpus <= self.total_cpus and memory_mb <= self.total_memory_mb
+
+    # Returns an Allocation or None if the request does not fit right now
+    def try_allocate(self, cpus, memory_mb):
+        with self.lock:
+            if memory_mb > self.free_memory_mb:
+                return None
+            candidates = [node for node, free in self.free.items() if len(free) >= cpus]
+            if candidates:
+                node = min(candidates, key=lambda candidate: len(self.free[candidate]))
+                chosen = self.free[node][:cpus]
+            elif sum(len(free) for free in self.free.values()) >= cpus and cpus > max(len(c) for c in self.nodes.values()):
+                # Larger than any node: spread over the nodes with the most free CPUs
+                node = None
+                chosen = []
+                for candidate in sorted(self.free, key=lambda candidate: -len(self.free[candidate])):
+                    chosen += self.free[candidate][:cpus - len(chosen)]
+            else:
+                return None
+
+            for candidate, free in self.free.items():
+                self.free[candidate] = [cpu for cpu in free if cpu not in chosen]
+            self.free_memory_mb -= memory_mb
+            return Allocation(chosen, node, memory_mb, bool(self.harness_cpus))
+
+    # Allocation that is never released (services running for the whole sweep), None if it does not fit
+    def reserve(self, cpus, memory_mb):
+        allocation = self.try_allocate(cpus, memory_mb)
+        if allocation is not None:
+            self.total_cpus -= len(allocation.cpus)
+            self.total_memory_mb -= allocation.memory_mb
+        return allocation
+
+    def release(self, allocation):
+        with self.lock:
+            for node, cpus in self.nodes.items():
+                returned = [cpu for cpu in allocation.cpus if cpu in cpus]
+                self.free[node] = sorted(self.free[node] + returned)
+            self.free_memory_mb += allocation.memory_mb
+
+
+# Prefixes a command so that it runs on the CPUs (and NUMA memory) of an allocation
+def pinned_command(command, allocation):
+    if allocation is None:
+        return command
+    if allocation.node is not None and shutil.which("numactl") and len(read_topology()) > 1:
+        return ["numactl", f"--physcpubind={allocation.cpu_list()}", f"--membind={allocation.node}"] + command
+    if shutil.which("taskset"):
+        return ["taskset", "-c", allocation.cpu_list()] + command
+    return command
+
+
+# Busy time of a set of CPUs from /proc/stat, used to detect foreign load on a run's CPUs
+class CpuSetUsage:
+
+    def __init__(self, cpus):
+        self.cpus = set(cpus)
+        self.start_busy = self.read_busy()
+        self.start_time = time.monotonic()
+
+    def read_busy(self):
+        busy = 0.0
+        ticks = os.sysconf("SC_CLK_TCK")
+        with open("/proc/stat", "r") as file:
+            for line in file:
+                if not line.startswith("cpu") or line.startswith("cpu "):
+                    continue
+                fields = line.split()
+                if int(fields[0][3:]) in self.cpus:
+                    # user nice system idle iowait irq softirq steal, idle and iowait are not busy
+                    values = [int(value) for value in fields[1:9]]
+                    busy += (sum(values) - values[3] - values[4]) / ticks
+        return busy
+
+    # Share of the CPU set's capacity used by anything other than the run itself
+    def foreign_share(self, own_cpu_seconds):
+        elapsed = time.monotonic() - self.start_time
+        if elapsed <= 0 or not self.cpus:
+            return 0.0
+        foreign = (self.read_busy() - self.start_busy) - own_cpu_seconds
+        return max(0.0, foreign) / (elapsed * len(self.cpus))
+
+
+class Job:
+
+    def __init__(self, name, cpus, memory_mb, function):
+        self.name = name
+        self.cpus = cpus
+        self.memory_mb = memory_mb
+        self.function = function  # function(allocation) returns True if the run saw interference
+        self.attempts = 0
+        self.failure = None  # Why the job was given up, set once it is in ExperimentScheduler.failed
+
+
+# Runs independent jobs in parallel on disjoint CPU sets. Jobs start in submission order,
+# later smaller jobs may fill CPUs a larger one is waiting for. A job that reports
+# interference is queued again, at most max_retries times. A job that raises or still sees
+# interference after its last retry is given up and ends up in failed, run() returns them.
+class ExperimentScheduler:
+
+    def __init__(self, allocator, max_parallel=None, max_retries=2):
+        self.allocator = allocator
+        self.max_parallel = max_parallel
+        self.max_retries = max_retries
+        self.pending = []
+        self.running = 0
+        self.failed = []
+        self.condition = threading.Condition()
+
+    def submit(self, name, cpus, memory_mb, function):
+        if not self.allocator.fits_ever(cpus, memory_mb):
+            raise ValueError(f"Job {name} needs {cpus} CPUs and {memory_mb} MB, "
+                             f"only {self.allocator.total_cpus} CPUs and {self.allocator.total_memory_mb} MB exist")
+        self.pending.append(Job(name, cpus, memory_mb, function))
+
+    # Runs every submitted job, returns the jobs that were given up, empty if all of them finished
+    def run(self):
+        with self.condition:
+            while self.pending or self.running:
+                started = False
+                for job in list(self.pending):
+                    if self.max_parallel is not None and self.running >= self.max_parallel:
+                        break
+                    allocation = self.allocator.try_allocate(job.cpus, job.memory_mb)
+                    if allocation is None:
+                        continue
+                    self.pending.remove(job)
+                    self.running += 1
+                    started = True
+                    threading.Thread(target=self.execute, args=(job, allocation), daemon=True).start()
+                if not started:
+                    self.condition.wait()
+            return list(self.failed)
+
+    def execute(self, job, allocation):
+        job.attempts += 1
+        interfered = False
+        failure = None
+        try:
+            print(f"Starting {job.name} on CPUs {allocation.cpu_list()} (attempt {job.attempts})")
+            interfered = job.function(allocation)
+        except Exception as e:
+            # The worker thread must not die silently, the job is reported as failed
+            failure = f"{type(e).__name__}: {e}"
+            print(f"{job.name} failed on attempt {job.attempts}:\n{traceback.format_exc()}", end="")
+        finally:
+            self.allocator.release(allocation)
+            with self.condition:
+                self.running -= 1
+                if failure is None and interfered:
+                    if job.attempts <= self.max_retries:
+                        print(f"{job.name} reported interference, queued again.")
+                        self.pending.append(job)
+                    else:
+                        failure = f"interference in all {job.attempts} attempts"
+                        print(f"{job.name} still reported interference after {job.attempts} attempts, giving up.")
+                if failure is not None:
+                    job.failure = failure
+                    self.failed.append(job)
+                self.condition.notify_all()
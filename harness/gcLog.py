@@ -0,0 +1,162 @@
+import csv
+import re
+import threading
+
+# Options that make the runtimes log every collection: JVM unified logging to stdout, gctrace to stderr in Go
+JVM_GC_LOGGING = "-Xlog:gc*:stdout:uptime,level,tags"
+GO_GC_LOGGING = "gctrace=1"
+
+# Values of GcLogParser.sample() in this order, all since the previous sample
+GC_COLUMNS = [
+    ("gc_count", "d"),       # collections that started
+    ("gc_pause", "d"),       # stop-the-world pause time in ms
+    ("gc_cpu", "d"),         # CPU time of the collector in ms
+    ("gc_heap_after", "d"),  # heap after the last collection in MB, empty without one
+]
+
+# Totals of a run from GcLogParser.totals()
+GC_METRICS = ["gc_collections", "gc_pause_total", "gc_pause_max", "gc_cpu_total"]
+
+# One line per pause, e.g. "[1.234s][info][gc] GC(3) Pause Young (Normal) (G1 Evacuation Pause) 24M->3M(256M) 6.789ms".
+# Pauses of concurrent collectors (Remark, Cleanup, ZGC's Mark Start) may come without heap sizes.
+JVM_PAUSE = re.compile(r"GC\((\d+)\) (?:[YO]: )?(Pause [A-Za-z ]+?)(?: \((?:[^()]|\([^()]*\))*\))*"
+                       r"(?: (\d+)([KMG])->(\d+)([KMG])\((\d+)([KMG])\))? (\d+(?:\.\d+)?)ms\s*$")
+# Heap of a ZGC collection, whose pauses come without sizes, e.g. "[1.250s][info][gc] GC(3) Garbage Collection
+# (Allocation Rate) 120M(12%)->40M(4%)" or with generational ZGC "GC(4) Major Collection (Proactive) 1G(50%)->512M(25%) 0.010s"
+JVM_ZGC_HEAP = re.compile(r"GC\((\d+)\) (?:Garbage|Minor|Major) Collection(?: \((?:[^()]|\([^()]*\))*\))*"
+                          r" (\d+)([KMG])\(\d+%\)->(\d+)([KMG])\(\d+%\)")
+# CPU time of a collection, e.g. "[1.240s][info][gc,cpu] GC(3) User=0.02s Sys=0.00s Real=0.01s"
+JVM_CPU = re.compile(r"GC\((\d+)\) User=(\d+(?:\.\d+)?)s Sys=(\d+(?:\.\d+)?)s Real=(\d+(?:\.\d+)?)s")
+# One line per collection, e.g. "gc 7 @1.234s 4%: 0.019+1.2+0.021 ms clock, 0.15+0.40/2.1/0.56+0.17 ms cpu,
+# 58->59->30 MB, 60 MB goal, 0 MB stacks, 0 MB globals, 8 P"
+GO_GCTRACE = re.compile(r"gc (\d+) @(\d+(?:\.\d+)?)s \d+%: (\d+(?:\.\d+)?)\+(\d+(?:\.\d+)?)\+(\d+(?:\.\d+)?) ms clock, "
+                        r"(\d+(?:\.\d+)?)\+(\d+(?:\.\d+)?)/(\d+(?:\.\d+)?)/(\d+(?:\.\d+)?)\+(\d+(?:\.\d+)?) ms cpu, "
+                        r"(\d+)->(\d+)->(\d+) MB")
+
+UNITS_MB = {"K": 1 / 1024, "M": 1, "G": 1024}
+
+
+# Event of a JVM log line: {"gc": id, "kind": ..., "pause_ms", "heap_before", "heap_after", "heap_total"}
+# for a pause, {"gc": id, "cpu_ms": ...} for the CPU line of a collection, {"gc": id, "heap_before",
+# "heap_after"} for the summary of a ZGC collection, None for any other line
+def parse_jvm_line(line):
+    match = JVM_PAUSE.search(line)
+    if match:
+        gc_id, kind, before, before_unit, after, after_unit, total, total_unit, pause = match.groups()
+        event = {"gc": int(gc_id), "kind": kind, "pause_ms": float(pause)}
+        if before is not None:
+            event["heap_before"] = int(before) * UNITS_MB[before_unit]
+            event["heap_after"] = int(after) * UNITS_MB[after_unit]
+            event["heap_total"] = int(total) * UNITS_MB[total_unit]
+        return event
+    match = JVM_CPU.search(line)
+    if match:
+        return {"gc": int(match.group(1)), "cpu_ms": (float(match.group(2)) + float(match.group(3))) * 1000}
+    match = JVM_ZGC_HEAP.search(line)
+    if match:
+        gc_id, before, before_unit, after, after_unit = match.groups()
+        return {"gc": int(gc_id), "heap_before": int(before) * UNITS_MB[before_unit], "heap_after": int(after) * UNITS_MB[after_unit]}
+    return None
+
+
+# Event of a gctrace line, None for any other line. The pause is the wall time of the two
+# stop-the-world phases (sweep termination and mark termination), the CPU time the sum of all
+# phases. After a collection the heap holds the marked live heap, the second size also counts
+# what was allocated during the concurrent mark.
+def parse_gctrace_line(line):
+    match = GO_GCTRACE.search(line)
+    if match is None:
+        return None
+    values = match.groups()
+    clock = [float(value) for value in values[2:5]]
+    cpu = [float(value) for value in values[5:10]]
+    return {"gc": int(values[0]), "kind": "gc", "pause_ms": clock[0] + clock[2], "cpu_ms": sum(cpu),
+            "heap_before": int(values[10]), "heap_after": int(values[12])}
+
+
+# Turns the GC lines of a program's output into per-sample values, per-run totals and a list of
+# events on the pump's monotonic clock. on_line is registered as OutputPump.on_line callback, any
+# line that is not a GC line is ignored, so one parser handles both JVM and Go output.
+class GcLogParser:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events = {}
+        self.interval = self.empty_interval()
+
+    @staticmethod
+    def empty_interval():
+        return {"count": 0, "pause": 0.0, "cpu": 0.0, "heap_after": None}
+
+    def on_line(self, timestamp, stream, line):
+        event = parse_jvm_line(line) or parse_gctrace_line(line)
+        if event is not None:
+            self.add(timestamp, event)
+
+    def add(self, timestamp, event):
+        with self.lock:
+            # A JVM collection can have several pauses and a separate CPU line under one id
+            known = event["gc"] in self.events
+            record = self.events.setdefault(event["gc"], {"time": timestamp, "gc": event["gc"], "kind": event.get("kind"),
+                                                          "pauses": 0, "pause_ms": 0.0, "cpu_ms": 0.0})
+            if not known:
+                self.interval["count"] += 1
+            if "pause_ms" in event:
+                record["pauses"] += 1
+                record["pause_ms"] += event["pause_ms"]
+                record["max_pause_ms"] = max(record.get("max_pause_ms", 0.0), event["pause_ms"])
+                record["kind"] = record["kind"] or event["kind"]
+                self.interval["pause"] += event["pause_ms"]
+            if "cpu_ms" in event:
+                record["cpu_ms"] += event["cpu_ms"]
+                self.interval["cpu"] += event["cpu_ms"]
+            # Heap before the first and after the last pause of a collection
+            if "heap_before" in event:
+                record.setdefault("heap_before", event["heap_before"])
+            if "heap_after" in event:
+                record["heap_after"] = event["heap_after"]
+                self.interval["heap_after"] = event["heap_after"]
+            if "heap_total" in event:
+                record["heap_total"] = event["heap_total"]
+
+    # Values since the previous call in the order of GC_COLUMNS
+    def sample(self):
+        with self.lock:
+            interval, self.interval = self.interval, self.empty_interval()
+        return interval["count"], interval["pause"], interval["cpu"], interval["heap_after"]
+
+    # Totals in the order of GC_METRICS of the collections that started at or after since,
+    # empty without any collection
+    def totals(self, since=None):
+        with self.lock:
+            records = [record for record in self.events.values() if since is None or record["time"] >= since]
+        if not records:
+            return {}
+        return {
+            "gc_collections": len(records),
+            "gc_pause_total": sum(record["pause_ms"] for record in records),
+            "gc_pause_max": max(record.get("max_pause_ms", 0.0) for record in records),
+            "gc_cpu_total": sum(record["cpu_ms"] for record in records)
+        }
+
+    # One row per collection, time in seconds since origin on the monotonic clock, negative before it
+    def write_events(self, path, origin):
+        with self.lock:
+            records = sorted(self.events.values(), key=lambda record: record["time"])
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["time", "gc", "kind", "pauses", "pause_ms", "cpu_ms", "heap_before", "heap_after", "heap_total"])
+            for record in records:
+                writer.writerow([round(record["time"] - origin, 3), record["gc"], record["kind"], record["pauses"],
+                                 round(record["pause_ms"], 3), round(record["cpu_ms"], 3), record.get("heap_before"),
+                                 record.get("heap_after"), record.get("heap_total")])
+
+
+# Parses a log spooled by OutputPump ("<monotonic> <stream> <line>"), for recorded runs
+def parse_log(path):
+    parser = GcLogParser()
+    with open(path, "r") as file:
+        for entry in file:
+            timestamp, stream, line = entry.rstrip("\n").split(" ", 2)
+            parser.on_line(float(timestamp), stream, line)
+    return parser
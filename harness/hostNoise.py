@@ -0,0 +1,342 @@
+import bisect
+import csv
+import glob
+import json
+import math
+import os
+import threading
+import time
+
+PROC_STAT = "/proc/stat"
+PRESSURE_DIR = "/proc/pressure"
+CPU_DIR = "/sys/devices/system/cpu"
+# Root of the cgroup v2 hierarchy, on hybrid hosts it is mounted below unified
+CGROUP_ROOTS = ["/sys/fs/cgroup", "/sys/fs/cgroup/unified"]
+
+# Processes of the container runtime by their comm name (truncated to 15 characters, so the shims
+# show up as "containerd-shim"). The harness keeps them busy with its stats and events streams and
+# docker update/pause, their CPU time is counted as the benchmark's own and not as foreign load.
+CONTAINER_RUNTIME = ["dockerd", "containerd", "containerd-shim", "docker-proxy", "runc"]
+
+# Marker in the directory of a quarantined run, holds its noise summary
+QUARANTINE_FILE = "quarantined.json"
+
+# Results of summary(), all shares are fractions of the window (and of the host's CPUs)
+NOISE_METRICS = [
+    "host_steal",            # CPU time taken by the hypervisor
+    "host_iowait",           # idle time with outstanding I/O
+    "host_foreign_cpu",      # CPU time of processes outside the benchmark's cgroups and own processes
+    "host_cpu_pressure",     # PSI: some task waited for a CPU
+    "host_memory_pressure",  # PSI: some task stalled on memory
+    "host_memory_stall",     # PSI: all tasks stalled on memory
+    "host_io_pressure",      # PSI: some task waited for I/O
+    "host_throttle",         # thermal throttling time of the cores
+    "host_cpu_frequency",    # mean CPU frequency in MHz
+]
+
+# Components of the interference score. iowait and the "some" pressures are also caused
+# by the benchmark itself and are only recorded. cpuset_foreign is the foreign load on
+# the run's own CPU set (CpuSetUsage), added by the harness.
+SCORE_COMPONENTS = ["host_steal", "host_foreign_cpu", "host_memory_stall", "host_throttle", "cpuset_foreign"]
+
+
+# Host-wide counters come from procfs, other platforms have no host noise sampler
+def available():
+    return os.path.exists(PROC_STAT)
+
+
+# Highest finite score component, 0 if none is available
+def interference_score(noise):
+    values = [noise[name] for name in SCORE_COMPONENTS if name in noise and math.isfinite(noise[name])]
+    return max(values, default=0.0)
+
+
+# Components of a summary that exceed threshold, for the log message
+def noisy_components(noise, threshold):
+    return [name for name in SCORE_COMPONENTS if name in noise and math.isfinite(noise[name]) and noise[name] > threshold]
+
+
+# Marks a run directory as quarantined, its samples stay for inspection
+def quarantine(run_dir, noise):
+    os.makedirs(run_dir, exist_ok=True)
+    with open(os.path.join(run_dir, QUARANTINE_FILE), "w") as file:
+        json.dump(noise, file, indent=2)
+
+
+def is_quarantined(run_dir):
+    return os.path.exists(os.path.join(run_dir, QUARANTINE_FILE))
+
+
+# cgroup v2 directory of a process, None without a v2 hierarchy
+def process_cgroup(pid="self"):
+    try:
+        with open(f"/proc/{pid}/cgroup", "r") as file:
+            for line in file:
+                if line.startswith("0::"):
+                    relative = line[3:].strip().lstrip("/")
+                    for root in CGROUP_ROOTS:
+                        path = os.path.join(root, relative)
+                        if os.path.exists(os.path.join(path, "cpu.stat")):
+                            return path
+    except OSError:
+        pass
+    return None
+
+
+def read_cgroup_usage(path):
+    with open(os.path.join(path, "cpu.stat"), "r") as file:
+        for line in file:
+            key, value = line.split()
+            if key == "usage_usec":
+                return int(value) / 1e6
+    raise ValueError(f"No usage_usec in {path}/cpu.stat")
+
+
+# CPU seconds (user + system) of a process from /proc/<pid>/stat
+def read_process_cpu(pid, clock_ticks):
+    with open(f"/proc/{pid}/stat", "r") as file:
+        fields = file.read().rsplit(")", 1)[1].split()
+    # Fields after the name start with the state (field 3), utime and stime are fields 14 and 15
+    return (int(fields[11]) + int(fields[12])) / clock_ticks
+
+
+# CPU seconds of all processes with one of the given names since construction. Every update()
+# adds the deltas of the processes seen before, a process started since the last update counts
+# with all of its CPU time and one that exited in between with what was seen of it. Processes
+# whose cgroup skip() accepts are left out, their time is already counted through the cgroup.
+class ProcessCpuUsage:
+
+    def __init__(self, names, skip=None):
+        self.names = set(names)
+        self.skip = skip
+        self.clock_ticks = os.sysconf("SC_CLK_TCK")
+        self.matching = {}  # pid -> True if the process is counted
+        self.last = {}
+        self.seconds = 0.0
+        self.update(count_new=False)
+
+    def matches(self, pid):
+        try:
+            with open(f"/proc/{pid}/comm", "r") as file:
+                if file.read().strip() not in self.names:
+                    return False
+        except OSError:
+            return False
+        return self.skip is None or not self.skip(pid)
+
+    # Returns the CPU seconds counted so far
+    def update(self, count_new=True):
+        pids = {entry for entry in os.listdir("/proc") if entry.isdigit()}
+        for pid in list(self.matching):
+            if pid not in pids:
+                del self.matching[pid]
+                self.last.pop(pid, None)
+        for pid in pids:
+            if pid not in self.matching:
+                self.matching[pid] = self.matches(pid)
+            if not self.matching[pid]:
+                continue
+            try:
+                seconds = read_process_cpu(pid, self.clock_ticks)
+            except (OSError, IndexError, ValueError):
+                continue
+            if pid in self.last:
+                self.seconds += max(0.0, seconds - self.last[pid])
+            elif count_new:
+                self.seconds += seconds
+            self.last[pid] = seconds
+        return self.seconds
+
+
+# Host-wide jiffies of the "cpu" line: total, busy, steal and iowait, plus the number of CPUs
+def read_proc_stat():
+    cpus = 0
+    values = None
+    with open(PROC_STAT, "r") as file:
+        for line in file:
+            if line.startswith("cpu "):
+                # user nice system idle iowait irq softirq steal
+                values = [int(value) for value in line.split()[1:9]]
+            elif line.startswith("cpu"):
+                cpus += 1
+    total = sum(values)
+    busy = total - values[3] - values[4] - values[7]
+    return {"total": total, "busy": busy, "steal": values[7], "iowait": values[4], "cpus": cpus}
+
+
+# Cumulative stall times in microseconds, {"cpu_some": ..., "memory_full": ...}, empty without PSI
+def read_pressure():
+    pressure = {}
+    for resource in ("cpu", "memory", "io"):
+        try:
+            with open(os.path.join(PRESSURE_DIR, resource), "r") as file:
+                for line in file:
+                    kind, *fields = line.split()
+                    pressure[f"{resource}_{kind}"] = int(dict(field.split("=") for field in fields)["total"])
+        except (OSError, KeyError, ValueError):
+            continue
+    return pressure
+
+
+# Mean current frequency in MHz from cpufreq, /proc/cpuinfo on hosts without it
+def read_frequency():
+    frequencies = []
+    for path in glob.glob(os.path.join(CPU_DIR, "cpu[0-9]*", "cpufreq", "scaling_cur_freq")):
+        try:
+            with open(path, "r") as file:
+                frequencies.append(int(file.read()) / 1000)
+        except (OSError, ValueError):
+            continue
+    if not frequencies:
+        try:
+            with open("/proc/cpuinfo", "r") as file:
+                frequencies = [float(line.split(":")[1]) for line in file if line.startswith("cpu MHz")]
+        except (OSError, ValueError):
+            pass
+    return sum(frequencies) / len(frequencies) if frequencies else math.nan
+
+
+# Summed thermal throttling time of all cores in ms, None where the kernel does not report it
+def read_throttle_time():
+    paths = glob.glob(os.path.join(CPU_DIR, "cpu[0-9]*", "thermal_throttle", "core_throttle_total_time_ms"))
+    if not paths:
+        return None
+    total = 0
+    for path in paths:
+        try:
+            with open(path, "r") as file:
+                total += int(file.read())
+        except (OSError, ValueError):
+            continue
+    return total
+
+
+# Samples host-wide noise in the background for a whole sweep and scores the window of
+# every run: CPU steal and iowait, CPU time outside the benchmark's own cgroups and
+# processes (own_processes, names as in CONTAINER_RUNTIME), CPU frequency and thermal
+# throttling, and pressure stall information (PSI). Every tick is appended to a CSV file,
+# mark() and summary() measure a run's window exactly.
+class HostNoiseSampler:
+
+    def __init__(self, log_path=None, interval=0.5, own_cgroups=(), own_processes=()):
+        self.log_path = log_path
+        self.interval = interval
+        self.clock_ticks = os.sysconf("SC_CLK_TCK")
+        self.lock = threading.Lock()
+        # CPU seconds of the benchmark's cgroups, accumulated per tick so cgroups of exited containers still count
+        self.own_usage = {}
+        self.own_seconds = 0.0
+        for path in own_cgroups:
+            self.add_cgroup(path)
+        # Processes in one of the own cgroups are already counted with it
+        self.own_processes = ProcessCpuUsage(own_processes, lambda pid: process_cgroup(pid) in self.own_usage) if own_processes else None
+        self.frequency_times = []
+        self.frequencies = []
+        self.stopped = threading.Event()
+        self.thread = None
+
+    # Counts the CPU time of a cgroup as the benchmark's own from now on
+    def add_cgroup(self, path):
+        if path is None:
+            return
+        with self.lock:
+            if path in self.own_usage:
+                return
+            try:
+                self.own_usage[path] = read_cgroup_usage(path)
+            except (OSError, ValueError):
+                pass
+
+    def read_own_usage(self):
+        for path, last in list(self.own_usage.items()):
+            try:
+                usage = read_cgroup_usage(path)
+            except (OSError, ValueError):
+                # The cgroup is gone with its container
+                del self.own_usage[path]
+                continue
+            self.own_seconds += max(0.0, usage - last)
+            self.own_usage[path] = usage
+
+    # Cumulative counters at this moment
+    def snapshot(self):
+        with self.lock:
+            self.read_own_usage()
+            snapshot = read_proc_stat()
+            snapshot["time"] = time.monotonic()
+            snapshot["own"] = self.own_seconds if self.own_usage or self.own_seconds else None
+            if snapshot["own"] is not None and self.own_processes is not None:
+                snapshot["own"] += self.own_processes.update()
+            snapshot["pressure"] = read_pressure()
+            snapshot["throttle"] = read_throttle_time()
+            return snapshot
+
+    # Noise between two snapshots in the order of NOISE_METRICS, nan where the host does not report it
+    def shares(self, start, end, frequency=math.nan):
+        elapsed = end["time"] - start["time"]
+        total = end["total"] - start["total"]
+        noise = {name: math.nan for name in NOISE_METRICS}
+        if elapsed <= 0 or total <= 0:
+            return noise
+        capacity = elapsed * end["cpus"]
+        noise["host_steal"] = (end["steal"] - start["steal"]) / total
+        noise["host_iowait"] = (end["iowait"] - start["iowait"]) / total
+        if start["own"] is not None and end["own"] is not None:
+            busy_seconds = (end["busy"] - start["busy"]) / self.clock_ticks
+            noise["host_foreign_cpu"] = max(0.0, busy_seconds - (end["own"] - start["own"])) / capacity
+        for name, key in (("host_cpu_pressure", "cpu_some"), ("host_memory_pressure", "memory_some"),
+                          ("host_memory_stall", "memory_full"), ("host_io_pressure", "io_some")):
+            if key in start["pressure"] and key in end["pressure"]:
+                noise[name] = (end["pressure"][key] - start["pressure"][key]) / 1e6 / elapsed
+        if start["throttle"] is not None and end["throttle"] is not None:
+            noise["host_throttle"] = (end["throttle"] - start["throttle"]) / 1000 / capacity
+        noise["host_cpu_frequency"] = frequency
+        return noise
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def run(self):
+        log_file = None
+        writer = None
+        if self.log_path is not None:
+            log_file = open(self.log_path, "a", newline="")
+            writer = csv.writer(log_file)
+            if os.stat(self.log_path).st_size == 0:
+                writer.writerow(["time"] + NOISE_METRICS)
+        try:
+            last = self.snapshot()
+            while not self.stopped.wait(self.interval):
+                current = self.snapshot()
+                frequency = read_frequency()
+                with self.lock:
+                    self.frequency_times.append(current["time"])
+                    self.frequencies.append(frequency)
+                if writer is not None:
+                    noise = self.shares(last, current, frequency)
+                    writer.writerow([round(time.time(), 3)] + [round(noise[name], 4) for name in NOISE_METRICS])
+                    log_file.flush()
+                last = current
+        finally:
+            if log_file is not None:
+                log_file.close()
+
+    # Start of a run's window
+    def mark(self):
+        return self.snapshot()
+
+    # Noise from mark until now, the harness adds cpuset_foreign and the interference score
+    def summary(self, mark):
+        end = self.snapshot()
+        with self.lock:
+            first = bisect.bisect_left(self.frequency_times, mark["time"])
+            frequencies = [value for value in self.frequencies[first:] if math.isfinite(value)]
+        frequency = sum(frequencies) / len(frequencies) if frequencies else read_frequency()
+        return self.shares(mark, end, frequency)
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
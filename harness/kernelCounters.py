@@ -0,0 +1,124 @@
+import os
+
+# Values of KernelCounterCollector.collect() in this order, all deltas since the previous tick
+COUNTER_COLUMNS = [
+    ("ctx_voluntary", "d"),    # context switches while waiting (I/O, locks, sleep)
+    ("ctx_involuntary", "d"),  # context switches by preemption
+    ("minor_faults", "d"),
+    ("major_faults", "d"),     # page faults that needed I/O
+    ("io_read_bytes", "d"),    # bytes fetched from storage
+    ("io_write_bytes", "d"),   # bytes sent to storage
+]
+
+
+# Minor and major faults from /proc/<pid>/stat, they cover all threads including exited ones
+def parse_faults(data):
+    fields = data[data.rindex(b")") + 2:].split()
+    return int(fields[7]), int(fields[9])
+
+
+# read_bytes and write_bytes from /proc/<pid>/io
+def parse_io(data):
+    values = {}
+    for line in data.splitlines():
+        key, value = line.split(b":", 1)
+        values[key] = int(value)
+    return values[b"read_bytes"], values[b"write_bytes"]
+
+
+# Voluntary and involuntary context switches from /proc/<pid>/task/<tid>/status,
+# the status of a process only counts its main thread
+def parse_context_switches(data):
+    start = data.index(b"voluntary_ctxt_switches:")
+    fields = data[start:].split()
+    return int(fields[1]), int(fields[3])
+
+
+# Kernel event counters of a set of processes: context switches summed over all threads,
+# page faults and storage I/O per process. Every file stays open, a tick is one pread per
+# process for stat and io, one listdir per process and one pread per thread for status.
+class KernelCounterCollector:
+
+    def __init__(self, pids=()):
+        self.process_fds = {}
+        self.status_fds = {}
+        self.last = {}
+        self.update_pids(pids)
+        # Processes and threads that already exist at start only count from now on
+        self.last = self.read()
+
+    # Follows the processes of a tree, files of exited processes are closed
+    def update_pids(self, pids):
+        pids = set(pids)
+        for pid in pids - set(self.process_fds):
+            fds = []
+            try:
+                for name in ("task", "stat", "io"):
+                    flags = os.O_RDONLY | os.O_DIRECTORY if name == "task" else os.O_RDONLY
+                    fds.append(os.open(f"/proc/{pid}/{name}", flags))
+            except OSError:
+                # The process has exited or its io file is not readable
+                for fd in fds:
+                    os.close(fd)
+                continue
+            self.process_fds[pid] = fds
+        for pid in set(self.process_fds) - pids:
+            self.close_process(pid)
+
+    def close_process(self, pid):
+        for fd in self.process_fds.pop(pid):
+            os.close(fd)
+
+    # Cumulative counters, {pid: (minor, major, read, write)} and {(pid, tid): (voluntary, involuntary)}
+    def read(self):
+        processes = {}
+        threads = {}
+        for pid, (task_fd, stat_fd, io_fd) in list(self.process_fds.items()):
+            try:
+                processes[pid] = parse_faults(os.pread(stat_fd, 1024, 0)) + parse_io(os.pread(io_fd, 512, 0))
+                tids = os.listdir(task_fd)
+            except (OSError, ValueError, KeyError):
+                # The process has exited
+                self.close_process(pid)
+                continue
+            for tid in tids:
+                key = (pid, tid)
+                fd = self.status_fds.get(key)
+                try:
+                    if fd is None:
+                        fd = os.open(f"{tid}/status", os.O_RDONLY, dir_fd=task_fd)
+                        self.status_fds[key] = fd
+                    threads[key] = parse_context_switches(os.pread(fd, 4096, 0))
+                except (OSError, ValueError, IndexError):
+                    # The thread exited between listdir and read
+                    continue
+
+        # Status files of exited threads are closed
+        for key in set(self.status_fds) - set(threads):
+            os.close(self.status_fds.pop(key))
+        return processes, threads
+
+    # Deltas since the previous tick in the order of COUNTER_COLUMNS. Processes and threads
+    # that appeared since count from 0, the last interval of exited ones is lost.
+    def collect(self):
+        processes, threads = self.read()
+        last_processes, last_threads = self.last
+        self.last = (processes, threads)
+
+        deltas = [0] * len(COUNTER_COLUMNS)
+        for (pid, tid), values in threads.items():
+            last = last_threads.get((pid, tid), (0, 0))
+            deltas[0] += values[0] - last[0]
+            deltas[1] += values[1] - last[1]
+        for pid, values in processes.items():
+            last = last_processes.get(pid, (0, 0, 0, 0))
+            for index, (value, previous) in enumerate(zip(values, last)):
+                deltas[2 + index] += value - previous
+        return tuple(deltas)
+
+    def close(self):
+        for pid in list(self.process_fds):
+            self.close_process(pid)
+        for fd in self.status_fds.values():
+            os.close(fd)
+        self.status_fds = {}
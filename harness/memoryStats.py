@@ -0,0 +1,84 @@
+import os
+import time
+
+# Values of SmapsCollector.collect() in MB in this order, empty on ticks without a read
+SMAPS_COLUMNS = [
+    ("memory_pss", "d"),   # proportional set size, shared pages split among their users
+    ("memory_uss", "d"),   # unique set size, pages only this process tree maps
+    ("memory_anon", "d"),  # anonymous pages (heap, stacks), the working memory
+    ("memory_file", "d"),  # file-backed and shared memory pages
+]
+
+
+# Fields of /proc/<pid>/smaps_rollup in kB, {b"Pss": ..., b"Private_Dirty": ...}
+def parse_smaps_rollup(data):
+    values = {}
+    # The first line holds the address range of the rollup
+    for line in data.splitlines()[1:]:
+        fields = line.split()
+        if len(fields) >= 2 and fields[0].endswith(b":"):
+            values[fields[0][:-1]] = int(fields[1])
+    return values
+
+
+# PSS, USS and the anonymous/file split of a set of processes from /proc/<pid>/smaps_rollup.
+# Reading smaps_rollup walks every mapping of a process and gets expensive on large heaps, so
+# the collector runs at an adaptive rate: after each read the next one is due once the time
+# spent reading is at most budget of the elapsed time, between min_interval and max_interval.
+class SmapsCollector:
+
+    def __init__(self, pids=(), budget=0.01, min_interval=0.1, max_interval=5.0):
+        self.budget = budget
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.fds = {}
+        self.next_read = 0.0
+        self.reads = 0
+        self.read_seconds = 0.0
+        self.update_pids(pids)
+
+    # Follows the processes of a tree, files of exited processes are closed
+    def update_pids(self, pids):
+        pids = set(pids)
+        for pid in pids - set(self.fds):
+            try:
+                self.fds[pid] = os.open(f"/proc/{pid}/smaps_rollup", os.O_RDONLY)
+            except OSError:
+                # The process has exited or the kernel has no smaps_rollup (before 4.14)
+                continue
+        for pid in set(self.fds) - pids:
+            os.close(self.fds.pop(pid))
+
+    # Summed values in MB in the order of SMAPS_COLUMNS, None for every column while no read is due
+    def collect(self):
+        start = time.monotonic()
+        if start < self.next_read or not self.fds:
+            return tuple(None for _ in SMAPS_COLUMNS)
+
+        totals = {"pss": 0, "uss": 0, "anon": 0, "file": 0}
+        for pid, fd in list(self.fds.items()):
+            try:
+                values = parse_smaps_rollup(os.pread(fd, 4096, 0))
+            except (OSError, ValueError):
+                # The process has exited
+                os.close(self.fds.pop(pid))
+                continue
+            totals["pss"] += values.get(b"Pss", 0)
+            totals["uss"] += values.get(b"Private_Clean", 0) + values.get(b"Private_Dirty", 0)
+            totals["anon"] += values.get(b"Anonymous", 0)
+            totals["file"] += values.get(b"Rss", 0) - values.get(b"Anonymous", 0)
+
+        cost = time.monotonic() - start
+        self.reads += 1
+        self.read_seconds += cost
+        self.next_read = start + min(max(cost / self.budget, self.min_interval), self.max_interval)
+        return tuple(totals[name] / 1024 for name in ("pss", "uss", "anon", "file"))
+
+    # Mean duration of one read in ms, for the log
+    def mean_cost_ms(self):
+        return self.read_seconds / self.reads * 1000 if self.reads else 0.0
+
+    def close(self):
+        for fd in self.fds.values():
+            os.close(fd)
+        self.fds = {}
@@ -0,0 +1,93 @@
+import threading
+import time
+
+
+# Drains stdout and stderr of a launched process in background threads.
+# Every line is timestamped with time.monotonic(), spooled to a log file and
+# checked against the registered markers as soon as it arrives.
+class OutputPump:
+
+    def __init__(self, process, log_path=None, echo=True):
+        self.process = process
+        self.echo = echo
+        self.markers = []
+        self.line_callbacks = []
+        self.lock = threading.Lock()
+        self.first_line_at = None
+        self.detached = False
+        self.log_file = open(log_path, "a", encoding="utf-8") if log_path else None
+        self.threads = []
+
+    # callback(timestamp, line) runs on the pump thread for every line containing text
+    def on_marker(self, text, callback):
+        self.markers.append((text, callback))
+
+    # callback(timestamp, stream, line) runs on the pump thread for every line
+    def on_line(self, callback):
+        self.line_callbacks.append(callback)
+
+    # Event that is set on the first line containing text, event.timestamp holds its arrival time
+    def marker_event(self, text):
+        event = threading.Event()
+        event.timestamp = None
+
+        def set_event(timestamp, line):
+            if not event.is_set():
+                event.timestamp = timestamp
+                event.set()
+
+        self.on_marker(text, set_event)
+        return event
+
+    def start(self):
+        for stream_name, pipe in (("stdout", self.process.stdout), ("stderr", self.process.stderr)):
+            if pipe is None:
+                continue
+            thread = threading.Thread(target=self.drain, args=(pipe, stream_name), daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def drain(self, pipe, stream_name):
+        for raw in pipe:
+            timestamp = time.monotonic()
+            line = raw.decode(errors="replace") if isinstance(raw, bytes) else raw
+            self.handle_line(timestamp, stream_name, line.rstrip("\r\n"))
+        pipe.close()
+
+    def handle_line(self, timestamp, stream_name, line):
+        with self.lock:
+            if self.detached:
+                return
+            if self.first_line_at is None:
+                self.first_line_at = timestamp
+            if self.log_file is not None:
+                self.log_file.write(f"{timestamp:.6f} {stream_name} {line}\n")
+
+        if self.echo and line.strip():
+            print(line)
+        for callback in self.line_callbacks:
+            callback(timestamp, stream_name, line)
+        for text, callback in self.markers:
+            if text in line:
+                callback(timestamp, line)
+
+    # Waits for a marker event, gives up once the process has exited without it
+    def wait_for(self, event, poll_interval=0.5):
+        while not event.wait(poll_interval):
+            if self.process.poll() is not None:
+                return event.wait(poll_interval)
+        return True
+
+    # Stops logging and callbacks, the pipes keep being drained so the process never blocks
+    def detach(self):
+        with self.lock:
+            self.detached = True
+            if self.log_file is not None:
+                self.log_file.close()
+                self.log_file = None
+
+    def join(self, timeout=None):
+        for thread in self.threads:
+            thread.join(timeout)
+        self.detach()
@@ -0,0 +1,209 @@
+import json
+import math
+import os
+
+import numpy as np
+
+QUANTILES = [0.5, 0.95, 0.99]
+
+# Per-run sketch file next to the column files of a run
+SKETCH_FILE = "sketches.json"
+
+
+# Integral sweep points (max_depth) are reported as int again
+def point_value(point):
+    return int(point) if float(point).is_integer() else point
+
+
+# Mergeable quantile sketch with relative accuracy (DDSketch). Values are counted
+# in logarithmic buckets, so any quantile is within relative_accuracy of the true
+# value, and sketches of several runs merge by adding bucket counts.
+class QuantileSketch:
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value):
+        self.add_array(np.asarray([value], dtype=float))
+
+    # Adds all finite values of an array with a single bucket computation
+    def add_array(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return
+        self.count += int(values.size)
+
+        zero = np.abs(values) < 1e-12
+        self.zero_count += int(zero.sum())
+        for store, selected in ((self.positive, values[values >= 1e-12]), (self.negative, -values[values <= -1e-12])):
+            if selected.size == 0:
+                continue
+            indices, counts = np.unique(np.ceil(np.log(selected) / self.log_gamma).astype(np.int64), return_counts=True)
+            for index, count in zip(indices.tolist(), counts.tolist()):
+                store[index] = store.get(index, 0) + count
+
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in other_store.items():
+                store[index] = store.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def bucket_value(self, index):
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def quantile(self, q):
+        if self.count == 0:
+            return math.nan
+        rank = q * (self.count - 1)
+
+        seen = 0
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self.bucket_value(index)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self.bucket_value(index)
+        return self.bucket_value(max(self.positive)) if self.positive else 0.0
+
+    def to_dict(self):
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "positive": {str(index): count for index, count in self.positive.items()},
+            "negative": {str(index): count for index, count in self.negative.items()},
+            "zero_count": self.zero_count,
+            "count": self.count
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["relative_accuracy"])
+        sketch.positive = {int(index): count for index, count in data["positive"].items()}
+        sketch.negative = {int(index): count for index, count in data["negative"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        return sketch
+
+
+# Running statistics of one metric: count, min, max, mean and variance (Welford/Chan)
+# plus a quantile sketch, all updated in a single pass and mergeable
+class MetricStats:
+
+    def __init__(self):
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sketch = QuantileSketch()
+
+    def add_array(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return
+        chunk_count = values.size
+        chunk_mean = float(values.mean())
+        chunk_m2 = float(((values - chunk_mean) ** 2).sum())
+        self.combine(chunk_count, chunk_mean, chunk_m2, float(values.min()), float(values.max()))
+        self.sketch.add_array(values)
+
+    def combine(self, count, mean, m2, minimum, maximum):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        self.combine(other.count, other.mean, other.m2, other.min, other.max)
+        self.sketch.merge(other.sketch)
+
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    # All statistics, linear ones multiplied with scale (e.g. CPU normalisation)
+    def summary(self, scale=1.0):
+        if self.count == 0:
+            return {"count": 0}
+        result = {
+            "count": self.count,
+            "min": self.min * scale,
+            "max": self.max * scale,
+            "mean": self.mean * scale,
+            "variance": self.variance() * scale * scale
+        }
+        for q in QUANTILES:
+            # The bucket midpoint can lie slightly outside the observed range
+            result[f"p{round(q * 100)}"] = min(max(self.sketch.quantile(q), self.min), self.max) * scale
+        return result
+
+    def to_dict(self):
+        return {"count": self.count, "min": self.min, "max": self.max, "mean": self.mean, "m2": self.m2,
+                "sketch": self.sketch.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.count = data["count"]
+        stats.min = data["min"]
+        stats.max = data["max"]
+        stats.mean = data["mean"]
+        stats.m2 = data["m2"]
+        stats.sketch = QuantileSketch.from_dict(data["sketch"])
+        return stats
+
+
+# Sink for the sample store: keeps MetricStats per sweep point and metric while the
+# run is sampled and writes them to sketches.json when the run is closed, so runs
+# can be aggregated and merged without reading their raw samples
+class SketchSink:
+
+    def __init__(self, directory, columns, group_column, skip=("timestamp",)):
+        self.path = os.path.join(directory, SKETCH_FILE)
+        self.group_column = group_column
+        self.metrics = [name for name, _ in columns if name != group_column and name not in skip]
+        self.points = {}
+
+    def write_batch(self, batch):
+        groups = np.asarray(batch[self.group_column], dtype=float)
+        for point in np.unique(groups[np.isfinite(groups)]):
+            selection = groups == point
+            stats = self.points.setdefault(float(point), {metric: MetricStats() for metric in self.metrics})
+            for metric in self.metrics:
+                stats[metric].add_array(np.asarray(batch[metric], dtype=float)[selection])
+
+    def close(self):
+        data = {
+            "group_column": self.group_column,
+            "points": {repr(point): {metric: stats.to_dict() for metric, stats in metrics.items()}
+                       for point, metrics in self.points.items()}
+        }
+        with open(self.path, "w") as file:
+            json.dump(data, file)
+
+
+# Reads a sketches.json file, returns {point: {metric: MetricStats}}
+def load_sketches(path):
+    with open(path, "r") as file:
+        data = json.load(file)
+    return {float(point): {metric: MetricStats.from_dict(stats) for metric, stats in metrics.items()}
+            for point, metrics in data["points"].items()}
@@ -0,0 +1,80 @@
+import math
+
+# Two-sided 95 % quantiles of Student's t distribution for 1 to 30 degrees of freedom
+T_QUANTILES = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+               2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+               2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
+
+
+def t_quantile(degrees_of_freedom):
+    if degrees_of_freedom <= len(T_QUANTILES):
+        return T_QUANTILES[degrees_of_freedom - 1]
+    if degrees_of_freedom <= 60:
+        return 2.000 + (2.042 - 2.000) * (60 - degrees_of_freedom) / 30
+    return 1.960
+
+
+# Mean and half width of the 95 % confidence interval, the half width is nan below two values
+def confidence_interval(values):
+    values = [value for value in values if value is not None and math.isfinite(value)]
+    if not values:
+        return math.nan, math.nan
+    mean = sum(values) / len(values)
+    if len(values) < 2:
+        return mean, math.nan
+    variance = sum((value - mean) ** 2 for value in values) / (len(values) - 1)
+    return mean, t_quantile(len(values) - 1) * math.sqrt(variance / len(values))
+
+
+# Repeats one sweep point until the 95 % confidence interval of metric is narrower than
+# target_width relative to its mean, or until max_runs repetitions have been made.
+# Every repetition adds a dict of results, metric names one of its keys.
+class RepetitionController:
+
+    def __init__(self, metric="execution_time", target_width=0.05, min_runs=3, max_runs=10):
+        self.metric = metric
+        self.target_width = target_width
+        self.min_runs = min_runs
+        self.max_runs = max_runs
+        self.results = []
+
+    def add(self, result):
+        self.results.append(result)
+
+    def values(self, metric=None):
+        return [result.get(metric or self.metric) for result in self.results]
+
+    def interval(self, metric=None):
+        return confidence_interval(self.values(metric))
+
+    # Full width of the interval relative to the mean
+    def relative_width(self):
+        mean, half_width = self.interval()
+        if math.isnan(half_width) or mean == 0:
+            return math.inf
+        return 2 * half_width / abs(mean)
+
+    def done(self):
+        runs = len(self.results)
+        if runs >= self.max_runs:
+            return True
+        return runs >= self.min_runs and self.relative_width() <= self.target_width
+
+    # Columns of this sweep point in measurement_log_time.csv as (suffix, value): the mean
+    # execution time, its confidence half width, the number of repetitions and every single
+    # repetition, plus mean and half width of metric if it is not the execution time and of
+    # every further metric in metrics
+    def time_log_fields(self, metrics=()):
+        mean, half_width = self.interval("execution_time")
+        fields = [
+            ("", round(mean, 2)),
+            ("_ci", round(half_width, 3)),
+            ("_n", len(self.results)),
+            ("_runs", ";".join(str(value) for value in self.values("execution_time")))
+        ]
+        for metric in dict.fromkeys([self.metric] + list(metrics)):
+            if metric == "execution_time":
+                continue
+            metric_mean, metric_half_width = self.interval(metric)
+            fields += [(f"_{metric}", round(metric_mean, 2)), (f"_{metric}_ci", round(metric_half_width, 3))]
+        return [(suffix, "N/A" if isinstance(value, float) and math.isnan(value) else value) for suffix, value in fields]
@@ -0,0 +1,300 @@
+import contextlib
+import hashlib
+import json
+import math
+import os
+import platform
+import sqlite3
+import subprocess
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from .quantileSketch import MetricStats, point_value
+from .repetitionController import confidence_interval
+
+SQL_TYPES = {"d": "REAL", "q": "INTEGER"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS configs (
+    config_id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    config TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sweeps (
+    sweep_id INTEGER PRIMARY KEY,
+    harness TEXT NOT NULL,
+    config_id INTEGER NOT NULL REFERENCES configs (config_id),
+    host TEXT,
+    git_commit TEXT,
+    started_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    sweep_id INTEGER NOT NULL REFERENCES sweeps (sweep_id),
+    algorithm TEXT NOT NULL,
+    sweep_param REAL NOT NULL,
+    point TEXT,
+    status TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    execution_time REAL,
+    run_dir TEXT,
+    cpus TEXT,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_algorithm_param ON runs (algorithm, sweep_param, run_id);
+CREATE INDEX IF NOT EXISTS runs_sweep ON runs (sweep_id);
+CREATE TABLE IF NOT EXISTS aggregates (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    metric TEXT NOT NULL,
+    count INTEGER,
+    min REAL,
+    max REAL,
+    mean REAL,
+    variance REAL,
+    stats TEXT NOT NULL,
+    PRIMARY KEY (run_id, metric)
+);
+"""
+
+
+# Run statuses that count for aggregates, runs with host noise are quarantined and only included on request
+def counted_statuses(include_quarantined=False):
+    return ["complete", "quarantined"] if include_quarantined else ["complete"]
+
+
+# Key of a sweep point in the runs table: its axis values as JSON with sorted names, so runs of
+# different sweeps with the same values match while their position in the sweep may differ
+def point_key(values):
+    return json.dumps(values, sort_keys=True, default=str)
+
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=5,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout.strip() or None
+
+
+# SQLite database with every sweep, its configuration, the runs, their samples and
+# per-run aggregates. One connection is shared by the sampling threads of parallel
+# runs, writes are serialised by a lock and every batch is a single transaction.
+class ResultsStore:
+
+    def __init__(self, path, columns=None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # Readers (plotting) do not block the writer while a sweep is running
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        # Databases from before the point column get it, their runs are only found by sweep_param
+        if "point" not in {row[1] for row in self.connection.execute("PRAGMA table_info(runs)")}:
+            self.connection.execute("ALTER TABLE runs ADD COLUMN point TEXT")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS runs_algorithm_point ON runs (algorithm, point, run_id)")
+        self.sample_columns = []
+        if columns is not None:
+            self.create_samples_table(columns)
+
+    # The samples table has one column per sample column of the harness,
+    # columns added to the harness later are added to an existing table
+    def create_samples_table(self, columns):
+        self.sample_columns = [name for name, _ in columns]
+        definitions = ", ".join(f"{name} {SQL_TYPES[typecode]}" for name, typecode in columns)
+        with self.lock:
+            self.connection.execute(f"CREATE TABLE IF NOT EXISTS samples (run_id INTEGER NOT NULL, algorithm TEXT NOT NULL, "
+                                    f"sweep_param REAL NOT NULL, {definitions})")
+            existing = {row[1] for row in self.connection.execute("PRAGMA table_info(samples)")}
+            for name, typecode in columns:
+                if name not in existing:
+                    self.connection.execute(f"ALTER TABLE samples ADD COLUMN {name} {SQL_TYPES[typecode]}")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS samples_algorithm_param ON samples (algorithm, sweep_param, run_id)")
+
+    def write(self, sql, parameters=()):
+        with self.lock:
+            return self.connection.execute(sql, parameters)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        with self.lock:
+            self.connection.execute("BEGIN")
+            try:
+                yield self.connection
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+
+    def start_sweep(self, harness, config):
+        text = json.dumps(config, sort_keys=True, default=str)
+        config_hash = hashlib.sha256(text.encode()).hexdigest()
+        commit = git_commit()
+        with self.transaction() as connection:
+            connection.execute("INSERT OR IGNORE INTO configs (hash, config) VALUES (?, ?)", (config_hash, text))
+            config_id = connection.execute("SELECT config_id FROM configs WHERE hash = ?", (config_hash,)).fetchone()[0]
+            cursor = connection.execute(
+                "INSERT INTO sweeps (harness, config_id, host, git_commit, started_at) VALUES (?, ?, ?, ?, ?)",
+                (harness, config_id, platform.node(), commit, time.time()))
+        return cursor.lastrowid
+
+    def finish_sweep(self, sweep_id):
+        self.write("UPDATE sweeps SET finished_at = ? WHERE sweep_id = ?", (time.time(), sweep_id))
+
+    # point holds the axis values ({axis: value}) when sweep_param is only the position in the sweep
+    def start_run(self, sweep_id, algorithm, sweep_param, run_dir=None, cpus=None, point=None):
+        cursor = self.write("INSERT INTO runs (sweep_id, algorithm, sweep_param, point, status, started_at, run_dir, cpus) "
+                            "VALUES (?, ?, ?, ?, 'running', ?, ?, ?)",
+                            (sweep_id, algorithm, float(sweep_param), point_key(point) if point is not None else None,
+                             time.time(), run_dir, cpus))
+        return cursor.lastrowid
+
+    # Sets the axis values of runs stored without them, points maps sweep_param to {axis: value}
+    def backfill_points(self, sweep_id, points):
+        with self.transaction() as connection:
+            for sweep_param, values in points.items():
+                connection.execute("UPDATE runs SET point = ? WHERE sweep_id = ? AND sweep_param = ? AND point IS NULL",
+                                   (point_key(values), sweep_id, float(sweep_param)))
+
+    # status is "complete", "quarantined" or "discarded", metrics maps metric names to MetricStats
+    def finish_run(self, run_id, status, execution_time=None, result=None, metrics=None):
+        with self.transaction() as connection:
+            connection.execute("UPDATE runs SET status = ?, execution_time = ?, result = ? WHERE run_id = ?",
+                               (status, execution_time, json.dumps(result) if result is not None else None, run_id))
+            for metric, stats in (metrics or {}).items():
+                summary = stats.summary()
+                connection.execute(
+                    "INSERT OR REPLACE INTO aggregates (run_id, metric, count, min, max, mean, variance, stats) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, metric, stats.count, summary.get("min"), summary.get("max"), summary.get("mean"),
+                     summary.get("variance"), json.dumps(stats.to_dict())))
+
+    # Runs of a sweep that were still running when it was interrupted: their partial samples and
+    # aggregates are deleted and they are marked as interrupted. Returns their run directories.
+    def discard_incomplete_runs(self, sweep_id):
+        with self.transaction() as connection:
+            rows = connection.execute("SELECT run_id, run_dir FROM runs WHERE sweep_id = ? AND status = 'running'",
+                                      (sweep_id,)).fetchall()
+            for run_id, _ in rows:
+                connection.execute("DELETE FROM samples WHERE run_id = ?", (run_id,))
+                connection.execute("DELETE FROM aggregates WHERE run_id = ?", (run_id,))
+                connection.execute("UPDATE runs SET status = 'interrupted' WHERE run_id = ?", (run_id,))
+        return [run_dir for _, run_dir in rows if run_dir]
+
+    def insert_samples(self, run_id, algorithm, sweep_param, batch):
+        rows = zip(*(batch[name] for name in self.sample_columns))
+        placeholders = ", ".join("?" for _ in range(len(self.sample_columns) + 3))
+        sql = f"INSERT INTO samples (run_id, algorithm, sweep_param, {', '.join(self.sample_columns)}) VALUES ({placeholders})"
+        # NaN marks a missing value in the buffers, SQLite stores it as NULL
+        rows = [(run_id, algorithm, sweep_param) + tuple(None if isinstance(value, float) and math.isnan(value) else value
+                                                         for value in row) for row in rows]
+        with self.transaction() as connection:
+            connection.executemany(sql, rows)
+
+    def latest_sweep(self, harness):
+        row = self.connection.execute("SELECT max(sweep_id) FROM sweeps WHERE harness = ?", (harness,)).fetchone()
+        return row[0]
+
+    # Configuration a sweep was started with
+    def sweep_config(self, sweep_id):
+        row = self.connection.execute("SELECT configs.config FROM sweeps JOIN configs ON configs.config_id = sweeps.config_id "
+                                      "WHERE sweeps.sweep_id = ?", (sweep_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    # status is one status or a list of them
+    def runs(self, sweep_ids=None, algorithm=None, status="complete"):
+        statuses = [status] if isinstance(status, str) else list(status)
+        query = f"SELECT * FROM runs WHERE status IN ({', '.join('?' for _ in statuses)})"
+        parameters = statuses
+        if sweep_ids:
+            query += f" AND sweep_id IN ({', '.join('?' for _ in sweep_ids)})"
+            parameters += list(sweep_ids)
+        if algorithm:
+            query += " AND algorithm = ?"
+            parameters.append(algorithm)
+        return pd.read_sql_query(query + " ORDER BY algorithm, sweep_param, run_id", self.connection, params=parameters)
+
+    # Axis values ({axis: value}) of the points the runs of the sweeps were measured at, in
+    # the order of their sweep_param. Runs stored without axis values are left out.
+    def run_points(self, sweep_ids):
+        query = (f"SELECT point FROM runs WHERE point IS NOT NULL AND sweep_id IN ({', '.join('?' for _ in sweep_ids)}) "
+                 "GROUP BY point ORDER BY min(sweep_param), point")
+        return [json.loads(row[0]) for row in self.connection.execute(query, list(sweep_ids))]
+
+    # Merged MetricStats per (algorithm, sweep point) of all complete runs of the sweeps.
+    # points maps point keys to the sweep point they are reported as, runs are then matched
+    # by their axis values instead of sweep_param and runs of other points are left out.
+    def merged_stats(self, sweep_ids, metrics, include_quarantined=False, points=None):
+        statuses = counted_statuses(include_quarantined)
+        query = ("SELECT runs.algorithm, runs.sweep_param, runs.point, aggregates.metric, aggregates.stats FROM aggregates "
+                 "JOIN runs ON runs.run_id = aggregates.run_id "
+                 f"WHERE runs.status IN ({', '.join('?' for _ in statuses)}) AND runs.sweep_id IN ({', '.join('?' for _ in sweep_ids)}) "
+                 f"AND aggregates.metric IN ({', '.join('?' for _ in metrics)})")
+        merged = {}
+        for algorithm, sweep_param, key, metric, data in self.connection.execute(query, statuses + list(sweep_ids) + list(metrics)):
+            point = sweep_param if points is None else points.get(key)
+            if point is None:
+                continue
+            point_stats = merged.setdefault((algorithm, point), {})
+            point_stats.setdefault(metric, MetricStats()).merge(MetricStats.from_dict(json.loads(data)))
+        return merged
+
+    # Same layout as measurement_log_time.csv: mean execution time, confidence interval and
+    # number of runs per algorithm and sweep point, plus mean and confidence interval of the
+    # per-run means of metrics. points matches runs by their axis values as in merged_stats.
+    def time_frame(self, sweep_ids, group_column, algorithms, metrics=(), include_quarantined=False, points=None):
+        runs = self.runs(sweep_ids, status=counted_statuses(include_quarantined))
+        if points is not None:
+            runs["sweep_param"] = runs["point"].map(points)
+            runs = runs.dropna(subset=["sweep_param"])
+        runs["result"] = [json.loads(result) if result else {} for result in runs["result"]]
+        points = sorted(runs["sweep_param"].unique())
+        columns = {group_column: [point_value(point) for point in points]}
+        for algorithm in algorithms:
+            selected = runs[runs["algorithm"] == algorithm]
+            per_point = [selected[selected["sweep_param"] == point] for point in points]
+            intervals = [confidence_interval(point_runs["execution_time"].tolist()) for point_runs in per_point]
+            columns[algorithm] = [round(mean, 2) for mean, _ in intervals]
+            columns[f"{algorithm}_ci"] = [round(half_width, 3) for _, half_width in intervals]
+            columns[f"{algorithm}_n"] = [len(point_runs) for point_runs in per_point]
+            for metric in metrics:
+                intervals = [confidence_interval([result.get(metric) for result in point_runs["result"]]) for point_runs in per_point]
+                columns[f"{algorithm}_{metric}"] = [mean for mean, _ in intervals]
+                columns[f"{algorithm}_{metric}_ci"] = [half_width for _, half_width in intervals]
+        return pd.DataFrame(columns)
+
+    # Raw samples of one algorithm and sweep point, optionally restricted to some runs
+    def samples(self, algorithm, sweep_param, run_ids=None, columns=None):
+        selected = ", ".join(columns or self.sample_columns or ["*"])
+        query = f"SELECT run_id, {selected} FROM samples WHERE algorithm = ? AND sweep_param = ?"
+        parameters = [algorithm, float(sweep_param)]
+        if run_ids:
+            query += f" AND run_id IN ({', '.join('?' for _ in run_ids)})"
+            parameters += list(run_ids)
+        return pd.read_sql_query(query, self.connection, params=parameters)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+# Sink for the sample store, writes every flushed batch of one run in a single transaction
+class ResultsSink:
+
+    def __init__(self, results, run_id, algorithm, sweep_param):
+        self.results = results
+        self.run_id = run_id
+        self.algorithm = algorithm
+        self.sweep_param = float(sweep_param)
+
+    def write_batch(self, batch):
+        self.results.insert_samples(self.run_id, self.algorithm, self.sweep_param,
+                                    {name: np.asarray(values).tolist() for name, values in batch.items()})
+
+    def close(self):
+        pass
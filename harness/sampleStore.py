@@ -0,0 +1,162 @@
+import array
+import csv
+import itertools
+import json
+import math
+import os
+import sys
+import threading
+
+import numpy as np
+
+# numpy dtype strings for the array typecodes, used to memory-map the column files
+BYTE_ORDER = "<" if sys.byteorder == "little" else ">"
+DTYPES = {"d": BYTE_ORDER + "f8", "q": BYTE_ORDER + "i8"}
+MISSING = {"d": math.nan, "q": 0}
+
+META_FILE = "columns.json"
+
+
+# Appends every column to its own raw binary file (<name>.bin) that numpy can memory-map
+class ColumnFileSink:
+
+    def __init__(self, directory, columns):
+        self.directory = directory
+        self.columns = columns
+        self.rows = 0
+        os.makedirs(directory, exist_ok=True)
+        self.files = {name: open(os.path.join(directory, f"{name}.bin"), "ab") for name, _ in columns}
+        self.write_meta(complete=False)
+
+    def write_meta(self, complete):
+        meta = {
+            "columns": [{"name": name, "dtype": DTYPES[typecode]} for name, typecode in self.columns],
+            "rows": self.rows,
+            "complete": complete
+        }
+        with open(os.path.join(self.directory, META_FILE), "w") as file:
+            json.dump(meta, file)
+
+    def write_batch(self, batch):
+        for name, _ in self.columns:
+            batch[name].tofile(self.files[name])
+            self.files[name].flush()
+        self.rows += len(batch[self.columns[0][0]])
+
+    def close(self):
+        for file in self.files.values():
+            file.close()
+        self.write_meta(complete=True)
+
+
+# Optional CSV export, written from the flush thread instead of the sampling loop.
+# header fixes the file layout (names and order), so the export keeps its format when
+# the store gains columns. Names in constants are written with the same value in every
+# row (e.g. the sweep point a run measures), all other names are store columns.
+class CsvSink:
+
+    def __init__(self, path, header, constants=None):
+        self.header = header
+        self.constants = constants or {}
+        self.file = open(path, "a", newline="")
+        self.writer = csv.writer(self.file)
+        if os.stat(path).st_size == 0:
+            self.writer.writerow(header)
+
+    def write_batch(self, batch):
+        rows = len(next(iter(batch.values())))
+        columns = [itertools.repeat(self.constants[name], rows) if name in self.constants else batch[name]
+                   for name in self.header]
+        self.writer.writerows(zip(*columns))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+# In-memory ring buffer of typed columns. The sampling loop only stores values,
+# a writer thread hands the filled part to the sinks in batches.
+# Single producer and single consumer, so no lock is needed on the append path.
+class SampleStore:
+
+    def __init__(self, columns, sinks, capacity=65536, flush_interval=1.0):
+        self.columns = columns
+        self.names = [name for name, _ in columns]
+        self.sinks = sinks
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.buffers = [array.array(typecode, [MISSING[typecode]]) * capacity for _, typecode in columns]
+        self.missing = [MISSING[typecode] for _, typecode in columns]
+        self.head = 0  # number of rows appended
+        self.tail = 0  # number of rows handed to the sinks
+        self.dropped = 0
+
+        self.wakeup = threading.Event()
+        self.stopped = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    # Stores one row in column order, None marks a missing value
+    def append(self, row):
+        if self.head - self.tail >= self.capacity:
+            # The writer thread fell behind by a whole buffer, drop instead of blocking the sampler
+            self.dropped += 1
+            return
+        index = self.head % self.capacity
+        for buffer, value, missing in zip(self.buffers, row, self.missing):
+            buffer[index] = missing if value is None else value
+        self.head += 1
+        if self.head - self.tail >= self.capacity // 2:
+            self.wakeup.set()
+
+    def run(self):
+        while not self.stopped:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        head = self.head
+        if head == self.tail:
+            return
+        start = self.tail % self.capacity
+        end = head % self.capacity
+        batch = {}
+        for name, buffer in zip(self.names, self.buffers):
+            if start < end:
+                batch[name] = buffer[start:end]
+            else:
+                # The filled region wraps around the end of the buffer
+                batch[name] = buffer[start:] + buffer[:end]
+        for sink in self.sinks:
+            sink.write_batch(batch)
+        self.tail = head
+
+    def close(self):
+        self.stopped = True
+        self.wakeup.set()
+        self.thread.join()
+        self.flush()
+        for sink in self.sinks:
+            sink.close()
+        if self.dropped:
+            print(f"Sample store dropped {self.dropped} samples.")
+
+
+# Memory-maps all column files of one run directory, returns {name: array}
+def load_columns(directory):
+    with open(os.path.join(directory, META_FILE), "r") as file:
+        meta = json.load(file)
+
+    # An interrupted flush can leave columns of different length, only complete rows are used
+    dtypes = {column["name"]: np.dtype(column["dtype"]) for column in meta["columns"]}
+    paths = {name: os.path.join(directory, f"{name}.bin") for name in dtypes}
+    rows = min(os.path.getsize(paths[name]) // dtype.itemsize for name, dtype in dtypes.items())
+
+    columns = {}
+    for name, dtype in dtypes.items():
+        if rows == 0:
+            columns[name] = np.empty(0, dtype=dtype)
+        else:
+            columns[name] = np.memmap(paths[name], dtype=dtype, mode="r", shape=(rows,))
+    return columns
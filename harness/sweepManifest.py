@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+def config_hash(config):
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()
+
+
+# Progress of a sweep on disk: the results of every finished repetition and which
+# (algorithm, sweep point) pairs are done. It is rewritten atomically after every
+# repetition, so a restarted sweep with the same configuration continues where the
+# last one stopped instead of starting over.
+class SweepManifest:
+
+    def __init__(self, path, config):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = None
+        if os.path.exists(path):
+            with open(path, "r") as file:
+                data = json.load(file)
+            if data.get("config_hash") == config_hash(config) and not data.get("finished"):
+                self.data = data
+        self.resumed = self.data is not None
+        if self.data is None:
+            self.data = {"config_hash": config_hash(config), "config": config, "sweep_id": None,
+                         "started_at": time.time(), "finished": False, "points": {}}
+
+    @property
+    def sweep_id(self):
+        return self.data["sweep_id"]
+
+    def set_sweep_id(self, sweep_id):
+        with self.lock:
+            self.data["sweep_id"] = sweep_id
+            self.save()
+
+    def save(self):
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(self.data, file)
+        os.replace(temporary_path, self.path)
+
+    def point(self, algorithm, key):
+        return self.data["points"].setdefault(algorithm, {}).setdefault(key, {"done": False, "results": []})
+
+    def results(self, algorithm, key):
+        with self.lock:
+            return list(self.point(algorithm, key)["results"])
+
+    def is_done(self, algorithm, key):
+        with self.lock:
+            return self.point(algorithm, key)["done"]
+
+    def add_result(self, algorithm, key, result):
+        with self.lock:
+            self.point(algorithm, key)["results"].append(result)
+            self.save()
+
+    def mark_done(self, algorithm, key):
+        with self.lock:
+            self.point(algorithm, key)["done"] = True
+            self.save()
+
+    # Pairs of (algorithm, sweep point) that are not done yet
+    def missing(self, points):
+        with self.lock:
+            return [(algorithm, key) for algorithm, key in points if not self.point(algorithm, key)["done"]]
+
+    def finish(self):
+        with self.lock:
+            self.data["finished"] = True
+            self.save()
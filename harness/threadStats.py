@@ -0,0 +1,118 @@
+import os
+
+# Per-thread CPU share of one core at or above which a thread counts as busy, one
+# histogram column per threshold (busy_threads_10 holds threads with at least 10 %)
+BUSY_THRESHOLDS = [10, 50, 90]
+
+# Values of ThreadStatsCollector.collect() in this order, appended to the sample columns
+THREAD_COLUMNS = [
+    ("threads_created", "d"),  # threads that appeared since the previous tick
+    ("threads_exited", "d"),   # threads that disappeared since the previous tick
+] + [(f"busy_threads_{threshold}", "d") for threshold in BUSY_THRESHOLDS] + [
+    ("max_thread_cpu", "d"),   # CPU of the busiest thread in % of one core
+]
+
+
+# Name, state and CPU ticks (utime + stime) from the contents of /proc/<pid>/task/<tid>/stat.
+# The name is in parentheses and may itself contain spaces and parentheses.
+def parse_task_stat(data):
+    start = data.index(b"(")
+    end = data.rindex(b")")
+    fields = data[end + 2:].split()
+    return data[start + 1:end].decode(errors="replace"), fields[0].decode(), int(fields[11]) + int(fields[12])
+
+
+# Per-thread CPU of a set of processes from /proc/<pid>/task/*/stat in one pass per tick.
+# The task directory of every process and the stat file of every thread stay open,
+# a tick is one listdir per process plus one pread per thread and creates no psutil objects.
+class ThreadStatsCollector:
+
+    def __init__(self, pids=()):
+        self.clock_ticks = os.sysconf("SC_CLK_TCK")
+        self.task_fds = {}
+        self.stat_fds = {}
+        self.last_ticks = {}
+        # Per-thread totals for summary(): name, CPU ticks, first and last tick it was seen
+        self.threads = {}
+        self.tick = 0
+        self.update_pids(pids)
+        # Threads that already exist at start only count CPU time from now on
+        self.read()
+
+    # Follows the processes of a tree, task directories of exited processes are closed
+    def update_pids(self, pids):
+        pids = set(pids)
+        for pid in pids - set(self.task_fds):
+            try:
+                self.task_fds[pid] = os.open(f"/proc/{pid}/task", os.O_RDONLY | os.O_DIRECTORY)
+            except OSError:
+                continue
+        for pid in set(self.task_fds) - pids:
+            os.close(self.task_fds.pop(pid))
+
+    # Current CPU ticks of every thread, {(pid, tid): (name, ticks)}
+    def read(self):
+        current = {}
+        for pid, task_fd in list(self.task_fds.items()):
+            try:
+                tids = os.listdir(task_fd)
+            except OSError:
+                # The process has exited
+                os.close(self.task_fds.pop(pid))
+                continue
+            for tid in tids:
+                key = (pid, tid)
+                fd = self.stat_fds.get(key)
+                try:
+                    if fd is None:
+                        fd = os.open(f"{tid}/stat", os.O_RDONLY, dir_fd=task_fd)
+                        self.stat_fds[key] = fd
+                    name, _, ticks = parse_task_stat(os.pread(fd, 1024, 0))
+                except (OSError, ValueError, IndexError):
+                    # The thread exited between listdir and read
+                    continue
+                current[key] = (name, ticks)
+
+        # Stat files of exited threads are closed
+        for key in set(self.stat_fds) - set(current):
+            os.close(self.stat_fds.pop(key))
+        return current
+
+    # Thread churn and busy histogram over interval seconds in the order of THREAD_COLUMNS,
+    # plus one entry per thread with its CPU in % of one core
+    def collect(self, interval):
+        self.tick += 1
+        current = self.read()
+        created = len(current.keys() - self.last_ticks.keys())
+        exited = len(self.last_ticks.keys() - current.keys())
+
+        shares = []
+        breakdown = []
+        for (pid, tid), (name, ticks) in current.items():
+            # Threads created during the interval count from 0
+            delta = ticks - self.last_ticks.get((pid, tid), 0)
+            share = delta / self.clock_ticks / interval * 100 if interval > 0 else 0.0
+            shares.append(share)
+            breakdown.append({"pid": pid, "tid": int(tid), "name": name, "cpu_usage": share})
+
+            thread = self.threads.setdefault((pid, tid), {"name": name, "cpu_ticks": 0, "first_tick": self.tick})
+            thread["name"] = name
+            thread["cpu_ticks"] += delta
+            thread["last_tick"] = self.tick
+        self.last_ticks = {key: ticks for key, (_, ticks) in current.items()}
+
+        busy = [sum(1 for share in shares if share >= threshold) for threshold in BUSY_THRESHOLDS]
+        return (created, exited, *busy, max(shares, default=0.0)), breakdown
+
+    # One row per thread seen during the measurement: CPU seconds and lifetime in ticks
+    def summary(self):
+        return [{"pid": pid, "tid": int(tid), "name": thread["name"],
+                 "cpu_seconds": thread["cpu_ticks"] / self.clock_ticks,
+                 "first_tick": thread["first_tick"], "last_tick": thread["last_tick"]}
+                for (pid, tid), thread in sorted(self.threads.items(), key=lambda item: (item[0][0], int(item[0][1])))]
+
+    def close(self):
+        for fd in list(self.stat_fds.values()) + list(self.task_fds.values()):
+            os.close(fd)
+        self.stat_fds = {}
+        self.task_fds = {}
@@ -4,6 +4,28 @@ import os
 import psutil
 import csv
 import platform
+import shutil
+import threading
+import sys
+
+# The modules shared by both benchmarks live in the harness package next to this directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from harness.cpuScheduler import CpuSetAllocator, CpuSetUsage, ExperimentScheduler, pinned_command
+from harness.gcLog import GC_COLUMNS, GC_METRICS, GO_GC_LOGGING, JVM_GC_LOGGING, GcLogParser
+from harness.hostNoise import HostNoiseSampler, available, interference_score, noisy_components, process_cgroup, quarantine
+from harness.kernelCounters import COUNTER_COLUMNS, KernelCounterCollector
+from harness.memoryStats import SMAPS_COLUMNS, SmapsCollector
+from harness.outputPump import OutputPump
+from harness.quantileSketch import SketchSink
+from harness.repetitionController import RepetitionController
+from harness.resultsStore import ResultsSink, ResultsStore
+from harness.sampleStore import ColumnFileSink, CsvSink, SampleStore
+from harness.sweepManifest import SweepManifest
+from harness.threadStats import THREAD_COLUMNS, ThreadStatsCollector
+
+from processTree import ProcessTreeCollector
+from samplingScheduler import FixedRateScheduler
 
 # Constants
 ALGORITHMS = ["platform", "virtual", "coroutines", "goroutines"]
@@ -11,21 +33,102 @@ LIST_LENGTH = "10000000"
 RUNS = "10"
 WARMUP_RUNS = "0"
 MAX_DEPTH = 4
+SAMPLE_INTERVAL_MS = 10  # Sampling interval of the process monitor, 10 ms or more
+COLLECT_USS = False  # USS per process in the breakdown needs /proc/<pid>/smaps and is expensive at high rates
+# PSS, USS and anonymous/file memory of the tree from /proc/<pid>/smaps_rollup. The -Xms4g heap is
+# pre-touched, so RSS mostly shows the reservation and anonymous memory or USS the working memory.
+# smaps_rollup is read at an adaptive rate, at most SMAPS_BUDGET of the time goes into reading it.
+MEMORY_DETAIL = True
+SMAPS_BUDGET = 0.01
+SMAPS_MAX_INTERVAL = 5.0  # Seconds
+PROCESS_BREAKDOWN = False  # Additionally write one row per process of the tree
+THREAD_STATS = True  # Per-thread CPU, thread churn and busy threads from /proc/<pid>/task/*/stat on every tick
+THREAD_BREAKDOWN = False  # Additionally write one row per thread and tick
+KERNEL_COUNTERS = True  # Context switches, page faults and storage I/O per tick as deltas from /proc
+EXPORT_CSV = False  # Also append the samples to measurement_log_<alg>.csv
+
+# Opt-in GC logging: -Xlog:gc* for the JVM, GODEBUG=gctrace=1 for Go. The output is parsed while the
+# program runs (harness/gcLog.py) into pause time, GC CPU time and heap after collection per tick, every
+# collection goes to <run_dir>/gc_events.csv and the totals of GC_METRICS to the results of a run.
+GC_LOGGING = False
+
+# By default one run at a time sees the whole machine, as in all earlier measurements. With PARALLEL_RUNS
+# the runs of the sweep matrix are packed onto disjoint CPU sets of CPUS_PER_RUN CPUs and run in parallel,
+# and the harness is pinned to HARNESS_CPUS CPUs of its own. Mergesort has no CPU or memory reservation,
+# CPUS_PER_RUN and MEMORY_PER_RUN_MB are chosen for packing only. The parallel programs then see fewer CPUs
+# (thread pools, GOMAXPROCS), so the CPU count of a run is part of the sweep configuration, the time log
+# and the results, and packed and whole-machine sweeps are never merged.
+PARALLEL_RUNS = False
+CPUS_PER_RUN = 8
+MEMORY_PER_RUN_MB = 5120  # 4 GiB heap or GOMEMLIMIT plus runtime overhead
+HARNESS_CPUS = 1  # CPUs kept for the harness itself, never given to a run
+MAX_REQUEUES = 2
+
+# Host noise is sampled for the whole sweep (harness/hostNoise.py). A run whose interference score (steal,
+# CPU outside the harness's cgroup, memory stalls, thermal throttling or foreign load on its CPU set,
+# each as a share) exceeds INTERFERENCE_THRESHOLD is quarantined: its samples are kept, it does not
+# count as a repetition and is left out of aggregates. RERUN_NOISY_RUNS queues the point again.
+HOST_NOISE = True
+HOST_NOISE_INTERVAL = 0.5  # Seconds between two ticks of measurements/host_noise.csv
+INTERFERENCE_THRESHOLD = 0.05
+RERUN_NOISY_RUNS = True
+
+# Every sweep point is repeated until the 95 % confidence interval of CI_METRIC
+# ("execution_time" or a sample column such as "cpu_usage") is narrower than
+# CI_TARGET_WIDTH relative to its mean, or MAX_REPETITIONS is reached
+CI_METRIC = "execution_time"
+CI_TARGET_WIDTH = 0.05
+MIN_REPETITIONS = 3
+MAX_REPETITIONS = 10
+
+# Startup phase from launch to the warm-up marker, also written to the time log per repetition:
+# seconds until the first output line and until the marker, CPU seconds and peak RSS (MB) of the phase.
+# Ready to exit is the execution time.
+STARTUP_METRICS = ["time_to_first_output", "time_to_ready", "startup_cpu_seconds", "startup_peak_memory"]
+
+# Columns of the sample store and their array typecodes
+SAMPLE_COLUMNS = [
+    ("max_depth", "q"),
+    ("timestamp", "d"),
+    ("cpu_usage", "d"),        # percent of all CPUs of the host
+    ("cpu_usage_alloc", "d"),  # percent of the CPUs allocated to the run, all CPUs without an allocation
+    ("memory_usage", "d"),
+    ("num_threads", "q"),
+    ("missed_deadlines", "q"),
+    ("sampler_overhead_us", "q"),
+    ("num_processes", "q"),
+] + THREAD_COLUMNS + COUNTER_COLUMNS + SMAPS_COLUMNS + GC_COLUMNS
+
+# Columns of measurement_log_<alg>.csv as before, the other series are only in the column files and the results database
+CSV_HEADER = ['max_depth', 'timestamp', 'cpu_usage', 'memory_usage', 'num_threads']
 
 # Directory setup
 EXECUTABLES_DIR = os.path.join(os.getcwd(), "executables")
 MEASUREMENTS_DIR = os.path.join(os.getcwd(), "measurements")
+LOGS_DIR = os.path.join(MEASUREMENTS_DIR, "logs")
+SAMPLES_DIR = os.path.join(MEASUREMENTS_DIR, "samples")
+RESULTS_DB = os.path.join(MEASUREMENTS_DIR, "results.db")
+MANIFEST_FILE = os.path.join(MEASUREMENTS_DIR, "sweep_manifest.json")
+NOISE_LOG = os.path.join(MEASUREMENTS_DIR, "host_noise.csv")
+TIME_LOG = os.path.join(MEASUREMENTS_DIR, "measurement_log_time.csv")
 
 # File paths
 JAR_FILE = os.path.join(EXECUTABLES_DIR, "mergesortJava.jar")
 KOTLIN_FILE = os.path.join(EXECUTABLES_DIR, "mergesortKotlin.jar")
 GOROUTINE_FILE = os.path.join(EXECUTABLES_DIR, "mergesortGo.exe") if platform.system() == "Windows" else os.path.join(EXECUTABLES_DIR, "mergesortGo")
 
-def start_program(algorithm, max_depth):
+# Options of the JVM for Java and Kotlin
+def jvm_options():
+    options = ["-Xms4g", "-Xmx4g", "-server"]
+    if GC_LOGGING:
+        options.append(JVM_GC_LOGGING)
+    return options
+
+def start_program(algorithm, max_depth, allocation=None):
     if algorithm == "coroutines":
         FILE = KOTLIN_FILE
         process = subprocess.Popen(
-            ["java", "-Xms4g", "-Xmx4g", "-server", "-jar", FILE, algorithm, LIST_LENGTH, max_depth, RUNS, WARMUP_RUNS],
+            pinned_command(["java"] + jvm_options() + ["-jar", FILE, algorithm, LIST_LENGTH, max_depth, RUNS, WARMUP_RUNS], allocation),
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE
         )
@@ -33,8 +136,10 @@ def start_program(algorithm, max_depth):
         FILE = GOROUTINE_FILE
         env = os.environ.copy()
         env["GOMEMLIMIT"] = "4GiB"
+        if GC_LOGGING:
+            env["GODEBUG"] = GO_GC_LOGGING
         process = subprocess.Popen(
-            [FILE, "-algorithm", algorithm, "-listLength", LIST_LENGTH, "-maxDepth", max_depth, "-runs", RUNS, "-warmUpRuns", WARMUP_RUNS],
+            pinned_command([FILE, "-algorithm", algorithm, "-listLength", LIST_LENGTH, "-maxDepth", max_depth, "-runs", RUNS, "-warmUpRuns", WARMUP_RUNS], allocation),
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             env=env
@@ -42,81 +147,348 @@ def start_program(algorithm, max_depth):
     else:
         FILE = JAR_FILE
         process = subprocess.Popen(
-            ["java", "-Xms4g", "-Xmx4g", "-server", "-jar", FILE, algorithm, LIST_LENGTH, max_depth, RUNS, WARMUP_RUNS],
+            pinned_command(["java"] + jvm_options() + ["-jar", FILE, algorithm, LIST_LENGTH, max_depth, RUNS, WARMUP_RUNS], allocation),
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE
         )
     return process
 
-def record_process_stats(process, max_depth, writer):
+# Returns the CPU seconds used by the process tree while it was sampled.
+# Sampling stops when the process ends or, if given, once the event until is set.
+def record_process_stats(process, max_depth, store, process_writer=None, cpu_count=None, until=None, thread_writer=None, thread_summary=None, gc=None):
+    cpu_seconds = 0.0
+    threads = None
+    counters = None
+    smaps = None
     try:
-        ps_process = psutil.Process(process.pid)
-        start_time = time.time()
-        ps_process.cpu_percent(interval=None)
-        last_cpu_measurement_time = time.time()
-        time.sleep(0.2)
-
-        while ps_process.is_running():
-            try:
-                memory_usage = ps_process.memory_info().rss / (1024 * 1024)  # in MB
-                num_threads = ps_process.num_threads()
-                elapsed_time = round(time.time() - start_time, 1)
-
-                cpu_usage = None
-                if time.time() - last_cpu_measurement_time >= 2.0:
-                    cpu_usage = ps_process.cpu_percent(interval=None) / psutil.cpu_count()
-                    last_cpu_measurement_time = time.time()
-
-                writer.writerow([max_depth, elapsed_time, cpu_usage, memory_usage, num_threads])
-                time.sleep(0.2)
-
-            except psutil.NoSuchProcess:
-                print(f"Process {process.pid} ended unexpectedly.")
+        collector = ProcessTreeCollector(process.pid, with_uss=COLLECT_USS)
+        if MEMORY_DETAIL:
+            smaps = SmapsCollector(collector.processes, SMAPS_BUDGET, SAMPLE_INTERVAL_MS / 1000, SMAPS_MAX_INTERVAL)
+        if THREAD_STATS:
+            threads = ThreadStatsCollector(collector.processes)
+        if KERNEL_COUNTERS:
+            counters = KernelCounterCollector(collector.processes)
+        host_cpus = psutil.cpu_count()
+        cpu_count = cpu_count or host_cpus
+        scheduler = FixedRateScheduler(SAMPLE_INTERVAL_MS)
+        last_sample_ns = scheduler.start()
+
+        while True:
+            sample_ns = scheduler.sleep_until_next()
+            if until is not None and until.is_set():
+                break
+            # An exited child stays a zombie until it is reaped, poll() reaps it
+            snapshot = collector.collect() if process.poll() is None else None
+            if snapshot is None:
+                print(f"Process {process.pid} has ended. Monitoring will be stopped.")
                 break
+            totals, breakdown = snapshot
+            cpu_seconds += totals["cpu_time"]
+
+            # CPU on every tick from the summed cpu_times() deltas of the process tree, relative to
+            # the whole host as before and relative to the CPUs allocated to the run
+            interval = (sample_ns - last_sample_ns) / 1e9
+            cpu_usage = totals["cpu_time"] / interval * 100 / host_cpus
+            cpu_usage_alloc = totals["cpu_time"] / interval * 100 / cpu_count
+            last_sample_ns = sample_ns
+
+            elapsed_time = round((sample_ns - scheduler.start_ns) / 1e9, 3)
+
+            # Threads of every process of the tree, the collector follows the tree's refreshes
+            thread_values = tuple(None for _ in THREAD_COLUMNS)
+            thread_breakdown = []
+            if threads is not None:
+                threads.update_pids(entry["pid"] for entry in breakdown)
+                thread_values, thread_breakdown = threads.collect(interval)
+            counter_values = tuple(None for _ in COUNTER_COLUMNS)
+            if counters is not None:
+                counters.update_pids(entry["pid"] for entry in breakdown)
+                counter_values = counters.collect()
+            smaps_values = tuple(None for _ in SMAPS_COLUMNS)
+            if smaps is not None:
+                smaps.update_pids(entry["pid"] for entry in breakdown)
+                smaps_values = smaps.collect()
+            # Collections the output pump has parsed since the previous tick
+            gc_values = gc.sample() if gc is not None else tuple(None for _ in GC_COLUMNS)
+
+            # Overhead of this tick from wake-up until its sample is complete
+            overhead_ns = scheduler.end_tick()
+            store.append((int(max_depth), elapsed_time, round(cpu_usage, 2), round(cpu_usage_alloc, 2), totals["rss"] / (1024 * 1024), totals["num_threads"],
+                          scheduler.missed_deadlines, overhead_ns // 1000,
+                          totals["num_processes"]) + thread_values + counter_values + smaps_values + gc_values)
+
+            if process_writer is not None:
+                for entry in breakdown:
+                    process_writer.writerow([max_depth, elapsed_time, entry["pid"], entry["name"],
+                                             round(entry["cpu_time"] / interval * 100 / host_cpus, 2),
+                                             entry["rss"] / (1024 * 1024), entry["uss"] / (1024 * 1024), entry["num_threads"]])
+
+            if thread_writer is not None:
+                for entry in thread_breakdown:
+                    thread_writer.writerow([max_depth, elapsed_time, entry["pid"], entry["tid"], entry["name"], round(entry["cpu_usage"], 2)])
+
+        print(f"Sampler: {scheduler.ticks} ticks, {scheduler.missed_deadlines} missed deadlines, "
+              f"mean overhead {scheduler.mean_overhead_us():.0f} us")
+        if smaps is not None:
+            print(f"smaps_rollup: {smaps.reads} reads, mean {smaps.mean_cost_ms():.1f} ms")
 
     except psutil.NoSuchProcess:
         print(f"No process with PID {process.pid} found.")
+    finally:
+        if threads is not None:
+            if thread_summary is not None:
+                write_thread_summary(thread_summary, threads.summary())
+            threads.close()
+        if counters is not None:
+            counters.close()
+        if smaps is not None:
+            smaps.close()
+    return cpu_seconds
+
+# CPU seconds and lifetime (first and last tick) of every thread seen during a measurement
+def write_thread_summary(path, summary):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, ["pid", "tid", "name", "cpu_seconds", "first_tick", "last_tick"])
+        writer.writeheader()
+        writer.writerows(summary)
 
-def measure(algorithm, max_depth, execution_times):
+# Adds the results of one repetition to the controller. A run with interference is
+# quarantined and not added, then RERUN_NOISY_RUNS is returned: True requeues the point
+def measure(algorithm, max_depth, controller, allocation=None, results=None, sweep_id=None, host_noise=None):
     print(f"Starting program with algorithm: {algorithm}")
-    process = start_program(algorithm, max_depth)
-
-    while True:
-        output = process.stdout.readline().decode()
-        print(output)
-        if "warum up runs finished" in output:
-            break
-        time.sleep(0.2)
-
-    start_time = time.time()
-    csv_file = os.path.join(MEASUREMENTS_DIR, f"measurement_log_{algorithm}.csv")
-    with open(csv_file, 'a', newline='') as stats_file:
-        writer = csv.writer(stats_file)
-        if os.stat(csv_file).st_size == 0:
-            writer.writerow(['max_depth', 'timestamp', 'cpu_usage', 'memory_usage', 'num_threads'])
-        record_process_stats(process, max_depth, writer)
-
-    execution_time = round(time.time() - start_time, 1)
-    execution_times[algorithm][max_depth] = execution_time
+    run_dir = os.path.join(SAMPLES_DIR, algorithm, f"{max_depth}_{time.strftime('%Y%m%d-%H%M%S')}")
+    launched_at = time.monotonic()
+    process = start_program(algorithm, max_depth, allocation)
+
+    # Drain stdout and stderr in the background and spool them to a per-run log,
+    # echoing is off while several runs share the terminal
+    log_file = os.path.join(LOGS_DIR, f"{algorithm}_{max_depth}_{time.strftime('%Y%m%d-%H%M%S')}.log")
+    pump = OutputPump(process, log_file, echo=not PARALLEL_RUNS)
+    warmup_finished = pump.marker_event("warum up runs finished")
+    # GC lines from launch on, on the pump's clock like the marker
+    gc = None
+    if GC_LOGGING:
+        gc = GcLogParser()
+        pump.on_line(gc.on_line)
+    pump.start()
+
+    # The startup phase (runtime start, JIT, warm-up runs) is sampled from launch into its own
+    # store in <run_dir>/startup, so the means of the measured phase stay comparable
+    cpu_count = len(allocation.cpus) if allocation else None
+    startup_sketch = SketchSink(os.path.join(run_dir, "startup"), SAMPLE_COLUMNS, "max_depth")
+    startup_store = SampleStore(SAMPLE_COLUMNS, [ColumnFileSink(os.path.join(run_dir, "startup"), SAMPLE_COLUMNS), startup_sketch])
+    startup_cpu_seconds = record_process_stats(process, max_depth, startup_store, cpu_count=cpu_count, until=warmup_finished, gc=gc)
+    startup_store.close()
+    if not pump.wait_for(warmup_finished):
+        print(f"Process {process.pid} exited before the warm-up marker.")
+    ready_at = warmup_finished.timestamp if warmup_finished.is_set() else time.monotonic()
+
+    # Samples go to a columnar store per run plus per-run quantile sketches, the CSV export is optional
+    sketch_sink = SketchSink(run_dir, SAMPLE_COLUMNS, "max_depth")
+    sinks = [ColumnFileSink(run_dir, SAMPLE_COLUMNS), sketch_sink]
+    run_id = None
+    if results is not None:
+        run_id = results.start_run(sweep_id, algorithm, max_depth, run_dir, allocation.cpu_list() if allocation else None)
+        sinks.append(ResultsSink(results, run_id, algorithm, max_depth))
+    if EXPORT_CSV:
+        sinks.append(CsvSink(os.path.join(MEASUREMENTS_DIR, f"measurement_log_{algorithm}.csv"), CSV_HEADER))
+    store = SampleStore(SAMPLE_COLUMNS, sinks)
+
+    # Optional per-process breakdown of the process tree
+    process_file = None
+    process_writer = None
+    if PROCESS_BREAKDOWN:
+        process_csv = os.path.join(MEASUREMENTS_DIR, f"measurement_log_{algorithm}_processes.csv")
+        process_file = open(process_csv, 'a', newline='')
+        process_writer = csv.writer(process_file)
+        if os.stat(process_csv).st_size == 0:
+            process_writer.writerow(['max_depth', 'timestamp', 'pid', 'name', 'cpu_usage', 'memory_usage', 'memory_uss', 'num_threads'])
+
+    # Optional per-thread breakdown, the per-thread totals always go to <run_dir>/threads.csv
+    thread_file = None
+    thread_writer = None
+    if THREAD_STATS and THREAD_BREAKDOWN:
+        thread_csv = os.path.join(MEASUREMENTS_DIR, f"measurement_log_{algorithm}_threads.csv")
+        thread_file = open(thread_csv, 'a', newline='')
+        thread_writer = csv.writer(thread_file)
+        if os.stat(thread_csv).st_size == 0:
+            thread_writer.writerow(['max_depth', 'timestamp', 'pid', 'tid', 'name', 'cpu_usage'])
+
+    usage = CpuSetUsage(allocation.cpus) if allocation and allocation.isolated else None
+    noise_mark = host_noise.mark() if host_noise else None
+    cpu_seconds = record_process_stats(process, max_depth, store, process_writer, cpu_count,
+                                       thread_writer=thread_writer, thread_summary=os.path.join(run_dir, "threads.csv"), gc=gc)
+
+    store.close()
+    if process_file is not None:
+        process_file.close()
+    if thread_file is not None:
+        thread_file.close()
+
+    execution_time = round(time.monotonic() - ready_at, 1)
+    pump.join(timeout=5)
+    if gc is not None:
+        gc.write_events(os.path.join(run_dir, "gc_events.csv"), ready_at)
+
+    # Host noise during the measured phase plus foreign load on the run's CPU set
+    noise = host_noise.summary(noise_mark) if host_noise else {}
+    noise["cpuset_foreign"] = usage.foreign_share(cpu_seconds) if usage else 0.0
+    noise["interference_score"] = interference_score(noise)
+
+    # Execution time plus the mean of every sample column of this repetition
+    # and the number of CPUs the run could use
+    if cpu_count is None:
+        cpu_count = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else psutil.cpu_count()
+    result = {"execution_time": execution_time, "cpus": cpu_count}
+    for metric, stats in sketch_sink.points.get(float(max_depth), {}).items():
+        if stats.count:
+            result[metric] = stats.mean
+    result.update(startup_phases(launched_at, pump.first_line_at, warmup_finished.timestamp, startup_cpu_seconds,
+                                 startup_sketch.points.get(float(max_depth), {}).get("memory_usage")))
+    if gc is not None:
+        result.update(gc.totals(since=ready_at))
+    result.update(noise)
+
+    if noise["interference_score"] > INTERFERENCE_THRESHOLD:
+        print(f"Interference on run {algorithm}/{max_depth} (CPUs {allocation.cpu_list() if allocation else 'all'}): "
+              f"score {noise['interference_score']:.1%} from {', '.join(noisy_components(noise, INTERFERENCE_THRESHOLD))}, "
+              f"run is quarantined.")
+        quarantine(run_dir, noise)
+        if run_id is not None:
+            results.finish_run(run_id, "quarantined", execution_time, result, sketch_sink.points.get(float(max_depth), {}))
+        return RERUN_NOISY_RUNS
+
+    controller.add(result)
+    if run_id is not None:
+        results.finish_run(run_id, "complete", execution_time, result, sketch_sink.points.get(float(max_depth), {}))
     print(f"Measurement complete for PID: {process.pid}")
+    return False
 
-def main():
-    os.makedirs(MEASUREMENTS_DIR, exist_ok=True)
+# Results of the startup phase in the order of STARTUP_METRICS, timestamps on the time.monotonic() clock.
+# Phases that were not reached are missing.
+def startup_phases(launched_at, first_output_at, ready_at, cpu_seconds, memory_stats=None):
+    phases = {"startup_cpu_seconds": cpu_seconds}
+    if first_output_at is not None:
+        phases["time_to_first_output"] = first_output_at - launched_at
+    if ready_at is not None:
+        phases["time_to_ready"] = ready_at - launched_at
+    if memory_stats is not None and memory_stats.count:
+        phases["startup_peak_memory"] = memory_stats.max
+    return phases
 
-    TIME_LOG = os.path.join(MEASUREMENTS_DIR, "measurement_log_time.csv")
+# run_cpus is the number of CPUs every run sees
+def sweep_config(run_cpus):
+    return {
+        "algorithms": ALGORITHMS, "list_length": LIST_LENGTH, "runs": RUNS, "warmup_runs": WARMUP_RUNS,
+        "max_depth": MAX_DEPTH, "sample_interval_ms": SAMPLE_INTERVAL_MS, "parallel_runs": PARALLEL_RUNS,
+        "run_cpus": run_cpus, "memory_per_run_mb": MEMORY_PER_RUN_MB if PARALLEL_RUNS else None,
+        "ci_metric": CI_METRIC, "ci_target_width": CI_TARGET_WIDTH, "min_repetitions": MIN_REPETITIONS,
+        "max_repetitions": MAX_REPETITIONS, "gc_logging": GC_LOGGING
+    }
+
+# Rewrites the time log from the repetitions made so far, run_cpus is the number of CPUs every run sees
+def write_time_log(controllers, run_cpus):
+    metrics = STARTUP_METRICS + (GC_METRICS if GC_LOGGING else [])
     with open(TIME_LOG, 'w', newline='') as time_file:
         time_writer = csv.writer(time_file)
-        time_writer.writerow(['max_depth', 'platform', 'virtual', 'coroutines', 'goroutines'])
-
-        execution_times = {alg: {} for alg in ALGORITHMS}
+        suffixes = [suffix for suffix, _ in RepetitionController(CI_METRIC).time_log_fields(metrics)]
+        time_writer.writerow(['max_depth', 'cpus'] + [alg + suffix for alg in ALGORITHMS for suffix in suffixes])
 
         for max_depth in range(0, MAX_DEPTH):
-            for algorithm in ALGORITHMS:
-                measure(algorithm, str(max_depth), execution_times)
-                time.sleep(5)
-
-            row = [max_depth] + [execution_times[alg].get(str(max_depth), 'N/A') for alg in ALGORITHMS]
+            row = [max_depth, run_cpus] + [value for alg in ALGORITHMS for _, value in controllers[alg][str(max_depth)].time_log_fields(metrics)]
             time_writer.writerow(row)
 
+def main():
+    os.makedirs(MEASUREMENTS_DIR, exist_ok=True)
+    os.makedirs(LOGS_DIR, exist_ok=True)
+
+    # Packed runs get disjoint CPU sets and the harness CPUs of its own, otherwise every run has the
+    # whole machine and the allocator only serializes them
+    allocator = CpuSetAllocator(HARNESS_CPUS if PARALLEL_RUNS else 0)
+    if PARALLEL_RUNS:
+        allocator.pin_harness()
+        run_cpus = min(CPUS_PER_RUN, allocator.total_cpus)
+        run_memory_mb = MEMORY_PER_RUN_MB
+    else:
+        run_cpus = allocator.total_cpus
+        run_memory_mb = 0
+
+    # Every sweep is recorded with its configuration, host and commit in the results database.
+    # An unfinished sweep with the same configuration is resumed from its manifest.
+    config = sweep_config(run_cpus)
+    results = ResultsStore(RESULTS_DB, SAMPLE_COLUMNS)
+    manifest = SweepManifest(MANIFEST_FILE, config)
+    if manifest.resumed and manifest.sweep_id is not None:
+        sweep_id = manifest.sweep_id
+        # Samples of the runs that were cut off are removed, their repetitions are made again
+        for run_dir in results.discard_incomplete_runs(sweep_id):
+            shutil.rmtree(run_dir, ignore_errors=True)
+        print(f"Resuming sweep {sweep_id}")
+    else:
+        sweep_id = results.start_sweep("mergesort", config)
+        manifest.set_sweep_id(sweep_id)
+
+    scheduler = ExperimentScheduler(allocator, None if PARALLEL_RUNS else 1, MAX_REQUEUES)
+    time_log_lock = threading.Lock()
+
+    # Host noise for the whole sweep, the CPU time of the harness's cgroup (including the runs) is its own
+    host_noise = HostNoiseSampler(NOISE_LOG, HOST_NOISE_INTERVAL, [process_cgroup()]).start() if HOST_NOISE and available() else None
+
+    # Repetitions of a sweep point run one after another on its CPU set, a quarantined
+    # repetition requeues the point (or ends it without RERUN_NOISY_RUNS) and the repetitions
+    # made so far are kept.
+    # Every repetition is persisted in the manifest, the time log is rewritten per finished point.
+    def run_point(allocation, algorithm, max_depth):
+        controller = controllers[algorithm][max_depth]
+        while not controller.done():
+            repetitions = len(controller.results)
+            if measure(algorithm, max_depth, controller, allocation if PARALLEL_RUNS else None, results, sweep_id, host_noise):
+                return True
+            if len(controller.results) == repetitions:
+                break
+            manifest.add_result(algorithm, max_depth, controller.results[-1])
+        manifest.mark_done(algorithm, max_depth)
+        with time_log_lock:
+            write_time_log(controllers, run_cpus)
+        return False
+
+    controllers = {alg: {} for alg in ALGORITHMS}
+    for max_depth in range(0, MAX_DEPTH):
+        for algorithm in ALGORITHMS:
+            controller = RepetitionController(CI_METRIC, CI_TARGET_WIDTH, MIN_REPETITIONS, MAX_REPETITIONS)
+            for result in manifest.results(algorithm, str(max_depth)):
+                controller.add(result)
+            controllers[algorithm][str(max_depth)] = controller
+            if manifest.is_done(algorithm, str(max_depth)):
+                continue
+            scheduler.submit(f"{algorithm}/{max_depth}", run_cpus, run_memory_mb,
+                             lambda allocation, algorithm=algorithm, max_depth=str(max_depth):
+                             run_point(allocation, algorithm, max_depth))
+    write_time_log(controllers, run_cpus)
+
+    try:
+        failed = scheduler.run()
+    except KeyboardInterrupt:
+        print(f"Sweep interrupted, restart to resume from {MANIFEST_FILE}")
+        raise
+    finally:
+        if host_noise is not None:
+            host_noise.stop()
+
+    write_time_log(controllers, run_cpus)
+
+    # The sweep is only finished once every point is done, otherwise a restart resumes it
+    missing = manifest.missing([(algorithm, str(max_depth)) for max_depth in range(0, MAX_DEPTH) for algorithm in ALGORITHMS])
+    if failed or missing:
+        for job in failed:
+            print(f"Failed: {job.name} ({job.failure})")
+        print(f"Sweep incomplete, missing points: {', '.join(f'{algorithm}/{key}' for algorithm, key in missing) or 'none'}. "
+              f"Restart to resume from {MANIFEST_FILE}")
+    else:
+        manifest.finish()
+        results.finish_sweep(sweep_id)
+    results.close()
+
 if __name__ == "__main__":
     main()
@@ -2,6 +2,13 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import os
+import sys
+
+# Die gemeinsamen Module beider Benchmarks liegen im Paket harness neben diesem Ordner
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from harness.aggregation import StreamingAggregator
+from harness.resultsStore import ResultsStore
 
 # Schriftgröße anpassen
 plt.rcParams.update({
@@ -16,8 +23,17 @@ plt.rcParams.update({
 
 # Verzeichnisse für die Daten, Plots und aggregierte Daten
 MEASUREMENTS_DIR = os.path.join(os.getcwd(), "measurements")
+SAMPLES_DIR = os.path.join(MEASUREMENTS_DIR, "samples")
 PLOTS_DIR = os.path.join(os.getcwd(), "plots")
 AGGREGATED_DIR = os.path.join(os.getcwd(), "aggregated")
+AGGREGATION_STATE = os.path.join(AGGREGATED_DIR, "aggregation_state.json")
+RESULTS_DB = os.path.join(MEASUREMENTS_DIR, "results.db")
+
+# Sweeps aus der Ergebnisdatenbank, None für den letzten Sweep, sonst eine Liste von sweep_ids
+SWEEPS = None
+
+# Läufe mit Störungen durch den Host (Status "quarantined") fließen nur auf Wunsch in die Aggregate ein
+INCLUDE_QUARANTINED = False
 
 # Sicherstellen, dass die Ordner algorithms = [
 os.makedirs(PLOTS_DIR, exist_ok=True)
@@ -45,68 +61,143 @@ labels = {
 max_values_dict = {}
 mean_values_dict = {}
 
-# Daten einlesen und maximalen sowie durchschnittlichen Werte berechnen
-for ALGORITHM, csv_file, color in zip(algorithms, csv_files, colors):
-    data = pd.read_csv(csv_file)
-    data['max_depth'] = pd.to_numeric(data['max_depth'], errors='coerce')
-    data['cpu_usage'] = pd.to_numeric(data['cpu_usage'], errors='coerce')
-    data['memory_usage'] = pd.to_numeric(data['memory_usage'], errors='coerce')
-    data['num_threads'] = pd.to_numeric(data['num_threads'], errors='coerce')
-
-    max_values = data.groupby('max_depth').agg({
-        'cpu_usage': 'max',
-        'memory_usage': 'max',
-        'num_threads': 'max',
-    }).reset_index()
-
-    mean_values = data.groupby('max_depth').agg({
-        'cpu_usage': 'mean',
-        'memory_usage': 'mean',
-        'num_threads': 'mean',
-    }).reset_index()
-
-    max_values_dict[ALGORITHM] = max_values
-    mean_values_dict[ALGORITHM] = mean_values
+# Quantile (p50/p95/p99) pro Algorithmus aus den zusammengeführten Sketches
+percentiles = ['p50', 'p95', 'p99']
+percentile_values_dict = {percentile: {} for percentile in percentiles}
+
+# cpu_usage ist wie bisher auf alle CPUs des Hosts bezogen, cpu_usage_alloc auf die CPUs, die dem Lauf
+# zugewiesen wurden (ohne Zuweisung ebenfalls alle CPUs), ältere Messungen haben cpu_usage_alloc nicht
+metrics = ['cpu_usage', 'cpu_usage_alloc', 'memory_usage', 'num_threads']
+
+# Threads aus /proc/<pid>/task pro Messpunkt: erzeugte und beendete Threads pro Intervall, Threads mit
+# mindestens 10/50/90 % eines Kerns und CPU des am stärksten ausgelasteten Threads
+thread_metrics = ['threads_created', 'threads_exited', 'busy_threads_10', 'busy_threads_50', 'busy_threads_90', 'max_thread_cpu']
+metrics += thread_metrics
+
+# Kernel-Zähler pro Intervall: Kontextwechsel, Seitenfehler und gelesene bzw. geschriebene Bytes
+counter_metrics = ['ctx_voluntary', 'ctx_involuntary', 'minor_faults', 'major_faults', 'io_read_bytes', 'io_write_bytes']
+metrics += counter_metrics
+
+# Säulendiagramme der Kernel-Zähler
+PLOT_KERNEL_COUNTERS = True
+
+# Arbeitsspeicher aus /proc/<pid>/smaps_rollup in MB (PSS, USS, anonym, dateibasiert), seltener gemessen als RSS
+memory_metrics = ['memory_pss', 'memory_uss', 'memory_anon', 'memory_file']
+metrics += memory_metrics
+
+# Speicherbereinigung pro Intervall, nur mit GC_LOGGING: Anzahl, Pausenzeit und CPU-Zeit in ms,
+# Heap nach der letzten Bereinigung in MB
+gc_metrics = ['gc_count', 'gc_pause', 'gc_cpu', 'gc_heap_after']
+metrics += gc_metrics
+
+# Startphase pro Wiederholung aus dem Zeit-Log: Start bis zur ersten Ausgabe und bis zum Ende des Warm-ups
+# in Sekunden, CPU-Sekunden und maximaler Arbeitsspeicher der Startphase
+startup_metrics = ['time_to_first_output', 'time_to_ready', 'startup_cpu_seconds', 'startup_peak_memory']
+
+# Speicherbereinigung pro Wiederholung: Anzahl, gesamte und längste Pause sowie CPU-Zeit in ms
+gc_run_metrics = ['gc_collections', 'gc_pause_total', 'gc_pause_max', 'gc_cpu_total']
+
+# Mit Ergebnisdatenbank werden die Kennzahlen pro Lauf über eine indizierte Abfrage zusammengeführt,
+# sonst alle Messwerte in einem Durchlauf aggregieren, bereits gelesene Zeilen werden übersprungen
+# Enthält die Datenbank keinen Sweep von Mergesort (z. B. nur Messungen der Bank), wird das Zeit-Log verwendet.
+results = ResultsStore(RESULTS_DB) if os.path.exists(RESULTS_DB) else None
+if results is not None:
+    sweep_ids = SWEEPS or [results.latest_sweep("mergesort")]
+    if sweep_ids[0] is None:
+        print(f"No mergesort sweep in {RESULTS_DB}, falling back to {TIME_LOG}.")
+        results = None
+if results is not None:
+    # Läufe auf eigenen CPU-Sets sehen weniger CPUs als Läufe auf dem ganzen Rechner und werden nicht zusammengeführt,
+    # ältere Sweeps haben statt run_cpus nur cpus_per_run
+    sweep_configs = {sweep_id: results.sweep_config(sweep_id) or {} for sweep_id in sweep_ids}
+    run_cpus = {sweep_id: config.get("run_cpus", config.get("cpus_per_run")) for sweep_id, config in sweep_configs.items()}
+    if len(set(run_cpus.values())) > 1:
+        sys.exit(f"Sweeps ran with different CPU counts per run ({run_cpus}), plot them separately.")
+if results is None and not os.path.exists(TIME_LOG):
+    sys.exit(f"Neither {RESULTS_DB} nor {TIME_LOG} has mergesort measurements to plot.")
+if results is not None:
+    aggregator = StreamingAggregator('max_depth', metrics)
+    aggregator.update_from_results(results, sweep_ids, INCLUDE_QUARANTINED)
+else:
+    aggregator = StreamingAggregator('max_depth', metrics, AGGREGATION_STATE)
+    if aggregator.is_stale():
+        aggregator.reset()
+    for ALGORITHM, csv_file in zip(algorithms, csv_files):
+        aggregator.update(ALGORITHM, SAMPLES_DIR, csv_file, INCLUDE_QUARANTINED)
+    aggregator.save()
+
+# Maximale und durchschnittliche Werte pro max_depth
+for ALGORITHM in algorithms:
+    max_values_dict[ALGORITHM] = aggregator.frame(ALGORITHM, 'max')
+    mean_values_dict[ALGORITHM] = aggregator.frame(ALGORITHM, 'mean')
+    for percentile in percentiles:
+        percentile_values_dict[percentile][ALGORITHM] = aggregator.frame(ALGORITHM, percentile)
 
 # Zusätzliche Daten für Ausführungszeiten einlesen
-time_data = pd.read_csv(TIME_LOG)
+time_data = results.time_frame(sweep_ids, 'max_depth', algorithms, metrics + startup_metrics + gc_run_metrics, INCLUDE_QUARANTINED) if results is not None else pd.read_csv(TIME_LOG)
 time_data['max_depth'] = pd.to_numeric(time_data['max_depth'], errors='coerce')
 time_data['virtual'] = pd.to_numeric(time_data['virtual'], errors='coerce')
 time_data['platform'] = pd.to_numeric(time_data['platform'], errors='coerce')
 time_data['coroutines'] = pd.to_numeric(time_data['coroutines'], errors='coerce')
 time_data['goroutines'] = pd.to_numeric(time_data['goroutines'], errors='coerce')
 
+# Halbe Breite der 95-%-Konfidenzintervalle über die Wiederholungen (<alg>_ci, <alg>_<metrik>_ci),
+# ältere Zeit-Logs ohne Wiederholungen haben keine
+ci_columns = [column for column in time_data.columns if column.endswith('_ci')]
+time_data[ci_columns] = time_data[ci_columns].apply(pd.to_numeric, errors='coerce')
+
+# Spalten der Startphase, ältere Zeit-Logs haben keine
+startup_columns = [f'{ALGORITHM}_{metric}' for ALGORITHM in algorithms for metric in startup_metrics
+                   if f'{ALGORITHM}_{metric}' in time_data.columns]
+time_data[startup_columns] = time_data[startup_columns].apply(pd.to_numeric, errors='coerce')
+
+# Spalten der Speicherbereinigung, nur wenn mindestens ein Lauf mit GC_LOGGING gemessen wurde
+gc_columns = [f'{ALGORITHM}_{metric}' for ALGORITHM in algorithms for metric in gc_run_metrics
+              if f'{ALGORITHM}_{metric}' in time_data.columns]
+time_data[gc_columns] = time_data[gc_columns].apply(pd.to_numeric, errors='coerce')
+gc_columns = [column for column in gc_columns if time_data[column].notna().any()]
+
+# Konfidenzintervall einer Spalte des Zeit-Logs pro max_depth, None wenn es fehlt
+def confidence_values(column, max_depths):
+    if column not in time_data.columns:
+        return None
+    return time_data.set_index('max_depth')[column].reindex(max_depths).to_numpy()
+
 # Funktion zum Abrunden auf null Nachkommastellen
 def round_to_zero(value):
     return int(value)
 
 # Daten für alle Algorithmen zusammenfassen und in CSV-Dateien speichern
 def save_aggregated_csv(metric, metric_name):
-    aggregated_data = pd.DataFrame()
-
+    columns = {}
     for ALGORITHM in algorithms:
-        max_values = max_values_dict[ALGORITHM]
-        mean_values = mean_values_dict[ALGORITHM]
-
-        # Kombinieren von max und mean Werten
-        combined = pd.DataFrame({
-            'max_depth': max_values['max_depth'] + 1,  # +1 bei max_depth
-            f'{ALGORITHM}_max_{metric_name}': max_values[metric].apply(round_to_zero),
-            f'{ALGORITHM}_mean_{metric_name}': mean_values[metric].apply(round_to_zero)
-        })
-
-        if aggregated_data.empty:
-            aggregated_data = combined
-        else:
-            aggregated_data = pd.merge(aggregated_data, combined, on='max_depth', how='outer')
+        max_values = max_values_dict[ALGORITHM].set_index('max_depth')
+        mean_values = mean_values_dict[ALGORITHM].set_index('max_depth')
+        columns[f'{ALGORITHM}_max_{metric_name}'] = max_values[metric].apply(round_to_zero)
+        columns[f'{ALGORITHM}_mean_{metric_name}'] = mean_values[metric].apply(round_to_zero)
+        for percentile in percentiles:
+            percentile_values = percentile_values_dict[percentile][ALGORITHM].set_index('max_depth')
+            columns[f'{ALGORITHM}_{percentile}_{metric_name}'] = percentile_values[metric].apply(round_to_zero)
+
+    # Ein einziger Join über max_depth statt wiederholter merges
+    aggregated_data = pd.concat(columns, axis=1).reset_index()
+    aggregated_data['max_depth'] = aggregated_data['max_depth'] + 1  # +1 bei max_depth
 
     # Speichern der aggregierten Daten in einer CSV-Datei
     aggregated_data.to_csv(os.path.join(AGGREGATED_DIR, f"{metric_name}_aggregated.csv"), index=False)
 
 # Speichern der aggregierten Werte für CPU, Memory und Threads
 save_aggregated_csv('cpu_usage', 'cpu_usage')
+has_cpu_usage_alloc = bool(mean_values_dict) and any(frame['cpu_usage_alloc'].notna().any() for frame in mean_values_dict.values())
+if has_cpu_usage_alloc:
+    save_aggregated_csv('cpu_usage_alloc', 'cpu_usage_alloc')
 save_aggregated_csv('memory_usage', 'memory_usage')
 save_aggregated_csv('num_threads', 'num_threads')
+for metric in thread_metrics + counter_metrics + memory_metrics:
+    save_aggregated_csv(metric, metric)
+
+# Alle Kennzahlen (count, min, max, mean, variance, Quantile) im Langformat
+aggregator.statistics_frame().to_csv(os.path.join(AGGREGATED_DIR, "statistics_aggregated.csv"), index=False)
 
 # Speichern der Ausführungszeit-Daten für alle Algorithmen
 execution_time_aggregated = pd.DataFrame({
@@ -116,8 +207,32 @@ execution_time_aggregated = pd.DataFrame({
     'coroutines_execution_time': time_data['coroutines'],
     'goroutines_execution_time': time_data['goroutines']
 })
+for ALGORITHM in algorithms:
+    if f'{ALGORITHM}_ci' in time_data.columns:
+        execution_time_aggregated[f'{ALGORITHM}_execution_time_ci'] = time_data[f'{ALGORITHM}_ci']
+        execution_time_aggregated[f'{ALGORITHM}_execution_time_n'] = time_data[f'{ALGORITHM}_n']
 execution_time_aggregated.to_csv(os.path.join(AGGREGATED_DIR, "execution_time_aggregated.csv"), index=False)
 
+# Startphase pro Algorithmus mit Konfidenzintervallen
+if startup_columns:
+    startup_aggregated = pd.DataFrame({'max_depth': time_data['max_depth'] + 1})
+    for column in startup_columns:
+        startup_aggregated[column] = time_data[column]
+        if f'{column}_ci' in time_data.columns:
+            startup_aggregated[f'{column}_ci'] = time_data[f'{column}_ci']
+    startup_aggregated.to_csv(os.path.join(AGGREGATED_DIR, "startup_aggregated.csv"), index=False)
+
+# Speicherbereinigung pro Algorithmus mit Konfidenzintervallen, Intervallwerte nur mit GC-Messwerten
+if gc_columns:
+    gc_aggregated = pd.DataFrame({'max_depth': time_data['max_depth'] + 1})
+    for column in gc_columns:
+        gc_aggregated[column] = time_data[column]
+        if f'{column}_ci' in time_data.columns:
+            gc_aggregated[f'{column}_ci'] = time_data[f'{column}_ci']
+    gc_aggregated.to_csv(os.path.join(AGGREGATED_DIR, "gc_aggregated.csv"), index=False)
+    for metric in gc_metrics:
+        save_aggregated_csv(metric, metric)
+
 # Funktion für das Plotten von Metriken als Säulendiagramm
 def plot_metric_bar(metric, ylabel, filename):
     plt.figure(figsize=(12, 6))
@@ -152,6 +267,38 @@ def plot_metric_bar(metric, ylabel, filename):
             alpha=1.0
         )
 
+        # Fehlerbalken vom Median (p50) bis p99, Markierung bei p95
+        p50_values = percentile_values_dict['p50'][ALGORITHM][metric]
+        p95_values = percentile_values_dict['p95'][ALGORITHM][metric]
+        p99_values = percentile_values_dict['p99'][ALGORITHM][metric]
+        plt.errorbar(
+            positions,
+            p50_values,
+            yerr=[np.zeros(len(p50_values)), p99_values - p50_values],
+            fmt='o',
+            color='black',
+            markersize=3,
+            capsize=3,
+            elinewidth=1,
+            label='p50 bis p99' if i == 0 else None
+        )
+        plt.scatter(positions, p95_values, marker='_', color='black', s=60, label='p95' if i == 0 else None)
+
+        # 95-%-Konfidenzintervall des Mittelwerts über die Wiederholungen, falls die Metrik gesteuert wurde
+        ci_values = confidence_values(f'{ALGORITHM}_{metric}_ci', max_values['max_depth'])
+        if ci_values is not None:
+            run_means = confidence_values(f'{ALGORITHM}_{metric}', max_values['max_depth'])
+            plt.errorbar(
+                positions,
+                pd.to_numeric(pd.Series(run_means), errors='coerce'),
+                yerr=ci_values,
+                fmt='none',
+                ecolor='dimgray',
+                capsize=5,
+                elinewidth=2,
+                label='95-%-Konfidenzintervall' if i == 0 else None
+            )
+
     #plt.title(f'{ylabel} mit Maximal- und Mittelwerten pro maximaler Baumebene')
     plt.xlabel('Maximale Baumebene')
     plt.ylabel(ylabel)
@@ -183,14 +330,16 @@ def plot_execution_time_bar():
         # Positionen auf der X-Achse für die Balken
         positions = (time_data['max_depth'] + 1) + (i - (num_algorithms - 1) / 2) * width
         
-        # Zeichne die Balken
+        # Zeichne die Balken, mit Konfidenzintervall über die Wiederholungen als Whisker
         plt.bar(
             positions,
             time_data[ALGORITHM],  # Höhe der Balken
             width=width,
             label=labels[ALGORITHM],
             color=color,
-            alpha=1.0
+            alpha=1.0,
+            yerr=time_data[f'{ALGORITHM}_ci'] if f'{ALGORITHM}_ci' in time_data.columns else None,
+            capsize=4
         )
 
     #plt.title('Ausführungsdauer pro maximaler Baumebene')
@@ -213,17 +362,195 @@ def plot_execution_time_bar():
     plt.savefig(os.path.join(PLOTS_DIR, "execution_time_plot.png"))
     plt.clf()
 
+# Startlatenz als gestapeltes Säulendiagramm: Start bis zur ersten Ausgabe (JVM- bzw. Go-Runtime-Start)
+# und erste Ausgabe bis Ende des Warm-ups, Whisker zeigen das Konfidenzintervall bis zum Ende des Warm-ups
+def plot_startup_bar():
+    plt.figure(figsize=(12, 6))
+
+    width = 0.2  # Breite der Balken
+    num_algorithms = len(algorithms)
+
+    for i, (ALGORITHM, color) in enumerate(zip(algorithms, colors)):
+        if f'{ALGORITHM}_time_to_ready' not in time_data.columns:
+            continue
+        positions = (time_data['max_depth'] + 1) + (i - (num_algorithms - 1) / 2) * width
+        first_output = time_data[f'{ALGORITHM}_time_to_first_output'].fillna(0)
+        ready = time_data[f'{ALGORITHM}_time_to_ready']
+
+        plt.bar(
+            positions,
+            first_output,
+            width=width,
+            label=f'{labels[ALGORITHM]} (bis erste Ausgabe)',
+            color=color,
+            alpha=0.4
+        )
+        plt.bar(
+            positions,
+            ready - first_output,
+            bottom=first_output,
+            width=width,
+            label=f'{labels[ALGORITHM]} (bis Ende Warm-up)',
+            color=color,
+            alpha=1.0,
+            yerr=time_data.get(f'{ALGORITHM}_time_to_ready_ci'),
+            capsize=4
+        )
+
+    #plt.title('Startlatenz pro maximaler Baumebene')
+    plt.xlabel('Maximale Baumebene')
+    plt.ylabel('Zeit ab Programmstart in Sekunden')
+
+    plt.legend(
+        title="Legende",
+        loc="upper center",
+        bbox_to_anchor=(0.5, -0.2),
+        ncol=2,
+        columnspacing=1,
+        handlelength=2
+    )
+
+    plt.xticks(time_data['max_depth'] + 1)
+    plt.grid(axis='y')
+    plt.tight_layout()
+    plt.savefig(os.path.join(PLOTS_DIR, "startup_latency_bar_plot.png"))
+    plt.clf()
+
+# Pausenzeit der Speicherbereinigung pro Wiederholung als Säulendiagramm: gesamte Pausenzeit mit
+# Konfidenzintervall, die längste einzelne Pause als Markierung
+def plot_gc_pause_bar():
+    plt.figure(figsize=(12, 6))
+
+    width = 0.2  # Breite der Balken
+    num_algorithms = len(algorithms)
+
+    for i, (ALGORITHM, color) in enumerate(zip(algorithms, colors)):
+        if f'{ALGORITHM}_gc_pause_total' not in gc_columns:
+            continue
+        positions = (time_data['max_depth'] + 1) + (i - (num_algorithms - 1) / 2) * width
+
+        plt.bar(
+            positions,
+            time_data[f'{ALGORITHM}_gc_pause_total'],
+            width=width,
+            label=labels[ALGORITHM],
+            color=color,
+            alpha=1.0,
+            yerr=time_data.get(f'{ALGORITHM}_gc_pause_total_ci'),
+            capsize=4
+        )
+        plt.scatter(positions, time_data[f'{ALGORITHM}_gc_pause_max'], marker='_', color='black', s=60,
+                    label='Längste Pause' if i == 0 else None)
+
+    plt.xlabel('Maximale Baumebene')
+    plt.ylabel('Pausenzeit der Speicherbereinigung in ms')
+
+    plt.legend(
+        title="Legende",
+        loc="upper center",
+        bbox_to_anchor=(0.5, -0.2),
+        ncol=5,
+        columnspacing=1,
+        handlelength=2
+    )
+
+    plt.xticks(time_data['max_depth'] + 1)
+    plt.grid(axis='y')
+    plt.tight_layout()
+    plt.savefig(os.path.join(PLOTS_DIR, "gc_pause_bar_plot.png"))
+    plt.clf()
+
+# Belegter gegenüber tatsächlich genutztem Arbeitsspeicher: RSS enthält den vorab belegten Heap (-Xms4g),
+# anonymer Speicher und USS zeigen den Arbeitsspeicher ohne Reservierungen des Allokators
+def plot_working_memory_bar():
+    plt.figure(figsize=(12, 6))
+
+    width = 0.2  # Breite der Balken
+    num_algorithms = len(algorithms)
+
+    for i, (ALGORITHM, color) in enumerate(zip(algorithms, colors)):
+        mean_values = mean_values_dict[ALGORITHM]
+        positions = (mean_values['max_depth'] + 1) + (i - (num_algorithms - 1) / 2) * width
+
+        plt.bar(
+            positions,
+            mean_values['memory_usage'],
+            width=width,
+            label=f'{labels[ALGORITHM]} (RSS)',
+            color=color,
+            alpha=0.3
+        )
+        plt.bar(
+            positions,
+            mean_values['memory_anon'],
+            width=width,
+            label=f'{labels[ALGORITHM]} (anonym)',
+            color=color,
+            alpha=1.0
+        )
+        plt.scatter(positions, mean_values['memory_uss'], marker='_', color='black', s=60, label='USS' if i == 0 else None)
+
+    plt.xlabel('Maximale Baumebene')
+    plt.ylabel('Arbeitsspeicher in MB')
+
+    plt.legend(
+        title="Legende",
+        loc="upper center",
+        bbox_to_anchor=(0.5, -0.2),
+        ncol=3,
+        columnspacing=1,
+        handlelength=2
+    )
+
+    plt.xticks(time_data['max_depth'] + 1)
+    plt.grid(axis='y')
+    plt.tight_layout()
+    plt.savefig(os.path.join(PLOTS_DIR, "working_memory_bar_plot.png"))
+    plt.clf()
+
 # CPU Usage Plot als Säulendiagramm
 plot_metric_bar("cpu_usage", "CPU-Auslastung in Prozent", "cpu_usage_bar_plot.png")
 
+# CPU-Auslastung bezogen auf die zugewiesenen CPUs, nur bei Messungen mit dieser Spalte
+if has_cpu_usage_alloc:
+    plot_metric_bar("cpu_usage_alloc", "CPU-Auslastung der zugewiesenen CPUs in Prozent", "cpu_usage_alloc_bar_plot.png")
+
 # Memory Usage Plot als Säulendiagramm
 plot_metric_bar("memory_usage", "Arbeitsspeicherverbrauch in MB", "memory_usage_bar_plot.png")
 
+# Arbeitsspeicher ohne vorab belegten Heap, nur mit Messwerten aus smaps_rollup
+if mean_values_dict and any(frame['memory_anon'].notna().any() for frame in mean_values_dict.values()):
+    plot_metric_bar("memory_pss", "Proportionaler Arbeitsspeicher (PSS) in MB", "memory_pss_bar_plot.png")
+    plot_working_memory_bar()
+
 # Execution Time Plot als Säulendiagramm
 plot_execution_time_bar()
 
 # Number of Threads Plot als Säulendiagramm
 plot_metric_bar("num_threads", "Thread-Anzahl", "num_threads_bar_plot.png")
 
+# Ausgelastete Threads und Thread-Wechsel als Säulendiagramm, nur mit Thread-Messwerten
+if mean_values_dict and any(frame['busy_threads_50'].notna().any() for frame in mean_values_dict.values()):
+    plot_metric_bar("busy_threads_50", "Threads mit mindestens 50 % eines Kerns", "busy_threads_bar_plot.png")
+    plot_metric_bar("threads_created", "Erzeugte Threads pro Intervall", "threads_created_bar_plot.png")
+    plot_metric_bar("max_thread_cpu", "CPU des am stärksten ausgelasteten Threads in Prozent", "max_thread_cpu_bar_plot.png")
+
+# Kontextwechsel und Seitenfehler pro Intervall als Säulendiagramm, nur mit Kernel-Zählern
+if PLOT_KERNEL_COUNTERS and mean_values_dict and any(frame['ctx_voluntary'].notna().any() for frame in mean_values_dict.values()):
+    plot_metric_bar("ctx_voluntary", "Freiwillige Kontextwechsel pro Intervall", "ctx_voluntary_bar_plot.png")
+    plot_metric_bar("ctx_involuntary", "Unfreiwillige Kontextwechsel pro Intervall", "ctx_involuntary_bar_plot.png")
+    plot_metric_bar("minor_faults", "Minor Page Faults pro Intervall", "minor_faults_bar_plot.png")
+    plot_metric_bar("major_faults", "Major Page Faults pro Intervall", "major_faults_bar_plot.png")
+
+# Startlatenz als Säulendiagramm, nur wenn das Zeit-Log die Startphase enthält
+if startup_columns:
+    plot_startup_bar()
+
+# Speicherbereinigung als Säulendiagramm, nur mit GC_LOGGING gemessen
+if gc_columns:
+    plot_gc_pause_bar()
+    plot_metric_bar("gc_cpu", "CPU-Zeit der Speicherbereinigung pro Intervall in ms", "gc_cpu_bar_plot.png")
+    plot_metric_bar("gc_heap_after", "Heap nach der Speicherbereinigung in MB", "gc_heap_after_bar_plot.png")
+
 print("Plotting with bar charts done")
 print("Aggregated CSV files have been created in the 'aggregated' folder.")
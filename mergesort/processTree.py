@@ -0,0 +1,86 @@
+import time
+
+import psutil
+
+
+# Tracks a root process plus all of its descendants. psutil.Process handles are
+# cached between ticks, the descendant list is only rebuilt every refresh_interval_ms
+class ProcessTreeCollector:
+
+    def __init__(self, root_pid, with_uss=False, refresh_interval_ms=500):
+        self.root = psutil.Process(root_pid)
+        self.with_uss = with_uss
+        self.refresh_interval_ns = int(refresh_interval_ms * 1_000_000)
+        self.last_refresh_ns = 0
+
+        self.processes = {root_pid: self.root}
+        self.last_cpu_times = {}
+        self.refresh()
+        # Processes that already exist at start only count CPU time from now on
+        for pid, proc in self.processes.items():
+            try:
+                cpu_times = proc.cpu_times()
+                self.last_cpu_times[pid] = cpu_times.user + cpu_times.system
+            except psutil.NoSuchProcess:
+                pass
+
+    def refresh(self):
+        self.last_refresh_ns = time.monotonic_ns()
+        try:
+            children = self.root.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return
+
+        alive = {self.root.pid}
+        for child in children:
+            alive.add(child.pid)
+            self.processes.setdefault(child.pid, child)
+
+        for pid in list(self.processes):
+            if pid not in alive:
+                del self.processes[pid]
+                self.last_cpu_times.pop(pid, None)
+
+    # Returns the summed values of the tree and one entry per process,
+    # or None once the root process is gone
+    def collect(self):
+        if time.monotonic_ns() - self.last_refresh_ns >= self.refresh_interval_ns:
+            self.refresh()
+
+        totals = {"cpu_time": 0.0, "rss": 0, "uss": 0, "num_threads": 0, "num_processes": 0}
+        breakdown = []
+        for pid, proc in list(self.processes.items()):
+            try:
+                with proc.oneshot():
+                    cpu_times = proc.cpu_times()
+                    memory = proc.memory_full_info() if self.with_uss else proc.memory_info()
+                    num_threads = proc.num_threads()
+                    name = proc.name()
+            except psutil.NoSuchProcess:
+                if proc is self.root:
+                    return None
+                del self.processes[pid]
+                self.last_cpu_times.pop(pid, None)
+                continue
+
+            # Descendants discovered after start count from 0, they were spawned during the run
+            cpu_time = cpu_times.user + cpu_times.system
+            cpu_delta = cpu_time - self.last_cpu_times.get(pid, 0.0)
+            self.last_cpu_times[pid] = cpu_time
+
+            uss = getattr(memory, "uss", 0)
+            totals["cpu_time"] += cpu_delta
+            totals["rss"] += memory.rss
+            totals["uss"] += uss
+            totals["num_threads"] += num_threads
+            totals["num_processes"] += 1
+            breakdown.append({
+                "pid": pid,
+                "name": name,
+                "cpu_time": cpu_delta,
+                "rss": memory.rss,
+                "uss": uss,
+                "num_threads": num_threads
+            })
+
+        return totals, breakdown
@@ -0,0 +1,51 @@
+import time
+
+
+# Schedules ticks on absolute time.monotonic_ns() deadlines, so time spent
+# in the loop body never accumulates as drift
+class FixedRateScheduler:
+
+    def __init__(self, interval_ms):
+        self.interval_ns = int(interval_ms * 1_000_000)
+        self.start_ns = None
+        self.next_deadline_ns = None
+        self.tick_start_ns = None
+        self.ticks = 0
+        self.missed_deadlines = 0
+        self.last_overhead_ns = 0
+        self.total_overhead_ns = 0
+        self.measured_ticks = 0
+
+    def start(self):
+        self.start_ns = time.monotonic_ns()
+        self.next_deadline_ns = self.start_ns
+        self.tick_start_ns = self.start_ns
+        return self.start_ns
+
+    # Sleeps until the next deadline and returns the wake-up time in ns
+    def sleep_until_next(self):
+        now_ns = time.monotonic_ns()
+        self.next_deadline_ns += self.interval_ns
+        if now_ns >= self.next_deadline_ns:
+            # The tick ran past one or more deadlines: skip them instead of bursting to catch up
+            missed = (now_ns - self.next_deadline_ns) // self.interval_ns + 1
+            self.missed_deadlines += missed
+            self.next_deadline_ns += missed * self.interval_ns
+
+        time.sleep(max(0, self.next_deadline_ns - time.monotonic_ns()) / 1e9)
+        self.tick_start_ns = time.monotonic_ns()
+        self.ticks += 1
+        return self.tick_start_ns
+
+    # Ends the body of the current tick and returns its overhead in ns (wake-up until now),
+    # called before the tick's sample is stored so that the sample carries its own overhead
+    def end_tick(self):
+        self.last_overhead_ns = time.monotonic_ns() - self.tick_start_ns
+        self.total_overhead_ns += self.last_overhead_ns
+        self.measured_ticks += 1
+        return self.last_overhead_ns
+
+    def mean_overhead_us(self):
+        if self.measured_ticks == 0:
+            return 0.0
+        return self.total_overhead_ns / self.measured_ticks / 1000
@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pytest
+
+from harness import aggregation
+from harness.aggregation import StreamingAggregator
+
+HEADER = "point,timestamp,cpu_usage\n"
+
+
+def write_rows(path, rows, mode="a"):
+    with open(path, mode) as file:
+        if mode == "w":
+            file.write(HEADER)
+        file.writelines(f"{point},{timestamp},{cpu}\n" for point, timestamp, cpu in rows)
+
+
+def test_chunks_merge_to_the_statistics_of_one_pass(monkeypatch):
+    monkeypatch.setattr(aggregation, "CHUNK_ROWS", 7)
+    rng = np.random.default_rng(1)
+    values = rng.normal(50, 10, 100)
+    points = np.repeat([0.0, 1.0], 50)
+
+    aggregator = StreamingAggregator("point", ["cpu_usage"])
+    for start in range(0, 100, 7):
+        aggregator.add_columns("virtual", {"point": points[start:start + 7], "cpu_usage": values[start:start + 7]})
+
+    for point, selected in ((0, values[:50]), (1, values[50:])):
+        stats = aggregator.stats("virtual", point)["cpu_usage"]
+        assert stats.count == 50
+        assert stats.mean == pytest.approx(selected.mean())
+        assert stats.variance() == pytest.approx(selected.var(ddof=1))
+        assert (stats.min, stats.max) == (selected.min(), selected.max())
+
+
+def test_csv_is_read_incrementally_across_saved_states(tmp_path, monkeypatch):
+    monkeypatch.setattr(aggregation, "CHUNK_ROWS", 2)
+    csv_file = os.path.join(tmp_path, "measurement_log_virtual.csv")
+    state = os.path.join(tmp_path, "aggregation_state.json")
+    write_rows(csv_file, [(0, 0.5, 10.0), (0, 1.0, 20.0), (1, 0.5, 30.0)], mode="w")
+
+    aggregator = StreamingAggregator("point", ["cpu_usage"], state)
+    aggregator.update_from_csv("virtual", csv_file)
+    aggregator.save()
+
+    # A line still being written is left for the next call
+    with open(csv_file, "a") as file:
+        file.write("1,1.0,40.0\n1,1.5,5")
+
+    aggregator = StreamingAggregator("point", ["cpu_usage"], state)
+    aggregator.update_from_csv("virtual", csv_file)
+    assert aggregator.stats("virtual", 0)["cpu_usage"].count == 2
+    assert aggregator.stats("virtual", 1)["cpu_usage"].count == 2
+    assert aggregator.stats("virtual", 1)["cpu_usage"].mean == 35.0
+
+    with open(csv_file, "a") as file:
+        file.write("0.0\n")
+    aggregator.update_from_csv("virtual", csv_file)
+    assert aggregator.stats("virtual", 1)["cpu_usage"].count == 3
+    assert aggregator.stats("virtual", 1)["cpu_usage"].max == 50.0
+    assert not aggregator.is_stale()
+
+
+def test_state_of_other_metrics_is_not_reused(tmp_path):
+    state = os.path.join(tmp_path, "aggregation_state.json")
+    aggregator = StreamingAggregator("point", ["cpu_usage"], state)
+    aggregator.add_columns("virtual", {"point": np.zeros(3), "cpu_usage": np.ones(3)})
+    aggregator.save()
+
+    assert StreamingAggregator("point", ["cpu_usage"], state).stats("virtual", 0)["cpu_usage"].count == 3
+    assert StreamingAggregator("point", ["cpu_usage", "memory_usage"], state).groups == {}
@@ -0,0 +1,123 @@
+import os
+
+import pytest
+
+import cgroupSampler
+from cgroupSampler import CgroupSampler
+
+MB = 1024 * 1024
+
+
+def fake_cgroup(path, memory_current, memory_stat):
+    files = {
+        "cpu.stat": "usage_usec 1000\nuser_usec 800\nsystem_usec 200\n",
+        "memory.current": f"{memory_current}\n",
+        "pids.current": "3\n",
+        "memory.stat": "".join(f"{key} {value}\n" for key, value in memory_stat.items()),
+        "cgroup.threads": f"{os.getpid()}\n",
+    }
+    for name, content in files.items():
+        with open(os.path.join(path, name), "w") as file:
+            file.write(content)
+
+
+def test_memory_excludes_inactive_page_cache(tmp_path, monkeypatch):
+    memory_stat = {"anon": 300 * MB, "file": 200 * MB, "kernel": 20 * MB, "inactive_file": 150 * MB}
+    fake_cgroup(tmp_path, 520 * MB, memory_stat)
+    monkeypatch.setattr(cgroupSampler, "resolve_cgroup_path", lambda name: (os.getpid(), str(tmp_path)))
+
+    sampler = CgroupSampler("bank-bank-1")
+    try:
+        stats = sampler.read()
+    finally:
+        sampler.close()
+
+    # Same value as docker stats and dockerApi.parse_stats: memory.current minus inactive_file
+    assert stats["Memory"] == 370
+    assert (stats["MemAnon"], stats["MemFile"], stats["MemKernel"]) == (300, 200, 20)
+    assert stats["PIDs"] == 3
+
+
+
+def write_cpu_stat(path, usage_usec, nr_periods, nr_throttled, throttled_usec):
+    with open(os.path.join(path, "cpu.stat"), "w") as file:
+        file.write(f"usage_usec {usage_usec}\nnr_periods {nr_periods}\nnr_throttled {nr_throttled}\nthrottled_usec {throttled_usec}\n")
+
+
+def test_throttling_is_the_delta_since_the_previous_read(tmp_path, monkeypatch):
+    fake_cgroup(tmp_path, 100 * MB, {})
+    write_cpu_stat(tmp_path, 0, 1000, 900, 5_000_000)
+    clock = [10_000_000_000]
+    monkeypatch.setattr(cgroupSampler.time, "monotonic_ns", lambda: clock[0])
+    monkeypatch.setattr(cgroupSampler, "resolve_cgroup_path", lambda name: (os.getpid(), str(tmp_path)))
+
+    sampler = CgroupSampler("bank-bank-1")
+    try:
+        # One second later: 10 more CFS periods, 4 of them throttled for 30 ms in total
+        clock[0] += 1_000_000_000
+        write_cpu_stat(tmp_path, 500_000, 1010, 904, 5_030_000)
+        stats = sampler.read()
+        assert stats["CPU"] == 50.0
+        assert stats["ThrottleRatio"] == 0.4
+        assert stats["Throttled"] == 30.0
+
+        # Without new periods nothing was throttled
+        clock[0] += 1_000_000_000
+        stats = sampler.read()
+        assert (stats["ThrottleRatio"], stats["Throttled"]) == (0.0, 0.0)
+    finally:
+        sampler.close()
+
+
+def test_throttling_is_empty_without_cpu_limit(tmp_path, monkeypatch):
+    fake_cgroup(tmp_path, 100 * MB, {})
+    monkeypatch.setattr(cgroupSampler, "resolve_cgroup_path", lambda name: (os.getpid(), str(tmp_path)))
+
+    sampler = CgroupSampler("bank-bank-1")
+    try:
+        stats = sampler.read()
+    finally:
+        sampler.close()
+    assert (stats["ThrottleRatio"], stats["Throttled"]) == (None, None)
+
+
+def test_runqueue_wait_is_summed_over_the_threads_of_the_cgroup(tmp_path, monkeypatch):
+    fake_cgroup(tmp_path, 100 * MB, {})
+    clock = [10_000_000_000]
+    monkeypatch.setattr(cgroupSampler.time, "monotonic_ns", lambda: clock[0])
+    monkeypatch.setattr(cgroupSampler, "resolve_cgroup_path", lambda name: (os.getpid(), str(tmp_path)))
+    if not os.path.exists(f"/proc/{os.getpid()}/schedstat"):
+        pytest.skip("kernel without schedstat")
+
+    sampler = CgroupSampler("bank-bank-1")
+    try:
+        # Two threads whose /proc/<tid>/schedstat (run time, wait time in ns, timeslices) are fixture files
+        (tmp_path / "cgroup.threads").write_text("101\n102\n")
+        for tid, content in ((b"101", "5000 2000000 10\n"), (b"102", "7000 0 0\n")):
+            (tmp_path / f"schedstat_{tid.decode()}").write_text(content)
+            sampler.schedstat_fds[tid] = os.open(tmp_path / f"schedstat_{tid.decode()}", os.O_RDONLY)
+        sampler.read()
+
+        clock[0] += 1_000_000_000
+        (tmp_path / "schedstat_101").write_text("9000 302000000 40\n")
+        (tmp_path / "schedstat_102").write_text("9000 100000000 20\n")
+        stats = sampler.read()
+    finally:
+        sampler.close()
+
+    # 400 ms of waiting in one second over 50 timeslices
+    assert stats["RunqueueWait"] == pytest.approx(0.4)
+    assert stats["SchedDelay"] == pytest.approx(8.0)
+
+
+def test_cgroup_procs_follows_the_processes_of_the_cgroup(tmp_path):
+    procs_file = tmp_path / "cgroup.procs"
+    procs_file.write_text("101\n")
+    procs = cgroupSampler.CgroupProcs(str(tmp_path))
+    try:
+        assert procs.read() == [101]
+        # The file stays open, every read sees processes started since
+        procs_file.write_text("101\n205\n")
+        assert procs.read() == [101, 205]
+    finally:
+        procs.close()
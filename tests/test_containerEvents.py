@@ -0,0 +1,88 @@
+import json
+import queue
+
+from containerEvents import ContainerExitWatcher
+
+STOP = object()
+
+
+# Event source fed by the test, blocks until the next event like docker events does
+class FakeEventSource:
+
+    def __init__(self):
+        self.events = queue.Queue()
+        self.closed = False
+
+    def __iter__(self):
+        while True:
+            event = self.events.get()
+            if event is STOP:
+                return
+            yield event
+
+    def send(self, action, name="bank-bank-1", seconds=1, **attributes):
+        self.events.put({"Type": "container", "Action": action, "timeNano": seconds * 1_000_000_000,
+                         "Actor": {"Attributes": {"name": name, **attributes}}})
+
+    def end(self):
+        self.events.put(STOP)
+
+    def close(self):
+        self.closed = True
+        self.end()
+
+
+def test_start_and_die():
+    source = FakeEventSource()
+    watcher = ContainerExitWatcher("bank-bank-1", source)
+    # A "die" of the replaced container and events of other containers are ignored
+    source.send("die", exitCode="137")
+    source.send("start", name="postgres")
+    source.send("start", seconds=2)
+    assert watcher.wait_started()
+    assert watcher.started_at == 2.0
+    assert not watcher.exited.is_set()
+
+    source.send("die", seconds=5, exitCode="0")
+    assert watcher.wait(5)
+    assert (watcher.exit_code, watcher.finished_at) == (0, 5.0)
+    assert watcher.is_alive()
+    watcher.close()
+
+
+def test_json_lines_as_source():
+    lines = ["", "not json", json.dumps({"status": "start", "timeNano": 1_000_000_000, "Actor": {"Attributes": {"name": "bank-bank-1"}}}),
+             json.dumps({"status": "die", "timeNano": 3_000_000_000, "Actor": {"Attributes": {"name": "bank-bank-1", "exitCode": "1"}}})]
+    watcher = ContainerExitWatcher("bank-bank-1", iter(lines))
+    assert watcher.wait(5)
+    assert (watcher.started_at, watcher.exit_code, watcher.finished_at) == (1.0, 1, 3.0)
+
+
+def test_wait_started_gives_up_when_the_source_ends():
+    source = FakeEventSource()
+    watcher = ContainerExitWatcher("bank-bank-1", source)
+    source.send("die", exitCode="0")
+    source.end()
+
+    assert not watcher.wait_started(poll_interval=0.01)
+    assert not watcher.is_alive()
+    assert watcher.exit_code is None
+
+
+def test_wait_started_gives_up_when_stopped():
+    source = FakeEventSource()
+    watcher = ContainerExitWatcher("bank-bank-1", source)
+    assert not watcher.wait_started(stop=lambda: True, poll_interval=0.01)
+    watcher.close()
+
+
+def test_close_ends_the_source():
+    source = FakeEventSource()
+    watcher = ContainerExitWatcher("bank-bank-1", source)
+    source.send("start")
+    assert watcher.wait_started()
+
+    watcher.close()
+    assert source.closed
+    assert not watcher.thread.is_alive()
+    assert not watcher.is_alive()
@@ -0,0 +1,49 @@
+from harness.cpuScheduler import CpuSetAllocator, ExperimentScheduler
+
+
+def make_scheduler(max_retries=1):
+    return ExperimentScheduler(CpuSetAllocator(harness_cpus=0, memory_mb=1024), max_parallel=1, max_retries=max_retries)
+
+
+def test_finished_jobs_are_not_failures():
+    scheduler = make_scheduler()
+    calls = []
+    scheduler.submit("ok", 1, 1, lambda allocation: calls.append(allocation.cpus) and False)
+
+    assert scheduler.run() == []
+    assert len(calls) == 1
+
+
+def test_raising_job_is_reported_as_failure():
+    scheduler = make_scheduler()
+
+    def crash(allocation):
+        raise RuntimeError("record_process_stats crashed")
+
+    scheduler.submit("crash", 1, 1, crash)
+    scheduler.submit("ok", 1, 1, lambda allocation: False)
+
+    failed = scheduler.run()
+    assert [job.name for job in failed] == ["crash"]
+    assert failed[0].failure == "RuntimeError: record_process_stats crashed"
+    # The CPUs of the crashed job went back to the allocator
+    assert scheduler.allocator.try_allocate(scheduler.allocator.total_cpus, 1) is not None
+
+
+def test_job_over_the_retry_limit_is_reported_as_failure():
+    scheduler = make_scheduler(max_retries=2)
+    attempts = []
+    scheduler.submit("noisy", 1, 1, lambda allocation: attempts.append(1) or True)
+
+    failed = scheduler.run()
+    assert [job.name for job in failed] == ["noisy"]
+    assert len(attempts) == 3
+    assert "interference" in failed[0].failure
+
+
+def test_requeued_job_that_finishes_is_not_a_failure():
+    scheduler = make_scheduler(max_retries=2)
+    results = iter([True, False])
+    scheduler.submit("flaky", 1, 1, lambda allocation: next(results))
+
+    assert scheduler.run() == []
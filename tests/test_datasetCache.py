@@ -0,0 +1,112 @@
+import os
+import subprocess
+
+import pytest
+
+import datasetCache
+from datasetCache import DATASET_DIR_NAME, DatasetCache, link_dataset
+
+
+# Stands in for java -jar: writes <size> bytes into bankData/accounts.csv in the working directory
+class FakeGenerator:
+
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    def __call__(self, command, cwd, **kwargs):
+        self.calls += 1
+        if self.fail:
+            raise subprocess.CalledProcessError(1, command)
+        os.makedirs(os.path.join(cwd, DATASET_DIR_NAME))
+        with open(os.path.join(cwd, DATASET_DIR_NAME, "accounts.csv"), "w") as file:
+            file.write("x" * int(command[-1]))
+        return subprocess.CompletedProcess(command, 0, "", "")
+
+
+@pytest.fixture
+def jar(tmp_path):
+    path = tmp_path / "generator.jar"
+    path.write_bytes(b"version 1")
+    return str(path)
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    generator = FakeGenerator()
+    monkeypatch.setattr(datasetCache.subprocess, "run", generator)
+    return generator
+
+
+def test_key_covers_parameters_seed_and_jar_contents(tmp_path, jar):
+    cache = DatasetCache(str(tmp_path / "cache"))
+    key = cache.key(jar, ["100"], 1)
+    assert cache.key(jar, ["100"], 1) == key
+    assert cache.key(jar, ["200"], 1) != key
+    assert cache.key(jar, ["100"], 2) != key
+
+    with open(jar, "wb") as file:
+        file.write(b"version 2")
+    os.utime(jar, ns=(0, 0))
+    assert cache.key(jar, ["100"], 1) != key
+
+
+def test_second_request_is_a_hit(tmp_path, jar, generator):
+    cache = DatasetCache(str(tmp_path / "cache"))
+    first = cache.get(jar, [100], seed=1)
+    second = cache.get(jar, [100], seed=1)
+
+    assert first == second
+    assert generator.calls == 1
+    assert os.path.getsize(os.path.join(first, "accounts.csv")) == 100
+
+
+def test_failed_generation_leaves_no_entry(tmp_path, jar, monkeypatch):
+    monkeypatch.setattr(datasetCache.subprocess, "run", FakeGenerator(fail=True))
+    cache = DatasetCache(str(tmp_path / "cache"))
+
+    with pytest.raises(subprocess.CalledProcessError):
+        cache.get(jar, [100])
+    assert os.listdir(cache.cache_dir) == []
+
+
+def test_least_recently_used_entries_are_evicted_beyond_max_bytes(tmp_path, jar, generator, monkeypatch):
+    clock = iter(range(1_000, 2_000, 10))
+    monkeypatch.setattr(datasetCache.time, "time", lambda: next(clock))
+    cache = DatasetCache(str(tmp_path / "cache"), max_bytes=250)
+
+    first = cache.get(jar, [100])
+    second = cache.get(jar, [101])
+    # Using the first entry again makes the second one the least recently used
+    cache.get(jar, [100])
+    third = cache.get(jar, [102])
+
+    assert os.path.isdir(first) and os.path.isdir(third)
+    assert not os.path.exists(os.path.dirname(second))
+
+
+def test_entries_unused_for_max_age_are_evicted(tmp_path, jar, generator, monkeypatch):
+    now = [1_000.0]
+    monkeypatch.setattr(datasetCache.time, "time", lambda: now[0])
+    cache = DatasetCache(str(tmp_path / "cache"), max_age=60)
+
+    old = cache.get(jar, [100])
+    now[0] += 61
+    current = cache.get(jar, [101])
+
+    assert not os.path.exists(old)
+    assert os.path.isdir(current)
+
+
+def test_link_dataset_shares_the_files_of_the_cache(tmp_path, jar, generator):
+    cache = DatasetCache(str(tmp_path / "cache"))
+    dataset = cache.get(jar, [100])
+    target = str(tmp_path / "bank" / DATASET_DIR_NAME)
+    os.makedirs(target)
+    with open(os.path.join(target, "stale.csv"), "w") as file:
+        file.write("from an earlier run")
+
+    link_dataset(dataset, target)
+
+    assert os.listdir(target) == ["accounts.csv"]
+    assert os.path.samefile(os.path.join(target, "accounts.csv"), os.path.join(dataset, "accounts.csv"))
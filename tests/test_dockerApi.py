@@ -0,0 +1,165 @@
+import http.server
+import json
+import os
+import socketserver
+import tempfile
+import threading
+
+import pytest
+
+from containerEvents import ContainerExitWatcher
+from dockerApi import DockerApiError, DockerClient, StatsStreamer, parse_stats
+
+MB = 1024 * 1024
+
+STATS = {
+    "cpu_stats": {"cpu_usage": {"total_usage": 400}, "system_cpu_usage": 2000, "online_cpus": 4,
+                  "throttling_data": {"periods": 10, "throttled_periods": 3}},
+    "precpu_stats": {"cpu_usage": {"total_usage": 200}, "system_cpu_usage": 1000,
+                     "throttling_data": {"periods": 5, "throttled_periods": 2}},
+    "memory_stats": {"usage": 600 * MB, "stats": {"anon": 300 * MB, "file": 250 * MB, "kernel": 10 * MB,
+                                                  "inactive_file": 100 * MB}},
+    "pids_stats": {"current": 12},
+    "networks": {"eth0": {"rx_bytes": 100, "tx_bytes": 50}, "eth1": {"rx_bytes": 1, "tx_bytes": 2}},
+    "blkio_stats": {"io_service_bytes_recursive": [{"op": "Read", "value": 4096}, {"op": "Write", "value": 8192}]},
+}
+
+
+# Docker daemon on a Unix socket: answers /containers/<name>/json with keep-alive, but closes
+# the connection after every answer when drop_connections is set, like an idle daemon does.
+# Streams send their lines chunked and stay open until the client goes away.
+class FakeDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path):
+        self.connections = 0
+        self.drop_connections = False
+        self.streams = {}
+        self.stream_ended = threading.Event()
+        super().__init__(path, FakeHandler)
+
+
+class FakeHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def address_string(self):
+        return "docker.sock"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path in self.server.streams:
+            self.send_stream(self.server.streams[path])
+            return
+        if path != "/containers/bank/json":
+            self.send_json(404, {"message": f"No such container: {path}"})
+            return
+        self.send_json(200, {"State": {"Pid": 42}})
+        if self.server.drop_connections:
+            self.close_connection = True
+
+    def send_json(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_stream(self, lines):
+        self.send_response(200)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for line in lines:
+                data = (json.dumps(line) + "\n").encode()
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+            # Open until the client shuts its socket down
+            self.rfile.read()
+        except OSError:
+            pass
+        self.server.stream_ended.set()
+        self.close_connection = True
+
+
+@pytest.fixture
+def daemon():
+    directory = tempfile.mkdtemp()
+    server = FakeDaemon(os.path.join(directory, "docker.sock"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_parse_stats():
+    stats = parse_stats(STATS)
+
+    assert stats["CPU"] == 80.0
+    assert stats["Memory"] == 500
+    assert stats["PIDs"] == 12
+    assert (stats["NetRx"], stats["NetTx"]) == (101, 52)
+    assert (stats["BlkRead"], stats["BlkWrite"]) == (4096, 8192)
+    assert stats["ThrottleRatio"] == pytest.approx(0.2)
+    assert (stats["MemAnon"], stats["MemFile"], stats["MemKernel"]) == (300, 250, 10)
+
+
+def test_get_json_reconnects_after_the_daemon_closed_the_connection(daemon):
+    client = DockerClient(daemon.server_address)
+    try:
+        daemon.drop_connections = True
+        assert client.inspect("bank")["State"]["Pid"] == 42
+        assert client.inspect("bank")["State"]["Pid"] == 42
+        assert daemon.connections == 2
+        with pytest.raises(DockerApiError):
+            client.inspect("missing")
+    finally:
+        client.close()
+
+
+def test_stream_yields_lines_and_close_releases_the_connection(daemon):
+    daemon.streams["/containers/bank/stats"] = [STATS, STATS]
+    client = DockerClient(daemon.server_address)
+    stream = client.stats("bank")
+    samples = []
+    for sample in stream:
+        samples.append(sample)
+        if len(samples) == 2:
+            break
+    stream.close()
+    assert [sample["CPU"] for sample in samples] == [80.0, 80.0]
+    assert daemon.stream_ended.wait(5)
+    client.close()
+
+
+def test_stats_streamer_close_ends_its_threads(daemon):
+    daemon.streams["/containers/bank/stats"] = [STATS]
+    daemon.streams["/containers/postgres/stats"] = [STATS]
+    streamer = StatsStreamer(DockerClient(daemon.server_address), ["bank", "postgres"])
+    with streamer.updated:
+        assert streamer.updated.wait_for(lambda: len(streamer.latest) == 2, timeout=5)
+    assert streamer.latest["bank"]["CPU"] == 80.0
+
+    streamer.close()
+    assert not any(thread.is_alive() for thread in streamer.threads)
+    assert daemon.stream_ended.wait(5)
+
+
+def test_watcher_close_shuts_the_events_stream_down(daemon):
+    daemon.streams["/events"] = [{"Type": "container", "Action": "start", "timeNano": 1_000_000_000,
+                                  "Actor": {"Attributes": {"name": "bank"}}}]
+    watcher = ContainerExitWatcher("bank", DockerClient(daemon.server_address).events("bank"))
+    assert watcher.wait_started(stop=lambda: False)
+    assert watcher.started_at == 1.0
+
+    watcher.close()
+    assert not watcher.thread.is_alive()
+    assert daemon.stream_ended.wait(5)
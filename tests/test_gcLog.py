@@ -0,0 +1,96 @@
+import os
+
+import pytest
+
+from conftest import FIXTURES
+from harness.gcLog import GcLogParser, parse_gctrace_line, parse_jvm_line
+
+
+# Feeds a recorded program output to a parser, one second apart, and returns the parser
+# and the time of the warm-up marker
+def replay(name):
+    parser = GcLogParser()
+    ready_at = None
+    with open(os.path.join(FIXTURES, name)) as file:
+        for timestamp, line in enumerate(file):
+            if "warum up runs finished" in line:
+                ready_at = timestamp
+            parser.on_line(float(timestamp), "stdout", line.rstrip("\n"))
+    return parser, ready_at
+
+
+def events(parser):
+    return {record["gc"]: record for record in parser.events.values()}
+
+
+def test_g1_pauses_heap_and_cpu():
+    parser, _ = replay("gc_jvm_g1.log")
+    records = events(parser)
+
+    assert sorted(records) == [0, 1, 2, 3]
+    young = records[0]
+    assert young["kind"] == "Pause Young"
+    assert young["pause_ms"] == pytest.approx(6.789)
+    assert (young["heap_before"], young["heap_after"], young["heap_total"]) == (24, 3, 256)
+    assert young["cpu_ms"] == pytest.approx(30.0)
+
+    # Remark and cleanup of a concurrent cycle are two pauses of one collection, the concurrent phases are none
+    cycle = records[2]
+    assert cycle["pauses"] == 2
+    assert cycle["pause_ms"] == pytest.approx(1.5)
+    assert cycle["max_pause_ms"] == pytest.approx(1.25)
+    assert (cycle["heap_before"], cycle["heap_after"]) == (100, 98)
+
+
+def test_full_gc_with_nested_parentheses():
+    parser, _ = replay("gc_jvm_g1.log")
+    full = events(parser)[3]
+
+    assert full["kind"] == "Pause Full"
+    assert full["pause_ms"] == pytest.approx(13.5)
+    assert (full["heap_before"], full["heap_after"], full["heap_total"]) == (1024, 12, 256)
+    assert full["cpu_ms"] == pytest.approx(70.0)
+    assert parser.totals() == pytest.approx({"gc_collections": 4, "gc_pause_total": 24.289,
+                                             "gc_pause_max": 13.5, "gc_cpu_total": 110.0})
+
+
+def test_zgc_pauses_and_heap_of_the_summary():
+    parser, _ = replay("gc_jvm_zgc.log")
+    records = events(parser)
+
+    assert sorted(records) == [3, 4]
+    assert records[3]["pauses"] == 3
+    assert records[3]["pause_ms"] == pytest.approx(0.041)
+    assert records[3]["max_pause_ms"] == pytest.approx(0.020)
+    assert (records[3]["heap_before"], records[3]["heap_after"]) == (120, 40)
+    # Generational ZGC prefixes the pauses with the generation
+    assert records[4]["kind"] == "Pause Mark Start"
+    assert records[4]["pause_ms"] == pytest.approx(0.045)
+    assert (records[4]["heap_before"], records[4]["heap_after"]) == (1024, 512)
+
+
+def test_gctrace_pause_cpu_and_heap():
+    event = parse_gctrace_line("gc 2 @0.050s 3%: 0.021+1.2+0.019 ms clock, 0.16+0.40/2.1/0.56+0.15 ms cpu, "
+                               "58->59->30 MB, 60 MB goal, 0 MB stacks, 0 MB globals, 8 P")
+    assert event["pause_ms"] == pytest.approx(0.040)
+    assert event["cpu_ms"] == pytest.approx(3.37)
+    assert (event["heap_before"], event["heap_after"]) == (58, 30)
+
+
+def test_totals_and_samples_since_the_warm_up():
+    parser, ready_at = replay("gc_go.log")
+
+    assert parser.totals(since=ready_at) == pytest.approx({"gc_collections": 2, "gc_pause_total": 0.090,
+                                                           "gc_pause_max": 0.050, "gc_cpu_total": 9.07})
+    count, pause, cpu, heap_after = parser.sample()
+    assert (count, heap_after) == (3, 31)
+    assert pause == pytest.approx(0.108)
+    assert cpu == pytest.approx(10.175)
+    assert parser.sample() == (0, 0.0, 0.0, None)
+
+
+def test_other_lines_are_ignored():
+    assert parse_jvm_line("[0.215s][info][gc,start    ] GC(0) Pause Young (Normal) (G1 Evacuation Pause)") is None
+    assert parse_jvm_line("[0.490s][info][gc,marking  ] GC(2) Concurrent Mark (0.483s, 0.490s) 7.012ms") is None
+    assert parse_jvm_line("[0.221s][info][gc,heap     ] GC(0) Eden regions: 24->0(21)") is None
+    assert parse_gctrace_line("warum up runs finished") is None
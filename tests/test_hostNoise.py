@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+import time
+
+from harness.hostNoise import HostNoiseSampler, ProcessCpuUsage, interference_score
+
+COMM = open("/proc/self/comm").read().strip()
+
+
+def burn(seconds):
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        pass
+
+
+# skip() for ProcessCpuUsage that leaves every process but the given ones out
+def only(*pids):
+    counted = {str(pid) for pid in pids}
+    return lambda pid: pid not in counted
+
+
+def test_process_usage_counts_cpu_since_construction():
+    usage = ProcessCpuUsage([COMM], skip=only(os.getpid()))
+    assert usage.seconds == 0.0
+    burn(0.3)
+    assert 0.25 <= usage.update() <= 0.5
+    assert usage.update() < 0.55
+
+
+def test_process_usage_counts_new_processes_from_their_start():
+    usage = ProcessCpuUsage([COMM], skip=lambda pid: True)
+    child = subprocess.Popen([sys.executable, "-c", "import time\nend = time.process_time() + 0.3\nwhile time.process_time() < end: pass\ntime.sleep(30)"])
+    try:
+        usage.skip = only(child.pid)
+        deadline = time.monotonic() + 10
+        while usage.update() < 0.25 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert usage.seconds >= 0.25
+    finally:
+        child.kill()
+        child.wait()
+    # The exited process keeps what was counted of it
+    assert usage.update() >= 0.25
+
+
+def test_other_names_are_not_counted():
+    usage = ProcessCpuUsage(["dockerd-that-does-not-exist"])
+    burn(0.1)
+    assert usage.update() == 0.0
+
+
+def test_own_processes_count_as_own_cpu(tmp_path):
+    (tmp_path / "cpu.stat").write_text("usage_usec 500000\n")
+    sampler = HostNoiseSampler(own_cgroups=[str(tmp_path)], own_processes=[COMM])
+    sampler.own_processes.skip = only(os.getpid())
+    start = sampler.snapshot()
+    burn(0.3)
+    (tmp_path / "cpu.stat").write_text("usage_usec 1500000\n")
+    end = sampler.snapshot()
+
+    assert 1.25 <= end["own"] - start["own"] <= 1.5
+
+
+def test_own_cpu_is_not_foreign():
+    sampler = HostNoiseSampler()
+    ticks = sampler.clock_ticks
+    start = {"time": 0.0, "total": 0, "busy": 0, "steal": 0, "iowait": 0, "cpus": 4, "own": 0.0, "pressure": {}, "throttle": None}
+    # 2 busy CPU seconds on 4 CPUs over 10 s, 1.6 s of them in own cgroups and processes
+    end = dict(start, time=10.0, total=40 * ticks, busy=2 * ticks, own=1.6)
+    noise = sampler.shares(start, end)
+    assert abs(noise["host_foreign_cpu"] - 0.4 / 40) < 1e-9
+    assert interference_score(noise) < 0.05
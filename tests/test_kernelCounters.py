@@ -0,0 +1,53 @@
+import os
+import threading
+
+import numpy as np
+
+from conftest import FIXTURES
+from harness.kernelCounters import COUNTER_COLUMNS, KernelCounterCollector, parse_context_switches, parse_faults, parse_io
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), "rb") as file:
+        return file.read()
+
+
+def test_parse_faults():
+    assert parse_faults(read_fixture("proc_stat")) == (183422, 1207)
+
+
+def test_parse_io_takes_storage_bytes_not_rchar():
+    assert parse_io(read_fixture("proc_io")) == (1490944, 16384000)
+
+
+def test_parse_context_switches():
+    assert parse_context_switches(read_fixture("proc_task_status")) == (15821, 312)
+
+
+def test_collect_returns_deltas_since_the_previous_tick():
+    collector = KernelCounterCollector([os.getpid()])
+    try:
+        # Touching fresh pages causes minor faults, a sleeping thread switches voluntarily
+        np.ones(64 * 1024 * 1024 // 8).sum()
+        thread = threading.Thread(target=threading.Event().wait, args=(0.05,))
+        thread.start()
+        thread.join()
+        values = dict(zip((name for name, _ in COUNTER_COLUMNS), collector.collect()))
+        assert values["minor_faults"] > 0
+        assert values["ctx_voluntary"] > 0
+
+        # The next tick only counts what happened since
+        assert collector.collect()[2] < values["minor_faults"]
+    finally:
+        collector.close()
+
+
+def test_exited_processes_are_dropped():
+    collector = KernelCounterCollector([os.getpid(), 999_999_999])
+    try:
+        assert list(collector.process_fds) == [os.getpid()]
+        collector.update_pids([])
+        assert collector.process_fds == {}
+        assert collector.collect() == (0,) * len(COUNTER_COLUMNS)
+    finally:
+        collector.close()
@@ -0,0 +1,87 @@
+import os
+import shutil
+
+import pytest
+
+from conftest import FIXTURES
+from harness import memoryStats
+from harness.memoryStats import SmapsCollector, parse_smaps_rollup
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), "rb") as file:
+        return file.read()
+
+
+def test_parse_smaps_rollup():
+    values = parse_smaps_rollup(read_fixture("proc_smaps_rollup"))
+    assert values[b"Rss"] == 368588
+    assert values[b"Pss"] == 352140
+    assert (values[b"Private_Clean"], values[b"Private_Dirty"]) == (21132, 331008)
+    assert values[b"Anonymous"] == 330240
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(memoryStats.time, "monotonic", lambda: now[0])
+    return now
+
+
+# A collector whose two processes read the recorded smaps_rollup
+@pytest.fixture
+def collector(tmp_path, clock):
+    collector = SmapsCollector(budget=0.01, min_interval=0.1, max_interval=5.0)
+    for pid in (1001, 1002):
+        path = os.path.join(tmp_path, f"smaps_rollup_{pid}")
+        shutil.copy(os.path.join(FIXTURES, "proc_smaps_rollup"), path)
+        collector.fds[pid] = os.open(path, os.O_RDONLY)
+    yield collector
+    collector.close()
+
+
+def test_values_are_summed_over_the_processes(collector):
+    pss, uss, anon, file = collector.collect()
+    assert pss == pytest.approx(2 * 352140 / 1024)
+    assert uss == pytest.approx(2 * (21132 + 331008) / 1024)
+    assert anon == pytest.approx(2 * 330240 / 1024)
+    assert file == pytest.approx(2 * (368588 - 330240) / 1024)
+
+
+def test_reads_are_spaced_by_their_cost(collector, clock, monkeypatch):
+    # Two rollups of 20 ms each are only read again after 4 s with a budget of 1 %
+    def slow_parse(data):
+        clock[0] += 0.02
+        return parse_smaps_rollup(data)
+
+    monkeypatch.setattr(memoryStats, "parse_smaps_rollup", slow_parse)
+    assert collector.collect()[0] is not None
+    assert collector.next_read == pytest.approx(100.0 + 4.0)
+    clock[0] = 103.9
+    assert collector.collect() == (None, None, None, None)
+    clock[0] = 104.01
+    assert collector.collect()[0] is not None
+    assert collector.mean_cost_ms() == pytest.approx(40.0)
+
+
+def test_interval_stays_within_its_bounds(collector, clock, monkeypatch):
+    collector.collect()
+    # A read that costs nothing still waits min_interval
+    assert collector.next_read == pytest.approx(100.1)
+
+    def very_slow_parse(data):
+        clock[0] += 1.0
+        return parse_smaps_rollup(data)
+
+    monkeypatch.setattr(memoryStats, "parse_smaps_rollup", very_slow_parse)
+    clock[0] = 101.0
+    collector.collect()
+    assert collector.next_read == pytest.approx(106.0)
+
+
+def test_update_pids_opens_and_closes_rollups(collector):
+    collector.update_pids([1001, os.getpid()])
+    assert sorted(collector.fds) == sorted([1001, os.getpid()])
+    collector.update_pids([])
+    assert collector.fds == {}
+    assert collector.collect() == (None, None, None, None)
@@ -0,0 +1,99 @@
+import subprocess
+import sqlite3
+
+import pytest
+
+import monitoringBank
+
+
+# PgSession over an in-memory SQLite database, TRUNCATE is spelled DELETE there
+class FakeSession:
+
+    def __init__(self):
+        self.db = sqlite3.connect(":memory:", isolation_level=None)
+        self.db.execute("CREATE TABLE account (id TEXT PRIMARY KEY, balance NUMERIC)")
+
+    def query(self, sql):
+        return [list(row) for row in self.db.execute(sql.replace("TRUNCATE account", "DELETE FROM account"))]
+
+    def scalar(self, sql):
+        rows = self.query(sql)
+        return rows[0][0] if rows else None
+
+    def import_accounts(self, balances):
+        self.query("DELETE FROM account")
+        self.db.executemany("INSERT INTO account VALUES (?, ?)", [(str(i), balance) for i, balance in enumerate(balances)])
+
+
+def test_reset_restores_the_first_import():
+    session = FakeSession()
+    checksums = {}
+
+    # Before the first import there is no snapshot, the table is emptied
+    session.import_accounts([1, 2])
+    monitoringBank.reset_account_table(session, checksums, 3, 10)
+    assert session.scalar("SELECT count(*) FROM account") == 0
+
+    session.import_accounts([100, 200, 300])
+    assert monitoringBank.verify_account_table(session, checksums, 3, 10)
+    monitoringBank.save_account_snapshot(session, 3, 10)
+
+    # Transfers keep the sum, the reset brings back the balances of the import
+    session.query("UPDATE account SET balance = balance + 50 WHERE id = '0'")
+    session.query("UPDATE account SET balance = balance - 50 WHERE id = '1'")
+    monitoringBank.reset_account_table(session, checksums, 3, 10)
+    assert session.query("SELECT id, balance FROM account ORDER BY id") == [["0", 100], ["1", 200], ["2", 300]]
+
+
+def test_reset_fails_when_the_snapshot_does_not_match():
+    session = FakeSession()
+    checksums = {}
+    session.import_accounts([100, 200, 300])
+    assert monitoringBank.verify_account_table(session, checksums, 3, 10)
+    monitoringBank.save_account_snapshot(session, 3, 10)
+    session.query(f"DELETE FROM {monitoringBank.snapshot_table(3, 10)} WHERE id = '2'")
+
+    with pytest.raises(RuntimeError):
+        monitoringBank.reset_account_table(session, checksums, 3, 10)
+
+
+# Records docker calls, commands listed in failing exit with status 1
+class FakeDocker:
+
+    def __init__(self, failing=()):
+        self.calls = []
+        self.failing = failing
+
+    def __call__(self, command, **kwargs):
+        self.calls.append(command[1])
+        return subprocess.CompletedProcess(command, 1 if command[1] in self.failing else 0, "", "Error response from daemon")
+
+
+def test_run_paused_checks_between_pause_and_unpause(monkeypatch):
+    docker = FakeDocker()
+    monkeypatch.setattr(monitoringBank.subprocess, "run", docker)
+
+    def check():
+        assert docker.calls == ["pause"]
+        return True
+
+    verified, paused_seconds = monitoringBank.run_paused("bank-bank-1", check)
+    assert verified
+    assert paused_seconds >= 0
+    assert docker.calls == ["pause", "unpause"]
+
+
+def test_run_paused_does_not_check_a_running_bank(monkeypatch):
+    docker = FakeDocker(failing=["pause"])
+    monkeypatch.setattr(monitoringBank.subprocess, "run", docker)
+
+    with pytest.raises(RuntimeError, match="docker pause"):
+        monitoringBank.run_paused("bank-bank-1", lambda: pytest.fail("checked a running bank"))
+
+
+def test_run_paused_fails_when_the_bank_stays_paused(monkeypatch):
+    docker = FakeDocker(failing=["unpause"])
+    monkeypatch.setattr(monitoringBank.subprocess, "run", docker)
+
+    with pytest.raises(RuntimeError, match="docker unpause"):
+        monitoringBank.run_paused("bank-bank-1", lambda: True)
@@ -0,0 +1,136 @@
+import json
+import math
+
+import pytest
+
+import pgSampler
+from pgConnection import PgError
+from pgSampler import ACTIVITY_QUERY, PG_COLUMNS, STATEMENTS_AVAILABLE_QUERY, STATEMENTS_QUERY, STATEMENTS_TOTAL_QUERY, PgStatsSampler
+
+
+# PgSession answering the sampler's queries from its attributes with strings, like psql does.
+# pg_stat_statements can be missing, or created but not loaded through shared_preload_libraries.
+class FakeSession:
+
+    def __init__(self, extension=False, loaded=True):
+        self.extension = extension
+        self.loaded = loaded
+        self.failing = False
+        self.queries = 0
+        # connections, active, idle in transaction, lock, lwlock and IO waits, blocked locks,
+        # rollbacks, deadlocks, blocks hit and read
+        self.activity = [5, 3, 1, 2, 0, 1, 4, 10, 1, 1000, 50]
+        self.statement_time = 100.0
+        self.statements = [["1", 10, 40.0, 10, "SELECT balance FROM account WHERE id = $1"]]
+
+    def query(self, sql):
+        self.queries += 1
+        if self.failing:
+            raise PgError("server closed the connection unexpectedly")
+        if sql == ACTIVITY_QUERY:
+            return [[str(value) for value in self.activity]]
+        if sql == STATEMENTS_AVAILABLE_QUERY:
+            return [["1" if self.extension else "0"]]
+        if not self.extension or not self.loaded:
+            raise PgError('ERROR:  pg_stat_statements must be loaded via "shared_preload_libraries"')
+        if sql == STATEMENTS_TOTAL_QUERY:
+            return [[str(self.statement_time)]]
+        if sql == STATEMENTS_QUERY:
+            return [[str(value) for value in row] for row in self.statements]
+        raise AssertionError(f"unexpected query {sql}")
+
+    def scalar(self, sql):
+        rows = self.query(sql)
+        return rows[0][0] if rows else None
+
+
+def sample(sampler):
+    return dict(zip([name for name, _ in PG_COLUMNS], sampler.sample()))
+
+
+def test_snapshots_as_read_and_counters_since_the_start():
+    session = FakeSession(extension=True)
+    sampler = PgStatsSampler(session, interval=0)
+    session.activity = [7, 6, 0, 3, 1, 0, 2, 13, 1, 1800, 52]
+    session.statement_time = 160.0
+
+    values = sample(sampler)
+    assert (values["pg_connections"], values["pg_active"], values["pg_idle_in_transaction"]) == (7, 6, 0)
+    assert (values["pg_lock_waits"], values["pg_lwlock_waits"], values["pg_io_waits"], values["pg_blocked_locks"]) == (3, 1, 0, 2)
+    assert (values["pg_rollbacks"], values["pg_deadlocks"], values["pg_blks_hit"], values["pg_blks_read"]) == (3, 0, 800, 2)
+    assert values["pg_statement_time"] == 60.0
+
+
+def test_samples_are_only_read_once_per_interval(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(pgSampler.time, "monotonic", lambda: now[0])
+    session = FakeSession()
+    sampler = PgStatsSampler(session, interval=0.5)
+    first = sampler.sample()
+    queries = session.queries
+
+    session.activity = [9] * len(session.activity)
+    now[0] += 0.2
+    assert sampler.sample() == first
+    assert session.queries == queries
+    now[0] += 0.4
+    assert sample(sampler)["pg_connections"] == 9
+
+
+@pytest.mark.parametrize("extension, loaded", [(False, True), (True, False)])
+def test_without_pg_stat_statements_there_is_no_statement_time(tmp_path, extension, loaded):
+    session = FakeSession(extension, loaded)
+    sampler = PgStatsSampler(session, interval=0)
+    assert not sampler.statements
+
+    values = sample(sampler)
+    assert math.isnan(values["pg_statement_time"])
+    assert values["pg_connections"] == 5
+    sampler.write_statements(tmp_path / "pg_statements.json")
+    assert not (tmp_path / "pg_statements.json").exists()
+
+
+def test_statements_of_the_run_by_execution_time(tmp_path):
+    session = FakeSession(extension=True)
+    sampler = PgStatsSampler(session, interval=0)
+    # Statement 1 keeps running, 2 is new, 3 is not called during the run
+    session.statements = [["1", 15, 55.0, 15, "SELECT balance FROM account WHERE id = $1"],
+                          ["2", 4, 80.0, 4, "UPDATE account SET balance = balance + $1 WHERE id = $2"]]
+    sampler.start_statements["3"] = (2.0, 1.0, 2.0, "SELECT 1")
+
+    sampler.write_statements(tmp_path / "pg_statements.json")
+    with open(tmp_path / "pg_statements.json") as file:
+        statements = json.load(file)
+    assert [(statement["queryid"], statement["calls"], statement["total_exec_time"], statement["rows"]) for statement in statements] == \
+        [("2", 4.0, 80.0, 4.0), ("1", 5.0, 15.0, 5.0)]
+
+
+def test_a_failed_query_ends_sampling():
+    session = FakeSession()
+    sampler = PgStatsSampler(session, interval=0)
+    session.failing = True
+
+    assert all(math.isnan(value) for value in sampler.sample())
+    assert sampler.session is None
+    assert all(math.isnan(value) for value in sampler.sample())
+
+
+def test_without_session_every_value_is_nan():
+    sampler = PgStatsSampler(None)
+    assert not sampler.statements
+    assert all(math.isnan(value) for value in sampler.sample())
+
+
+def test_against_postgres(pg_connect, tmp_path):
+    sampler = PgStatsSampler(pg_connect(), interval=0)
+    other = pg_connect()
+    for _ in range(5):
+        other.query("SELECT 1")
+
+    values = sample(sampler)
+    assert values["pg_connections"] >= 1
+    for name in ["pg_rollbacks", "pg_deadlocks", "pg_blks_hit", "pg_blks_read"]:
+        assert values[name] >= 0
+    assert math.isnan(values["pg_statement_time"]) != sampler.statements
+    sampler.write_statements(tmp_path / "pg_statements.json")
+    assert (tmp_path / "pg_statements.json").exists() == sampler.statements
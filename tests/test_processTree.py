@@ -0,0 +1,71 @@
+import subprocess
+import sys
+
+import psutil
+import pytest
+
+from processTree import ProcessTreeCollector
+
+# Parent that starts one sleeping child per line on stdin and prints its PID
+PARENT = """
+import subprocess, sys
+children = []
+for line in sys.stdin:
+    children.append(subprocess.Popen(["sleep", "30"]))
+    print(children[-1].pid, flush=True)
+"""
+
+
+@pytest.fixture
+def parent():
+    process = subprocess.Popen([sys.executable, "-c", PARENT], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    handle = psutil.Process(process.pid)
+    yield process
+    try:
+        for child in handle.children(recursive=True):
+            child.kill()
+    except psutil.NoSuchProcess:
+        pass
+    process.kill()
+    process.wait()
+
+
+def spawn_child(parent):
+    parent.stdin.write("\n")
+    parent.stdin.flush()
+    return int(parent.stdout.readline())
+
+
+def test_handles_are_reused_across_refreshes(parent):
+    first = spawn_child(parent)
+    collector = ProcessTreeCollector(parent.pid, refresh_interval_ms=0)
+    handle = collector.processes[first]
+
+    second = spawn_child(parent)
+    totals, breakdown = collector.collect()
+
+    # The known child keeps its psutil.Process, the new one is picked up by the refresh
+    assert collector.processes[first] is handle
+    assert collector.processes[parent.pid] is collector.root
+    assert {entry["pid"] for entry in breakdown} == {parent.pid, first, second}
+    assert totals["num_processes"] == 3
+
+
+def test_descendants_are_only_listed_on_refresh(parent):
+    collector = ProcessTreeCollector(parent.pid, refresh_interval_ms=60_000)
+    child = spawn_child(parent)
+
+    # Within the refresh interval a tick only reads the cached handles
+    _, breakdown = collector.collect()
+    assert [entry["pid"] for entry in breakdown] == [parent.pid]
+
+    collector.refresh()
+    _, breakdown = collector.collect()
+    assert {entry["pid"] for entry in breakdown} == {parent.pid, child}
+
+
+def test_collect_returns_none_once_the_root_is_gone(parent):
+    collector = ProcessTreeCollector(parent.pid, refresh_interval_ms=60_000)
+    parent.kill()
+    parent.wait()
+    assert collector.collect() is None
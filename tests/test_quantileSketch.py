@@ -0,0 +1,86 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from harness.quantileSketch import QUANTILES, MetricStats, QuantileSketch, SketchSink, load_sketches
+
+
+def true_quantile(values, q):
+    # Same rank as QuantileSketch.quantile: the value at position q * (n - 1) of the sorted values
+    return np.sort(values)[int(q * (len(values) - 1))]
+
+
+@pytest.mark.parametrize("relative_accuracy", [0.01, 0.05])
+def test_quantiles_are_within_the_relative_accuracy(relative_accuracy):
+    rng = np.random.default_rng(7)
+    # Heavy-tailed latencies over several orders of magnitude plus negative values and zeros
+    values = np.concatenate([rng.lognormal(0, 2, 20_000), -rng.lognormal(1, 1, 2_000), np.zeros(500)])
+    sketch = QuantileSketch(relative_accuracy)
+    sketch.add_array(values)
+
+    assert sketch.count == values.size
+    for q in QUANTILES + [0.01, 0.25, 0.75]:
+        expected = true_quantile(values, q)
+        assert abs(sketch.quantile(q) - expected) <= relative_accuracy * abs(expected)
+
+
+def test_non_finite_values_are_not_counted():
+    sketch = QuantileSketch()
+    sketch.add_array([1.0, np.nan, np.inf, 2.0])
+    assert sketch.count == 2
+    assert np.isnan(QuantileSketch().quantile(0.5))
+
+
+def test_merged_sketches_equal_one_sketch_of_all_values():
+    rng = np.random.default_rng(3)
+    runs = [rng.lognormal(1, 1, 5_000) for _ in range(3)]
+
+    merged = QuantileSketch()
+    for values in runs:
+        sketch = QuantileSketch()
+        sketch.add_array(values)
+        merged.merge(sketch)
+    single = QuantileSketch()
+    single.add_array(np.concatenate(runs))
+
+    assert merged.to_dict() == single.to_dict()
+    assert merged.quantile(0.99) == single.quantile(0.99)
+
+
+def test_sketches_of_different_accuracy_do_not_merge():
+    with pytest.raises(ValueError):
+        QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+
+def test_merged_metric_stats_keep_mean_and_variance():
+    rng = np.random.default_rng(5)
+    first, second = rng.normal(10, 2, 1_000), rng.normal(20, 5, 300)
+    stats = MetricStats()
+    stats.add_array(first)
+    other = MetricStats()
+    other.add_array(second)
+    stats.merge(other)
+
+    values = np.concatenate([first, second])
+    assert stats.count == values.size
+    assert stats.mean == pytest.approx(values.mean())
+    assert stats.variance() == pytest.approx(values.var(ddof=1))
+    summary = stats.summary()
+    assert values.min() <= summary["p50"] <= values.max()
+
+
+def test_sketch_sink_round_trip(tmp_path):
+    sink = SketchSink(tmp_path, [("point", "d"), ("timestamp", "d"), ("cpu_usage", "d")], "point")
+    sink.write_batch({"point": np.array([0.0, 0.0, 1.0]), "timestamp": np.array([0.5, 1.0, 0.5]),
+                      "cpu_usage": np.array([10.0, 20.0, 30.0])})
+    sink.close()
+
+    with open(os.path.join(tmp_path, "sketches.json")) as file:
+        assert json.load(file)["group_column"] == "point"
+    sketches = load_sketches(os.path.join(tmp_path, "sketches.json"))
+    assert set(sketches) == {0.0, 1.0}
+    assert list(sketches[0.0]) == ["cpu_usage"]
+    assert sketches[0.0]["cpu_usage"].summary()["max"] == 20.0
+    assert sketches[1.0]["cpu_usage"].sketch.count == 1
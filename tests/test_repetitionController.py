@@ -0,0 +1,63 @@
+import math
+
+import pytest
+
+from harness.repetitionController import RepetitionController, confidence_interval, t_quantile
+
+
+def controller_with(times, **kwargs):
+    controller = RepetitionController(**kwargs)
+    for value in times:
+        controller.add({"execution_time": value})
+    return controller
+
+
+def test_interval_uses_the_t_distribution():
+    mean, half_width = confidence_interval([10.0, 12.0, 14.0])
+    # Sample standard deviation 2, t(2) = 4.303
+    assert mean == 12.0
+    assert half_width == pytest.approx(4.303 * 2 / math.sqrt(3))
+    assert t_quantile(45) == pytest.approx(2.021)
+    assert t_quantile(1000) == 1.960
+
+
+def test_missing_and_non_finite_values_are_ignored():
+    assert confidence_interval([None, math.nan, 5.0, 7.0])[0] == 6.0
+    assert math.isnan(confidence_interval([5.0])[1])
+    assert math.isnan(confidence_interval([])[0])
+
+
+def test_stops_once_the_interval_is_narrow_enough():
+    controller = controller_with([100.0, 101.0], target_width=0.05, min_runs=3)
+    # Below min_runs even a narrow interval does not stop
+    assert not controller.done()
+    controller.add({"execution_time": 100.5})
+    assert controller.relative_width() <= 0.05
+    assert controller.done()
+
+
+def test_keeps_repeating_a_noisy_point_until_max_runs():
+    controller = controller_with([100.0, 140.0, 80.0], target_width=0.05, min_runs=3, max_runs=5)
+    assert not controller.done()
+    controller.add({"execution_time": 120.0})
+    assert not controller.done()
+    controller.add({"execution_time": 90.0})
+    assert controller.relative_width() > 0.05
+    assert controller.done()
+
+
+def test_stop_rule_uses_the_configured_metric():
+    controller = RepetitionController(metric="cpu_per_1k_transactions", target_width=0.1, min_runs=2)
+    controller.add({"execution_time": 10.0, "cpu_per_1k_transactions": 2.0})
+    controller.add({"execution_time": 30.0, "cpu_per_1k_transactions": 2.01})
+    assert controller.done()
+
+
+def test_time_log_fields():
+    controller = controller_with([10.0, 12.0, 14.0])
+    fields = dict(controller.time_log_fields())
+    assert fields[""] == 12.0
+    assert fields["_ci"] == round(4.303 * 2 / math.sqrt(3), 3)
+    assert fields["_n"] == 3
+    assert fields["_runs"] == "10.0;12.0;14.0"
+    assert dict(controller_with([10.0]).time_log_fields())["_ci"] == "N/A"
@@ -0,0 +1,62 @@
+import os
+
+from harness.quantileSketch import MetricStats
+from harness.resultsStore import ResultsStore, point_key
+
+
+def add_run(results, sweep_id, algorithm, index, values, execution_time, cpu_usage):
+    run_id = results.start_run(sweep_id, algorithm, index, point=values)
+    stats = MetricStats()
+    stats.add_array([cpu_usage])
+    results.finish_run(run_id, "complete", execution_time, {"execution_time": execution_time}, {"cpu_usage": stats})
+
+
+def test_runs_of_different_sweeps_are_matched_by_their_axis_values(tmp_path):
+    results = ResultsStore(os.path.join(tmp_path, "results.db"))
+    first = results.start_sweep("bank", {"sweep": "delays"})
+    second = results.start_sweep("bank", {"sweep": "delays and accounts"})
+    # The same delay is point 1 in the first sweep and point 0 in the second, point 1 of the second is another point
+    add_run(results, first, "virtual", 0, {"DELAY_TRANSACTION": 0.01}, 10.0, 100.0)
+    add_run(results, first, "virtual", 1, {"DELAY_TRANSACTION": 0.02}, 20.0, 200.0)
+    add_run(results, second, "virtual", 0, {"DELAY_TRANSACTION": 0.02}, 22.0, 220.0)
+    add_run(results, second, "virtual", 1, {"DELAY_TRANSACTION": 0.03}, 30.0, 300.0)
+
+    points = {point_key({"DELAY_TRANSACTION": 0.01}): 0, point_key({"DELAY_TRANSACTION": 0.02}): 1}
+    merged = results.merged_stats([first, second], ["cpu_usage"], points=points)
+    assert sorted(merged) == [("virtual", 0), ("virtual", 1)]
+    assert merged[("virtual", 0)]["cpu_usage"].count == 1
+    assert (merged[("virtual", 1)]["cpu_usage"].min, merged[("virtual", 1)]["cpu_usage"].max) == (200.0, 220.0)
+
+    frame = results.time_frame([first, second], "point", ["virtual"], points=points)
+    assert frame["point"].tolist() == [0, 1]
+    assert frame["virtual"].tolist() == [10.0, 21.0]
+    assert frame["virtual_n"].tolist() == [1, 2]
+
+    # Without points the runs are grouped by sweep_param as before
+    assert sorted(results.merged_stats([first], ["cpu_usage"])) == [("virtual", 0.0), ("virtual", 1.0)]
+    results.close()
+
+
+def test_runs_without_axis_values_are_backfilled_from_their_sweep(tmp_path):
+    results = ResultsStore(os.path.join(tmp_path, "results.db"))
+    sweep_id = results.start_sweep("bank", {"sweep": "delays"})
+    add_run(results, sweep_id, "virtual", 1, None, 20.0, 200.0)
+    points = {point_key({"DELAY_TRANSACTION": 0.02}): 0}
+    assert results.merged_stats([sweep_id], ["cpu_usage"], points=points) == {}
+
+    results.backfill_points(sweep_id, {0: {"DELAY_TRANSACTION": 0.01}, 1: {"DELAY_TRANSACTION": 0.02}})
+    assert list(results.merged_stats([sweep_id], ["cpu_usage"], points=points)) == [("virtual", 0)]
+    results.close()
+
+
+def test_run_points_lists_the_axis_values_of_the_runs(tmp_path):
+    results = ResultsStore(os.path.join(tmp_path, "results.db"))
+    sweep_id = results.start_sweep("bank", {})
+    add_run(results, sweep_id, "virtual", 1, {"DELAY_TRANSACTION": 0.02}, 20.0, 200.0)
+    add_run(results, sweep_id, "platform", 1, {"DELAY_TRANSACTION": 0.02}, 21.0, 210.0)
+    add_run(results, sweep_id, "virtual", 0, {"DELAY_TRANSACTION": 0.01}, 10.0, 100.0)
+    add_run(results, sweep_id, "virtual", 2, None, 30.0, 300.0)
+
+    assert results.run_points([sweep_id]) == [{"DELAY_TRANSACTION": 0.01}, {"DELAY_TRANSACTION": 0.02}]
+    assert results.run_points([sweep_id + 1]) == []
+    results.close()
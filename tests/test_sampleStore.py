@@ -0,0 +1,37 @@
+import csv
+import os
+
+from harness.aggregation import StreamingAggregator
+from harness.sampleStore import CsvSink, SampleStore
+
+COLUMNS = [("point", "d"), ("timestamp", "d"), ("cpu_usage", "d"), ("throughput", "d")]
+HEADER = ["delay", "timestamp", "cpu_usage"]
+
+
+def write_samples(path, rows, delay):
+    store = SampleStore(COLUMNS, [CsvSink(path, HEADER, {"delay": delay})])
+    for row in rows:
+        store.append(row)
+    store.close()
+
+
+def test_csv_keeps_its_layout_when_the_store_has_more_columns(tmp_path):
+    path = os.path.join(tmp_path, "measurement_log_virtual.csv")
+    write_samples(path, [(0, 0.5, 10.0, 99.0), (0, 1.0, 20.0, 98.0)], 0.01)
+    write_samples(path, [(1, 0.5, 30.0, 97.0)], 0.02)
+
+    with open(path, newline="") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == HEADER
+    assert [[float(value) for value in row] for row in rows[1:]] == [[0.01, 0.5, 10.0], [0.01, 1.0, 20.0], [0.02, 0.5, 30.0]]
+
+
+def test_csv_delay_is_mapped_to_the_sweep_point(tmp_path):
+    path = os.path.join(tmp_path, "measurement_log_virtual.csv")
+    write_samples(path, [(0, 0.5, 10.0, 0.0), (0, 1.0, 20.0, 0.0)], 0.01)
+    write_samples(path, [(1, 0.5, 30.0, 0.0)], 0.02)
+
+    aggregator = StreamingAggregator("point", ["cpu_usage"])
+    aggregator.update_from_csv("virtual", path, ("delay", {0.01: 0, 0.02: 1}))
+    assert aggregator.stats("virtual", 0)["cpu_usage"].max == 20.0
+    assert aggregator.stats("virtual", 1)["cpu_usage"].max == 30.0
@@ -0,0 +1,90 @@
+import pytest
+
+import samplingScheduler
+from samplingScheduler import FixedRateScheduler
+
+MS = 1_000_000
+
+
+# time.monotonic_ns and time.sleep of the scheduler on a clock the test advances
+class FakeClock:
+
+    def __init__(self):
+        self.now_ns = 1_000 * MS
+        self.sleeps = []
+
+    def monotonic_ns(self):
+        return self.now_ns
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now_ns += round(seconds * 1e9)
+
+    def work(self, ms):
+        self.now_ns += ms * MS
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(samplingScheduler.time, "monotonic_ns", clock.monotonic_ns)
+    monkeypatch.setattr(samplingScheduler.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_ticks_wake_up_on_absolute_deadlines(clock):
+    scheduler = FixedRateScheduler(10)
+    start = scheduler.start()
+    wake_ups = []
+    for work_ms in [3, 7, 1]:
+        wake_ups.append(scheduler.sleep_until_next() - start)
+        clock.work(work_ms)
+        scheduler.end_tick()
+
+    # The time spent in a tick does not delay the next deadline
+    assert wake_ups == [10 * MS, 20 * MS, 30 * MS]
+    assert scheduler.missed_deadlines == 0
+    assert scheduler.ticks == 3
+
+
+def test_a_long_tick_skips_the_deadlines_it_ran_past(clock):
+    scheduler = FixedRateScheduler(10)
+    start = scheduler.start()
+    scheduler.sleep_until_next()
+    clock.work(25)
+    scheduler.end_tick()
+
+    # Deadlines at 20 and 30 ms have passed, the next tick starts at 40 ms without a burst
+    assert scheduler.sleep_until_next() - start == 40 * MS
+    assert scheduler.missed_deadlines == 2
+    clock.work(10)
+    assert scheduler.sleep_until_next() - start == 60 * MS
+    assert scheduler.missed_deadlines == 3
+
+
+def test_end_tick_returns_the_overhead_of_its_own_tick(clock):
+    scheduler = FixedRateScheduler(10)
+    scheduler.start()
+    overheads = []
+    for work_ms in [2, 5, 1]:
+        scheduler.sleep_until_next()
+        clock.work(work_ms)
+        overheads.append(scheduler.end_tick())
+
+    assert overheads == [2 * MS, 5 * MS, 1 * MS]
+    assert scheduler.last_overhead_ns == 1 * MS
+    assert scheduler.mean_overhead_us() == pytest.approx(8000 / 3)
+
+
+def test_a_tick_left_without_end_tick_has_no_overhead(clock):
+    scheduler = FixedRateScheduler(10)
+    scheduler.start()
+    assert scheduler.mean_overhead_us() == 0.0
+    scheduler.sleep_until_next()
+    clock.work(4)
+    scheduler.end_tick()
+    # The last tick breaks out of the loop before its sample is complete
+    scheduler.sleep_until_next()
+
+    assert scheduler.ticks == 2
+    assert scheduler.mean_overhead_us() == 4000.0
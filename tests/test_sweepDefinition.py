@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from sweepDefinition import CPUS_AXIS, load_sweep, read_cpu_limits
+
+DEFAULT_AXES = {"DELAY_TRANSACTION": [0.01, 0.02]}
+
+
+def test_default_sweep_without_a_file():
+    sweep = load_sweep(None, DEFAULT_AXES)
+    assert [point.values for point in sweep.points] == [{"DELAY_TRANSACTION": 0.01}, {"DELAY_TRANSACTION": 0.02}]
+
+
+def test_missing_sweep_file_is_an_error(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_sweep(os.path.join(tmp_path, "sweep_typo.yaml"), DEFAULT_AXES)
+
+
+def test_axes_from_the_file(tmp_path):
+    path = os.path.join(tmp_path, "sweep.yaml")
+    with open(path, "w") as file:
+        file.write("axes:\n  NUMBER_OF_ACCOUNTS: [10, 100]\n  DELAY_TRANSACTION: {start: 0.01, stop: 0.02, step: 0.01}\n")
+    sweep = load_sweep(path, DEFAULT_AXES)
+    assert [point.label for point in sweep.points] == ["10_0.01", "10_0.02", "100_0.01", "100_0.02"]
+
+
+def test_cpu_limits_from_the_compose_file_and_the_cpus_axis(tmp_path):
+    compose = os.path.join(tmp_path, "docker-compose.yaml")
+    with open(compose, "w") as file:
+        file.write("services:\n  bank:\n    deploy:\n      resources:\n        limits:\n          cpus: '2.5'\n  postgres:\n    image: postgres\n")
+    limits = read_cpu_limits(compose)
+    # A service without limit may use every CPU of the host
+    assert limits == {"bank": 2.5, "postgres": float(os.cpu_count())}
+
+    path = os.path.join(tmp_path, "sweep.yaml")
+    with open(path, "w") as file:
+        file.write(f"axes:\n  {CPUS_AXIS}: [1, 4]\n")
+    points = load_sweep(path, DEFAULT_AXES).points
+    assert [point.cpu_limit("bank", limits) for point in points] == [1.0, 4.0]
+    assert points[0].cpu_limit("postgres", limits) == float(os.cpu_count())
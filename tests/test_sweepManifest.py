@@ -0,0 +1,39 @@
+import os
+
+from harness.sweepManifest import SweepManifest
+
+CONFIG = {"algorithms": ["platform", "goroutines"], "max_depth": 2}
+POINTS = [(algorithm, key) for key in ("0", "1") for algorithm in CONFIG["algorithms"]]
+
+
+def test_missing_lists_points_that_are_not_done(tmp_path):
+    manifest = SweepManifest(os.path.join(tmp_path, "manifest.json"), CONFIG)
+    manifest.add_result("platform", "0", {"execution_time": 1.0})
+    manifest.mark_done("platform", "0")
+    manifest.mark_done("goroutines", "0")
+
+    assert manifest.missing(POINTS) == [("platform", "1"), ("goroutines", "1")]
+
+
+def test_unfinished_sweep_is_resumed(tmp_path):
+    path = os.path.join(tmp_path, "manifest.json")
+    manifest = SweepManifest(path, CONFIG)
+    manifest.set_sweep_id(7)
+    manifest.add_result("platform", "0", {"execution_time": 1.0})
+    manifest.mark_done("platform", "0")
+
+    resumed = SweepManifest(path, CONFIG)
+    assert resumed.resumed and resumed.sweep_id == 7
+    assert resumed.results("platform", "0") == [{"execution_time": 1.0}]
+    assert ("platform", "0") not in resumed.missing(POINTS)
+
+
+def test_finished_sweep_starts_over(tmp_path):
+    path = os.path.join(tmp_path, "manifest.json")
+    manifest = SweepManifest(path, CONFIG)
+    for algorithm, key in POINTS:
+        manifest.mark_done(algorithm, key)
+    assert manifest.missing(POINTS) == []
+    manifest.finish()
+
+    assert not SweepManifest(path, CONFIG).resumed
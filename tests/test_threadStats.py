@@ -0,0 +1,72 @@
+import os
+import subprocess
+import threading
+import time
+
+from conftest import FIXTURES
+from harness.threadStats import ThreadStatsCollector, parse_task_stat
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), "rb") as file:
+        return file.read()
+
+
+def test_parse_task_stat_with_parentheses_in_the_name():
+    # The JVM names threads freely, the name ends at the last closing parenthesis
+    assert parse_task_stat(read_fixture("proc_task_stat")) == ("C2 Compiler) x", "S", 1520 + 310)
+
+
+def busy(stop):
+    while not stop.is_set():
+        pass
+
+
+def test_collect_sees_new_busy_and_exited_threads():
+    collector = ThreadStatsCollector([os.getpid()])
+    try:
+        stop = threading.Event()
+        thread = threading.Thread(target=busy, args=(stop,), name="busy")
+        thread.start()
+        start = time.monotonic()
+        time.sleep(0.5)
+        values, breakdown = collector.collect(time.monotonic() - start)
+        tid = thread.native_id
+        stop.set()
+        thread.join()
+        # The OS thread can outlive join() for a moment
+        deadline = time.monotonic() + 5
+        while os.path.exists(f"/proc/self/task/{tid}") and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        created, exited, busy_10, _, _, max_thread_cpu = values
+        assert created >= 1
+        assert busy_10 >= 1
+        assert max_thread_cpu >= 10
+        assert any(entry["tid"] == tid and entry["cpu_usage"] >= 10 for entry in breakdown)
+
+        values, _ = collector.collect(0.1)
+        assert values[1] >= 1
+        row = next(row for row in collector.summary() if row["tid"] == tid)
+        assert row["cpu_seconds"] > 0
+        assert (row["first_tick"], row["last_tick"]) == (1, 1)
+    finally:
+        collector.close()
+
+
+def test_update_pids_follows_the_process_tree():
+    child = subprocess.Popen(["sleep", "30"])
+    collector = ThreadStatsCollector([os.getpid()])
+    try:
+        collector.update_pids([os.getpid(), child.pid])
+        _, breakdown = collector.collect(0.1)
+        assert child.pid in {entry["pid"] for entry in breakdown}
+
+        collector.update_pids([os.getpid()])
+        assert list(collector.task_fds) == [os.getpid()]
+        _, breakdown = collector.collect(0.1)
+        assert child.pid not in {entry["pid"] for entry in breakdown}
+    finally:
+        collector.close()
+        child.kill()
+        child.wait()
@@ -0,0 +1,125 @@
+import math
+import subprocess
+import sys
+import time
+
+import pytest
+
+import throughputSampler
+from harness.outputPump import OutputPump
+from pgConnection import PgError
+from throughputSampler import XACT_COMMIT_QUERY, ThroughputSampler
+
+
+# PgSession whose every query is a transaction of its own, like the sampler's queries in
+# pg_stat_database: xact_commit holds the bank's commits plus all earlier queries of the session
+class FakeSession:
+
+    def __init__(self):
+        self.queries = 0
+        self.bank_commits = 0
+        self.failing = False
+
+    def query(self, sql):
+        if self.failing:
+            raise PgError("server closed the connection unexpectedly")
+        commits = self.bank_commits + self.queries
+        self.queries += 1
+        if sql == XACT_COMMIT_QUERY:
+            return [[str(commits)]]
+        return [["0"]]
+
+    def scalar(self, sql):
+        rows = self.query(sql)
+        return rows[0][0] if rows else None
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(throughputSampler.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_commit_delta_leaves_out_the_samplers_own_queries(clock):
+    session = FakeSession()
+    session.bank_commits = 500
+    sampler = ThroughputSampler(session, interval=1.0)
+    # Queries of other samplers over the same session count as commits as well
+    for _ in range(3):
+        session.query("SELECT count(*) FROM pg_stat_activity")
+
+    session.bank_commits += 200
+    clock[0] += 2.0
+    assert sampler.sample() == (200.0, 100.0)
+    session.bank_commits += 50
+    assert sampler.total() == 250.0
+
+
+def test_commits_are_only_read_once_per_interval(clock):
+    session = FakeSession()
+    sampler = ThroughputSampler(session, interval=1.0)
+    session.bank_commits += 10
+    clock[0] += 1.0
+    assert sampler.sample() == (10.0, 10.0)
+    queries = session.queries
+
+    session.bank_commits += 10
+    clock[0] += 0.5
+    assert sampler.sample() == (10.0, 10.0)
+    assert session.queries == queries
+
+
+def test_progress_lines_replace_the_commit_counter(clock):
+    session = FakeSession()
+    sampler = ThroughputSampler(session, r"transfers done: (?P<count>\d+)", interval=1.0)
+    sampler.on_line(clock[0] + 0.5, "stdout", "bank-1  | starting")
+    sampler.on_line(clock[0] + 2.0, "stdout", "bank-1  | transfers done: 400")
+    session.bank_commits += 1000
+
+    clock[0] += 3.0
+    assert sampler.sample() == (400.0, 200.0)
+    assert sampler.total() == 400.0
+
+
+def test_progress_lines_arrive_through_the_output_pump():
+    # Like docker-compose up: prefixed container output, the last line is the final count
+    script = "for count in (100, 250, 400): print(f'bank-1  | transfers done: {count}', flush=True)"
+    process = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    sampler = ThroughputSampler(None, r"transfers done: (?P<count>\d+)")
+    pump = OutputPump(process, echo=False)
+    pump.on_line(sampler.on_line)
+    pump.start()
+    process.wait()
+    pump.join(timeout=5)
+
+    count, rate = sampler.sample()
+    assert count == 400.0
+    assert rate >= 0
+    assert sampler.total() == 400.0
+
+
+def test_without_commit_counter_there_is_no_throughput(clock):
+    session = FakeSession()
+    session.failing = True
+    for sampler in [ThroughputSampler(None), ThroughputSampler(session)]:
+        assert sampler.session is None
+        clock[0] += 2.0
+        assert all(math.isnan(value) for value in sampler.sample())
+    assert sampler.total() == 0.0
+
+
+def test_against_postgres(pg_connect):
+    session = pg_connect()
+    bank = pg_connect()
+    sampler = ThroughputSampler(session, interval=0)
+    for _ in range(20):
+        bank.query("SELECT 1")
+
+    # Postgres publishes the counters of other sessions with a delay, the sampler's own
+    # queries while waiting must not show up in the count
+    deadline = time.monotonic() + 10
+    while sampler.total() < 20 and time.monotonic() < deadline:
+        time.sleep(0.2)
+    time.sleep(1.5)
+    assert sampler.total() == 20